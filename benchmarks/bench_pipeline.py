@@ -0,0 +1,235 @@
+"""
+Benchmark of every pipeline stage (read_file, parse, Data.to_canvas, Canvas.to_terminal, Terminal.plot) and end to end.
+read_file_split times the former line.split reader on the same texts, as the reference for read_file (csv.reader).
+
+    python benchmarks/bench_pipeline.py --output new.json
+    python benchmarks/bench_pipeline.py --output new.json --compare base.json --threshold 0.2
+
+With --compare, the exit code is 1 when any stage is slower than the baseline by more than the threshold ratio.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import warnings
+from typing import Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from scatterminal.canvas_layer_model import Canvas  # noqa: E402
+from scatterminal.csv_parser import read_file, parse  # noqa: E402
+from scatterminal.data_layer_model import Data, DataAxis, DataLegendLoc, DataScaleType  # noqa: E402
+from scatterminal.terminal_layer_model import Terminal  # noqa: E402
+
+TERMINAL_SIZE = os.terminal_size((120, 40))
+SIZES = (1_000, 10_000, 100_000)
+STAGES = ("read_file", "read_file_split", "parse", "Data.to_canvas", "Canvas.to_terminal", "Terminal.plot", "end_to_end")
+
+
+@dataclasses.dataclass(frozen=True)
+class Dataset:
+    name: str
+    csv_texts: list[str]
+    point_num: int
+    scale: DataScaleType = DataScaleType.linear
+
+
+def _to_csv(header: list[str], rows: list[list[float]]) -> str:
+    lines = [",".join(header)]
+    lines.extend(",".join("%.6g" % v for v in row) for row in rows)
+    return "\n".join(lines) + "\n"
+
+
+def gen_tall(size: int, rng: random.Random) -> Dataset:
+    rows = [[i, math.sin(i / 50) + rng.gauss(0, 0.1)] for i in range(size)]
+    return Dataset("tall", [_to_csv(["x", "y"], rows)], size)
+
+
+def gen_wide(size: int, rng: random.Random) -> Dataset:
+    col_num = 7
+    row_num = max(size // (col_num - 1), 1)
+    rows = [[i] + [rng.gauss(c, 1) for c in range(col_num - 1)] for i in range(row_num)]
+    return Dataset("wide", [_to_csv(["x"] + ["y%d" % c for c in range(col_num - 1)], rows)], row_num * (col_num - 1))
+
+
+def gen_many_series(size: int, rng: random.Random) -> Dataset:
+    file_num = 16
+    row_num = max(size // file_num, 1)
+    texts = [
+        _to_csv(["x", "s%d" % f], [[i, rng.gauss(f, 1)] for i in range(row_num)])
+        for f in range(file_num)
+    ]
+    return Dataset("many_series", texts, row_num * file_num)
+
+
+def gen_log_scale(size: int, rng: random.Random) -> Dataset:
+    rows = [[i + 1, 10 ** rng.uniform(-3, 6)] for i in range(size)]
+    return Dataset("log_scale", [_to_csv(["x", "y"], rows)], size, DataScaleType.log)
+
+
+def gen_clustered(size: int, rng: random.Random) -> Dataset:
+    centers = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(3)]
+    rows = []
+    for i in range(size):
+        cx, cy = centers[i % len(centers)]
+        rows.append([rng.gauss(cx, 0.5), rng.gauss(cy, 0.5)])
+    return Dataset("clustered", [_to_csv(["x", "y"], rows)], size)
+
+
+GENERATORS: dict[str, Callable[[int, random.Random], Dataset]] = {
+    "tall": gen_tall,
+    "wide": gen_wide,
+    "many_series": gen_many_series,
+    "log_scale": gen_log_scale,
+    "clustered": gen_clustered,
+}
+
+
+def _read_file_split(file_obj: io.StringIO, sep: str) -> list[list[str]]:
+    return [[cell.strip() for cell in line.split(sep)] for line in file_obj]
+
+
+def _run_reference(dataset: Dataset, record: Callable[[str, Callable[[], object]], object]):
+    # not part of the pipeline (nor of end_to_end)
+    record("read_file_split", lambda: [_read_file_split(io.StringIO(text), ",") for text in dataset.csv_texts])
+
+
+def _run_stages(dataset: Dataset, record: Callable[[str, Callable[[], object]], object]):
+    str_cells_list = record("read_file", lambda: [read_file(io.StringIO(text), "csv", None) for text in dataset.csv_texts])
+
+    def _parse():
+        sequences = []
+        for str_cells in str_cells_list:
+            sequences.extend(parse(str_cells, len(sequences)))
+        return sequences
+    sequences = record("parse", _parse)
+
+    data = Data(sequences, DataAxis(dataset.scale), DataAxis(dataset.scale), DataLegendLoc.lower)
+    canvas = record("Data.to_canvas", lambda: data.to_canvas(Canvas))
+    terminal = record("Canvas.to_terminal", lambda: canvas.to_terminal(Terminal, TERMINAL_SIZE))
+
+    def _plot():
+        with contextlib.redirect_stdout(io.StringIO()):
+            terminal.plot()
+    record("Terminal.plot", _plot)
+
+
+def bench_dataset(dataset: Dataset, repeat: int) -> dict[str, dict[str, float]]:
+    seconds = {stage: math.inf for stage in STAGES}
+    peaks = {}
+
+    for _ in range(repeat):
+        def timed(stage: str, func: Callable[[], object]) -> object:
+            start = time.perf_counter()
+            result = func()
+            seconds[stage] = min(seconds[stage], time.perf_counter() - start)
+            return result
+
+        _run_reference(dataset, timed)
+        start = time.perf_counter()
+        _run_stages(dataset, timed)
+        seconds["end_to_end"] = min(seconds["end_to_end"], time.perf_counter() - start)
+
+    # memory is measured in a separate pass since tracemalloc slows everything down
+    def traced(stage: str, func: Callable[[], object]) -> object:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        result = func()
+        peaks[stage] = tracemalloc.get_traced_memory()[1] - base
+        return result
+
+    tracemalloc.start()
+    try:
+        _run_reference(dataset, traced)
+        _run_stages(dataset, traced)
+        peaks["end_to_end"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        stage: {
+            "seconds": seconds[stage],
+            "points_per_s": dataset.point_num / seconds[stage] if seconds[stage] > 0 else math.inf,
+            "peak_bytes": peaks[stage],
+        } for stage in STAGES
+    }
+
+
+def run(dataset_names: list[str], sizes: list[int], repeat: int, seed: int) -> dict:
+    results = {}
+    for name in dataset_names:
+        for size in sizes:
+            dataset = GENERATORS[name](size, random.Random(seed))
+            key = "%s-%d" % (name, size)
+            results[key] = bench_dataset(dataset, repeat)
+            e2e = results[key]["end_to_end"]
+            print("%-22s %10.4f s %14.0f points/s %12d peak bytes" % (key, e2e["seconds"], e2e["points_per_s"], e2e["peak_bytes"]))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float) -> list[str]:
+    regressions = []
+    for key, stages in new["results"].items():
+        base_stages = base["results"].get(key)
+        if base_stages is None:
+            continue
+        for stage, values in stages.items():
+            if stage not in base_stages:
+                continue
+            ratio = values["seconds"] / base_stages[stage]["seconds"]
+            if ratio > 1 + threshold:
+                regressions.append("%s %s: %.2fx slower (%.4f s -> %.4f s)" % (
+                    key, stage, ratio, base_stages[stage]["seconds"], values["seconds"]
+                ))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every stage of the scatterminal pipeline")
+    parser.add_argument("--datasets", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES), help="Number of points per dataset")
+    parser.add_argument("--repeat", type=int, default=3, help="The best of REPEAT runs is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Path of the JSON result")
+    parser.add_argument("--compare", help="Path of a baseline JSON result")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio against the baseline")
+    argv = parser.parse_args()
+
+    # e.g. marker reuse of many_series is expected and not interesting here
+    warnings.simplefilter("ignore")
+    result = run(argv.datasets, argv.sizes, argv.repeat, argv.seed)
+    if argv.output:
+        with open(argv.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if argv.compare:
+        with open(argv.compare, "r") as f:
+            base = json.load(f)
+        regressions = compare(base, result, argv.threshold)
+        for regression in regressions:
+            print("REGRESSION: " + regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from scatterminal.plot import main
+
+main()
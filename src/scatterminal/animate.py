@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable, Iterator, TextIO
+import collections
+import contextlib
+import math
+import operator
+import os
+import sys
+import time
+
+from scatterminal.data_layer_model import DataScaleType, DataSequence, edge_spaced_range
+from scatterminal.plot import DEFAULT_FPS, STDIN_PATH, _render
+
+_CLEAR_SCREEN = "\x1b[H\x1b[2J"
+
+
+class MonotonicExtremum:
+    # Minimum (or maximum, with operator.gt) of a sliding window in amortized O(1) per point.
+    # The deque keeps (index, value) of the points no later point beats, so its front is the extremum.
+    def __init__(self, better: Callable[[float, float], bool] = operator.lt):
+        self._better = better
+        self._candidates: collections.deque[tuple[int, float]] = collections.deque()
+
+    def push(self, index: int, value: float):
+        while self._candidates and not self._better(self._candidates[-1][1], value):
+            self._candidates.pop()
+        self._candidates.append((index, value))
+
+    def expire(self, first_index: int):
+        # drops the points before first_index, which have left the window
+        while self._candidates and self._candidates[0][0] < first_index:
+            self._candidates.popleft()
+
+    @property
+    def value(self) -> float | None:
+        return self._candidates[0][1] if self._candidates else None
+
+
+class SlidingWindow:
+    # Rows [x, y1, y2, ...] of one source with start <= x < end. x must be non-decreasing, so advancing the window
+    # reads the rows entering at the end and pops the rows leaving at the start; no other row is touched.
+    def __init__(self, rows: Iterable[list[int | float]], column_num: int, positive_only: bool = False):
+        self._rows = iter(rows)
+        self._pending: list[int | float] | None = None  # the first row at or after the end of the window
+        self._window: collections.deque[list[int | float]] = collections.deque()
+        self._first_index = 0
+        self._next_index = 0
+        self._last_x = -math.inf
+        # NaN (and non-positive y on log-scale) is not plotted, so it is left out of the y range
+        self._positive_only = positive_only
+        self._mins = [MonotonicExtremum(operator.lt) for _ in range(column_num)]
+        self._maxs = [MonotonicExtremum(operator.gt) for _ in range(column_num)]
+        self.exhausted = False
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def first_x(self) -> int | float | None:
+        if self._pending is None:
+            self._pending = self._read()
+        return None if self._pending is None else self._pending[0]
+
+    def _read(self) -> list[int | float] | None:
+        for row in self._rows:
+            x = row[0]
+            if math.isnan(x):
+                continue
+            if x < self._last_x:
+                raise ValueError("x must be non-decreasing to animate: %s after %s" % (x, self._last_x))
+            self._last_x = x
+            return row
+        self.exhausted = True
+        return None
+
+    def advance(self, start: float, end: float):
+        while self.first_x() is not None and self._pending[0] < end:
+            row = self._pending
+            self._pending = None
+            index = self._next_index
+            self._next_index += 1
+            self._window.append(row)
+            for y, y_min, y_max in zip(row[1:], self._mins, self._maxs):
+                if math.isnan(y) or (self._positive_only and y <= 0):
+                    continue
+                y_min.push(index, y)
+                y_max.push(index, y)
+
+        while self._window and self._window[0][0] < start:
+            self._window.popleft()
+            self._first_index += 1
+        for extremum in self._mins + self._maxs:
+            extremum.expire(self._first_index)
+
+    def y_range(self) -> tuple[float, float] | None:
+        mins = [m.value for m in self._mins if m.value is not None]
+        maxs = [m.value for m in self._maxs if m.value is not None]
+        if len(mins) == 0:
+            return None
+        return min(mins), max(maxs)
+
+    def to_data_sequences(self, sequences: list[DataSequence]) -> list[DataSequence]:
+        # the markers of a frame are all the points in the window; the bounds above did not need them
+        x = [row[0] for row in self._window]
+        return [seq.derive(x=x, y=[row[i] for row in self._window]) for i, seq in enumerate(sequences, 1)]
+
+
+def _frame_y_range(y_min: float, y_max: float, y_scale: str) -> tuple[float, float]:
+    # a single value (e.g. one point in the window) is centered by edge_spaced_range
+    return edge_spaced_range(y_min, y_max, DataScaleType(y_scale))
+
+
+def iter_frames(
+        streams: list[tuple[list[DataSequence], Iterable[list[int | float]]]],
+        window: float,
+        step: float,
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        terminal_size: os.terminal_size | None = None,
+        color_mode: str = "never"
+) -> Iterator[str]:
+    # streams are (sequences, rows [x, y1, y2, ...]) as returned by `stream_sequences`.
+    # Frame k shows first_x + k * step <= x < first_x + k * step + window; the last frame is the first one
+    # that has read every row. Without y_lim, y is autoscaled to the min/max in the window.
+    if not (window > 0 and step > 0):
+        raise ValueError("Window and step must be positive: window=%g, step=%g" % (window, step))
+    windows = [SlidingWindow(rows, len(sequences), y_scale == "log") for sequences, rows in streams]
+    first_xs = [x for x in (w.first_x() for w in windows) if x is not None]
+    if len(first_xs) == 0:
+        return
+    first_x = min(first_xs)
+
+    y_range = y_lim
+    k = 0
+    while True:
+        start = first_x + k * step
+        end = start + window
+        for w in windows:
+            w.advance(start, end)
+        if y_lim is None:
+            ranges = [r for r in (w.y_range() for w in windows) if r is not None]
+            if len(ranges) > 0:
+                y_range = _frame_y_range(min(r[0] for r in ranges), max(r[1] for r in ranges), y_scale)
+        # frames before the first plottable point have no y range to draw with
+        if y_range is not None:
+            data_sequences = [seq for (sequences, _), w in zip(streams, windows) for seq in w.to_data_sequences(sequences)]
+            yield _render(
+                data_sequences, x_label, y_label, x_scale, y_scale, (start, end), y_range, legend_loc, style,
+                terminal_size=terminal_size, color_mode=color_mode
+            )
+        if all(w.exhausted for w in windows):
+            return
+        k += 1
+        if all(len(w) == 0 for w in windows):
+            # a gap in the data is shown by one empty frame, and the window jumps to the next row
+            next_x = min(x for x in (w.first_x() for w in windows) if x is not None)
+            k = max(k, math.floor((next_x - window - first_x) / step) + 1)
+
+
+def play(
+        frames: Iterable[str],
+        fps: float = DEFAULT_FPS,
+        stream: TextIO | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+) -> int:
+    # Frames are written at most `fps` per second. A frame that takes longer to render is written at once,
+    # and the next one is paced from then instead of bursting to catch up.
+    if not fps > 0:
+        raise ValueError("Frame rate must be positive: %g" % fps)
+    stream = sys.stdout if stream is None else stream
+    interval = 1 / fps
+    next_time = clock()
+    frame_num = 0
+    for frame in frames:
+        now = clock()
+        if next_time > now:
+            sleep(next_time - now)
+        stream.write(_CLEAR_SCREEN + frame + "\n")
+        stream.flush()
+        frame_num += 1
+        next_time = max(next_time, now) + interval
+    return frame_num
+
+
+def animate_csv(
+        file_paths: list[str],
+        window: float,
+        step: float | None = None,
+        fps: float = DEFAULT_FPS,
+        sep: str | None = None,
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        color: str = "auto",
+        fields: list[str] | None = None
+) -> int:
+    # replays time-ordered files as frames of a sliding x window (step defaults to a tenth of the window);
+    # the rows are read as the window reaches them. Returns the number of frames.
+    import shutil
+    from scatterminal.color import resolve_color_mode
+    from scatterminal.csv_parser import iter_rows, stream_sequences
+
+    if len(file_paths) == 0:
+        raise ValueError("Specify at least one file")
+    step = window / 10 if step is None else step
+    with contextlib.ExitStack() as stack:
+        streams = []
+        next_id = 0
+        for file_path in file_paths:
+            if file_path == STDIN_PATH:
+                rows = iter_rows(sys.stdin, None, sep, fields)
+            else:
+                rows = iter_rows(stack.enter_context(open(file_path, "r")), file_path.split(".")[-1], sep, fields)
+            sequences, values_iter = stream_sequences(rows, next_id)
+            next_id += len(sequences)
+            streams.append((sequences, values_iter))
+        frames = iter_frames(
+            streams, window, step, x_label, y_label, x_scale, y_scale, y_lim, legend_loc, style,
+            terminal_size=shutil.get_terminal_size(), color_mode=resolve_color_mode(color, sys.stdout)
+        )
+        return play(frames, fps)
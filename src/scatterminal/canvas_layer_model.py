@@ -1,12 +1,16 @@
-from typing import Type
+from typing import Iterator, Type
 import abc
+import bisect
 import dataclasses
+import datetime
 from enum import Enum
+import functools
 import shutil
 import os
 import math
 import warnings
 
+import scatterminal.color as color
 from scatterminal.common import log, exp, abs_to_rel
 import scatterminal.terminal_layer_model as terminal
 
@@ -15,9 +19,60 @@ def _quantize(rel_value: float, grid_num: int) -> int:
     return round(rel_value * (grid_num - 1))
 
 
+def _clip_segment(x0: float, y0: float, x1: float, y1: float) -> tuple[float, float, float, float] | None:
+    # Liang-Barsky clipping to the relative canvas [0, 1] x [0, 1]
+    if math.isnan(x0 + y0 + x1 + y1):
+        return None
+    t0, t1 = 0.0, 1.0
+    dx = x1 - x0
+    dy = y1 - y0
+    for p, q in ((-dx, x0), (dx, 1 - x0), (-dy, y0), (dy, 1 - y0)):
+        if p == 0:
+            if q < 0:
+                # parallel to and outside of this edge
+                return None
+            continue
+        t = q / p
+        if p < 0:
+            if t > t1:
+                return None
+            t0 = max(t0, t)
+        else:
+            if t < t0:
+                return None
+            t1 = min(t1, t)
+    return x0 + t0 * dx, y0 + t0 * dy, x0 + t1 * dx, y0 + t1 * dy
+
+
+def _rasterize_segment(x0: int, y0: int, x1: int, y1: int) -> list[tuple[int, int]]:
+    # integer Bresenham line including both end points
+    cells = []
+    dx = abs(x1 - x0)
+    dy = -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx + dy
+    while True:
+        cells.append((x0, y0))
+        if x0 == x1 and y0 == y1:
+            return cells
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x0 += sx
+        if e2 <= dx:
+            err += dx
+            y0 += sy
+
+
 class TerminalConvertible(metaclass=abc.ABCMeta):
     @abc.abstractmethod
-    def to_terminal(self, plot_type: Type[terminal.Plottable]) -> terminal.Plottable:
+    def to_terminal(
+            self,
+            plot_type: Type[terminal.Plottable],
+            terminal_size: os.terminal_size | None = None,
+            color_mode: str = "never"
+    ) -> terminal.Plottable:
         pass
 
 
@@ -35,6 +90,13 @@ class CanvasMarker(CanvasPoint):
 class CanvasScaleType(str, Enum):
     linear = "linear"
     log = "log"
+    time = "time"
+
+
+class CanvasPlotStyle(str, Enum):
+    scatter = "scatter"
+    line = "line"
+    bar = "bar"
 
 
 class _TerminalSize:
@@ -99,7 +161,7 @@ class CanvasAxis:
         tick_labels = []
         tick_grid_set = set()
         for label, val in label_and_values:
-            if self.scale == CanvasScaleType.linear:
+            if self.scale != CanvasScaleType.log:
                 rel = abs_to_rel(val, min_and_max[1] - min_and_max[0], min_and_max[0])
             else:
                 rel = abs_to_rel(log(val), log(min_and_max[1]) - log(min_and_max[0]), log(min_and_max[0]))
@@ -148,7 +210,7 @@ class CanvasAxis:
         tick_labels = []
         tick_grid_set = set()
         for label, val in label_and_values:
-            if self.scale == CanvasScaleType.linear:
+            if self.scale != CanvasScaleType.log:
                 rel = abs_to_rel(val, min_and_max[1] - min_and_max[0], min_and_max[0])
             else:
                 rel = abs_to_rel(log(val), log(min_and_max[1]) - log(min_and_max[0]), log(min_and_max[0]))
@@ -188,7 +250,14 @@ class CanvasAxis:
         return terminal.TerminalXAxis(axis_lines, tick_labels, axis_label)
 
     def calc_tick(self, primary_limit: int = 20, secondary_limit: int = 10) -> list[tuple[str, float]]:
+        return list(_calc_tick_cached(self, primary_limit, secondary_limit))
+
+    def _calc_tick(self, primary_limit: int, secondary_limit: int) -> list[tuple[str, float]]:
         min_and_max = (self.min_, self.max_)
+        if self.scale == CanvasScaleType.time:
+            # (20, 10) -> 10, (17, -1) -> 4, (-1, -1) -> 2 ticks at most
+            max_tick_num = secondary_limit if secondary_limit > 0 else max(primary_limit // 4, 2)
+            return _calc_time_tick(*min_and_max, max_tick_num)
         if self.scale == CanvasScaleType.linear:
             ticks = self._calc_linear_tick(*min_and_max, *(primary_limit, secondary_limit))
         else:
@@ -261,6 +330,76 @@ class CanvasAxis:
         )
 
 
+_TIME_STEPS_SECONDS = (
+    1, 2, 5, 10, 15, 30,
+    60, 2 * 60, 5 * 60, 10 * 60, 15 * 60, 30 * 60,
+    3600, 2 * 3600, 3 * 3600, 6 * 3600, 12 * 3600,
+    86400, 2 * 86400, 7 * 86400, 14 * 86400,
+)
+_TIME_STEPS_MONTHS = (1, 2, 3, 6, 12, 24, 60, 120, 240, 600, 1200)
+
+
+def _calc_time_tick(min_: float, max_: float, max_tick_num: int) -> list[tuple[str, float]]:
+    # Ticks on round times (UTC) from the smallest step that gives at most max_tick_num ticks.
+    # Weeks are counted from the epoch (a Thursday) like the other fixed-length steps.
+    min_dt = datetime.datetime.fromtimestamp(min_, datetime.timezone.utc)
+    max_dt = datetime.datetime.fromtimestamp(max_, datetime.timezone.utc)
+
+    ticks = []
+    ticks_in_months = False
+    for step in _TIME_STEPS_SECONDS:
+        if (max_ - min_) / step <= max_tick_num:
+            first = math.ceil(min_ / step) * step
+            ticks = [float(t) for t in range(first, int(math.floor(max_)) + 1, step)]
+            break
+    else:
+        ticks_in_months = True
+        for step in _TIME_STEPS_MONTHS:
+            months = (max_dt.year - min_dt.year) * 12 + max_dt.month - min_dt.month
+            if months / step <= max_tick_num or step == _TIME_STEPS_MONTHS[-1]:
+                break
+        index = math.ceil((min_dt.year * 12 + min_dt.month - 1) / step) * step
+        while True:
+            tick = datetime.datetime(index // 12, index % 12 + 1, 1, tzinfo=datetime.timezone.utc).timestamp()
+            if tick > max_:
+                break
+            if tick >= min_:
+                ticks.append(tick)
+            index += step
+
+    if len(ticks) == 0:
+        # shorter than the smallest step
+        ticks = [min_]
+
+    if ticks_in_months:
+        format_ = "%Y" if step % 12 == 0 else "%Y-%m"
+    elif step >= 86400:
+        format_ = "%Y-%m-%d"
+    elif step >= 60:
+        format_ = "%H:%M" if min_dt.date() == max_dt.date() else "%m-%d %H:%M"
+    else:
+        format_ = "%H:%M:%S"
+    return [(datetime.datetime.fromtimestamp(t, datetime.timezone.utc).strftime(format_), t) for t in ticks]
+
+
+@functools.lru_cache(maxsize=256)
+def _calc_tick_cached(axis: CanvasAxis, primary_limit: int, secondary_limit: int) -> tuple[tuple[str, float], ...]:
+    return tuple(axis._calc_tick(primary_limit, secondary_limit))
+
+
+def _fit_x_ticks(axis: CanvasAxis, max_total_label_size: float) -> tuple[tuple[str, float], ...]:
+    # Lowering (primary, secondary) from the default (20, 10) to (17, 7), (16, 6), ... step by step
+    # only ever coarsens the tick scale (x1 -> x2.5 -> x5), so these three limits visit every distinct result
+    # in the same order without the unbounded loop.
+    ticks = ()
+    for primary, secondary in ((20, 10), (17, -1), (-1, -1)):
+        ticks = _calc_tick_cached(axis, primary, secondary)
+        if sum(len(label) for label, _ in ticks) <= max_total_label_size:
+            return ticks
+    # even the coarsest ticks overflow; use them anyway
+    return ticks
+
+
 @dataclasses.dataclass(frozen=True)
 class CanvasLegendElement:
     marker_group_id: int
@@ -278,28 +417,38 @@ class CanvasLegend:
     legend_elements: list[CanvasLegendElement]
     loc: CanvasLegendLoc
 
-    def gen_right_legend(self, marker_char_dict: dict[int, str]) -> tuple[tuple[int, int], terminal.TerminalLegend]:
+    def gen_right_legend(
+            self,
+            marker_char_dict: dict[int, str],
+            terminal_size: os.terminal_size,
+            marker_color_dict: dict[int, int] | None = None
+    ) -> tuple[tuple[int, int], terminal.TerminalLegend]:
         legend_element_strings = [f"{marker_char_dict[le.marker_group_id]}: {le.sequence_name}" for le in self.legend_elements]
+        legend_colors = self._legend_colors(marker_color_dict)
         max_legend_size = max(map(len, legend_element_strings))
 
-        _terminal_size = shutil.get_terminal_size()
         legend_labels = []
         for i_line in range(len(legend_element_strings)):
-            x = _terminal_size.columns - max_legend_size
-            y = _terminal_size.lines - i_line - 2
+            x = terminal_size.columns - max_legend_size
+            y = terminal_size.lines - i_line - 2
             legend_labels.append(
-                terminal.TerminalLabel(x, y, legend_element_strings[i_line])
+                terminal.TerminalLabel(x, y, legend_element_strings[i_line], color=legend_colors[i_line])
             )
 
         return (max_legend_size, 0), terminal.TerminalLegend(legend_labels)
 
-    def gen_lower_legend(self, marker_char_dict: dict[int, str]) -> tuple[tuple[int, int], terminal.TerminalLegend]:
+    def gen_lower_legend(
+            self,
+            marker_char_dict: dict[int, str],
+            terminal_size: os.terminal_size,
+            marker_color_dict: dict[int, int] | None = None
+    ) -> tuple[tuple[int, int], terminal.TerminalLegend]:
         legend_element_strings = [f"{marker_char_dict[le.marker_group_id]}: {le.sequence_name}" for le in self.legend_elements]
+        legend_colors = self._legend_colors(marker_color_dict)
         max_legend_size = max(map(len, legend_element_strings))
 
         space = 2
-        _terminal_size = shutil.get_terminal_size()
-        max_legend_num_per_line = _terminal_size.columns // (max_legend_size + space)  # 1行に表示できる最大legend数
+        max_legend_num_per_line = terminal_size.columns // (max_legend_size + space)  # 1行に表示できる最大legend数
         legend_line_num = int(math.ceil(len(legend_element_strings) / max_legend_num_per_line))
         legend_labels = []
         for i_line in range(legend_line_num):
@@ -312,12 +461,56 @@ class CanvasLegend:
                     break
                 legend = legend_element_strings[index]
                 legend_labels.append(
-                    terminal.TerminalLabel(x, y, legend)
+                    terminal.TerminalLabel(x, y, legend, color=legend_colors[index])
                 )
                 x += len(legend) + space
 
         return (0, legend_line_num), terminal.TerminalLegend(legend_labels)
 
+    def _legend_colors(self, marker_color_dict: dict[int, int] | None) -> list[int | None]:
+        if not marker_color_dict:
+            return [None] * len(self.legend_elements)
+        return [marker_color_dict.get(le.marker_group_id) for le in self.legend_elements]
+
+
+# The frame skeleton (ticks, axes and legend) only depends on these hashable arguments,
+# so repeated renders (live, watch, batch) reuse it and only the markers are projected again.
+# The cached terminal objects are shared between frames and must be treated as read-only.
+@functools.lru_cache(maxsize=32)
+def _gen_layout(
+        x_axis: CanvasAxis,
+        y_axis: CanvasAxis,
+        legend_elements: tuple[CanvasLegendElement, ...],
+        legend_loc: CanvasLegendLoc,
+        marker_chars: tuple[tuple[int, str], ...],
+        terminal_size: os.terminal_size,
+        marker_colors: tuple[tuple[int, int], ...] = ()
+) -> tuple[_TerminalSize, terminal.TerminalXAxis, terminal.TerminalYAxis, terminal.TerminalLegend | None]:
+    legend = CanvasLegend(list(legend_elements), legend_loc)
+    marker_char_dict = dict(marker_chars)
+    marker_color_dict = dict(marker_colors)
+
+    # generate legend
+    if legend.loc == CanvasLegendLoc.right:
+        legend_offsets, terminal_legend = legend.gen_right_legend(marker_char_dict, terminal_size, marker_color_dict)
+    elif legend.loc == CanvasLegendLoc.lower:
+        legend_offsets, terminal_legend = legend.gen_lower_legend(marker_char_dict, terminal_size, marker_color_dict)
+    else:
+        legend_offsets: tuple[int, int] = 0, 0
+        terminal_legend = None
+
+    # generate y axis
+    tick_label_and_values_y = y_axis.calc_tick()
+    max_label_size_y = max(len(tick_label_and_value[0]) for tick_label_and_value in tick_label_and_values_y)
+    canvas_terminal_size = _TerminalSize(terminal_size, max_label_size_y, y_axis.name is not None, *legend_offsets)
+    terminal_y_axis = y_axis.gen_y_axis(tick_label_and_values_y, canvas_terminal_size)
+
+    # generate x axis
+    tick_label_and_values_x = list(_fit_x_ticks(x_axis, canvas_terminal_size.columns / 2))
+    terminal_x_axis = x_axis.gen_x_axis(tick_label_and_values_x, canvas_terminal_size)
+
+    return canvas_terminal_size, terminal_x_axis, terminal_y_axis, terminal_legend
+
 
 @dataclasses.dataclass(frozen=True)
 class Canvas(TerminalConvertible):
@@ -325,58 +518,145 @@ class Canvas(TerminalConvertible):
     x_axis: CanvasAxis
     y_axis: CanvasAxis
     legend: CanvasLegend
+    style: CanvasPlotStyle = CanvasPlotStyle.scatter
 
-    def to_terminal(self, plot_type: Type[terminal.Plottable]) -> terminal.Plottable:
-        # generate marker dict
-        marker_char_dict = self._gen_marker_char_dict(set(marker.marker_group_id for marker in self.markers), plot_type.get_marker_chars())
+    def to_terminal(
+            self,
+            plot_type: Type[terminal.Plottable],
+            terminal_size: os.terminal_size | None = None,
+            color_mode: str = "never"
+    ) -> terminal.Plottable:
+        if terminal_size is None:
+            terminal_size = shutil.get_terminal_size()
 
-        # generate legend
-        if self.legend.loc == CanvasLegendLoc.right:
-            legend_offsets, terminal_legend = self.legend.gen_right_legend(marker_char_dict)
-        elif self.legend.loc == CanvasLegendLoc.lower:
-            legend_offsets, terminal_legend = self.legend.gen_lower_legend(marker_char_dict)
-        else:
-            legend_offsets: tuple[int, int] = 0, 0
-            terminal_legend = None
-
-        # generate y axis
-        tick_label_and_values_y = self.y_axis.calc_tick()
-        max_label_size_y = max(len(tick_label_and_value[0]) for tick_label_and_value in tick_label_and_values_y)
-        terminal_size = _TerminalSize(shutil.get_terminal_size(), max_label_size_y, self.y_axis.name is not None, *legend_offsets)
-        terminal_y_axis = self.y_axis.gen_y_axis(tick_label_and_values_y, terminal_size)
-
-        # generate x axis
-        primary, secondary = 18, 8
-        tick_label_and_values_x = self.x_axis.calc_tick()
-        total_label_size_x = sum(len(tick_label_and_value[0]) for tick_label_and_value in tick_label_and_values_x)
-        while total_label_size_x > (terminal_size.columns / 2):
-            primary -= 1
-            secondary -= 1
-            tick_label_and_values_x = self.x_axis.calc_tick(primary, secondary)
-            total_label_size_x = sum(len(tick_label_and_value[0]) for tick_label_and_value in tick_label_and_values_x)
-        terminal_x_axis = self.x_axis.gen_x_axis(tick_label_and_values_x, terminal_size)
+        marker_char_dict, marker_color_dict, layout = self._layout(plot_type, terminal_size, color_mode)
+        terminal_size, terminal_x_axis, terminal_y_axis, terminal_legend = layout
 
         # generate marker
+        if self.style == CanvasPlotStyle.line:
+            cells = self._gen_line_cells(terminal_size.canvas_columns, terminal_size.canvas_lines)
+        elif self.style == CanvasPlotStyle.bar:
+            cells = self._gen_bar_cells(terminal_size.canvas_columns, terminal_size.canvas_lines)
+        else:
+            cells = self._gen_scatter_cells(terminal_size.canvas_columns, terminal_size.canvas_lines)
         terminal_markers = []
-        for marker in self.markers:
-            x = _quantize(marker.x, terminal_size.canvas_columns)
-            y = _quantize(marker.y, terminal_size.canvas_lines)
+        for x, y, group_id in cells:
             terminal_mark = terminal.TerminalMarker(
                 x=terminal_size.from_canvas_to_terminal_columns(x),
                 y=terminal_size.from_canvas_to_terminal_lines(y),
-                char=marker_char_dict[marker.marker_group_id]
+                char=marker_char_dict[group_id],
+                color=marker_color_dict.get(group_id)
             )
             terminal_markers.append(terminal_mark)
 
         return terminal.Terminal(
             terminal_size.lines, terminal_size.columns,
-            terminal_markers, terminal_x_axis, terminal_y_axis, terminal_legend
+            terminal_markers, terminal_x_axis, terminal_y_axis, terminal_legend, color_mode
+        )
+
+    def grid_size(
+            self,
+            plot_type: Type[terminal.Plottable],
+            terminal_size: os.terminal_size,
+            color_mode: str = "never"
+    ) -> tuple[int, int]:
+        # (columns, lines) of the plot area; it does not depend on the markers, only on the axes and the legend
+        _, _, layout = self._layout(plot_type, terminal_size, color_mode)
+        return layout[0].canvas_columns, layout[0].canvas_lines
+
+    def _layout(
+            self,
+            plot_type: Type[terminal.Plottable],
+            terminal_size: os.terminal_size,
+            color_mode: str
+    ) -> tuple[dict[int, str], dict[int, int], tuple]:
+        # generate marker dict
+        marker_group_ids = set(marker.marker_group_id for marker in self.markers)
+        marker_group_ids.update(le.marker_group_id for le in self.legend.legend_elements)
+        color_num = color.palette_size(color_mode)
+        marker_char_dict = self._gen_marker_char_dict(marker_group_ids, plot_type.get_marker_chars(), color_num)
+        marker_color_dict = {gid: gid % color_num for gid in marker_group_ids} if color_num > 0 else {}
+
+        layout = _gen_layout(
+            self.x_axis,
+            self.y_axis,
+            tuple(self.legend.legend_elements),
+            self.legend.loc,
+            tuple(sorted(marker_char_dict.items())),
+            terminal_size,
+            tuple(sorted(marker_color_dict.items()))
         )
+        return marker_char_dict, marker_color_dict, layout
+
+    def _gen_scatter_cells(self, canvas_columns: int, canvas_lines: int) -> Iterator[tuple[int, int, int]]:
+        # markers outside the plot area (fixed axis limits) and NaN are not drawn
+        for marker in self.markers:
+            if not (math.isfinite(marker.x) and math.isfinite(marker.y)):
+                continue
+            x = _quantize(marker.x, canvas_columns)
+            y = _quantize(marker.y, canvas_lines)
+            if 0 <= x < canvas_columns and 0 <= y < canvas_lines:
+                yield x, y, marker.marker_group_id
+
+    def _gen_line_cells(self, canvas_columns: int, canvas_lines: int) -> list[tuple[int, int, int]]:
+        # Consecutive markers of the same group are connected.
+        # Segments are clipped to the canvas first, so the cost is proportional to the drawn cells.
+        group_cells: dict[int, dict[tuple[int, int], None]] = {}
+        previous = None
+        for marker in self.markers:
+            cells = group_cells.setdefault(marker.marker_group_id, {})
+            if (previous is None) or (previous.marker_group_id != marker.marker_group_id):
+                segment = _clip_segment(marker.x, marker.y, marker.x, marker.y)
+            else:
+                segment = _clip_segment(previous.x, previous.y, marker.x, marker.y)
+            previous = marker
+            if segment is None:
+                continue
+            x0, y0, x1, y1 = segment
+            for cell in _rasterize_segment(
+                    _quantize(x0, canvas_columns), _quantize(y0, canvas_lines),
+                    _quantize(x1, canvas_columns), _quantize(y1, canvas_lines)
+            ):
+                # dict as an ordered set: joints of segments are written once
+                cells[cell] = None
+        return [(x, y, group_id) for group_id, cells in group_cells.items() for x, y in cells]
+
+    def _gen_bar_cells(self, canvas_columns: int, canvas_lines: int) -> list[tuple[int, int, int]]:
+        # Each marker is the top of a bar standing on the x axis.
+        # The bar width is the smallest spacing of the markers in the group, so equal bins fill the x axis,
+        # and every column is assigned to the nearest marker so that adjacent bars never leave a gap.
+        group_markers: dict[int, list[CanvasMarker]] = {}
+        for marker in self.markers:
+            if not math.isnan(marker.x + marker.y):
+                group_markers.setdefault(marker.marker_group_id, []).append(marker)
+
+        cells = {}
+        for group_id, markers in group_markers.items():
+            markers = sorted(markers, key=lambda m: m.x)
+            xs = [m.x for m in markers]
+            spacings = [x1 - x0 for x0, x1 in zip(xs, xs[1:]) if x1 > x0]
+            half_width = min(spacings) / 2 if spacings else 0.5 / max(canvas_columns - 1, 1)
+            # column 0 and line 0 are the axes
+            for x in range(1, canvas_columns):
+                rel_x = x / (canvas_columns - 1)
+                i = bisect.bisect_left(xs, rel_x)
+                nearest = min(
+                    (m for m in markers[max(i - 1, 0):i + 1]),
+                    key=lambda m: abs(m.x - rel_x)
+                )
+                if abs(nearest.x - rel_x) > half_width * (1 + 1e-9) or nearest.y <= 0:
+                    continue
+                # a bar of any height is at least one cell
+                y_top = max(_quantize(min(nearest.y, 1.0), canvas_lines), 1)
+                for y in range(1, y_top + 1):
+                    cells[(x, y)] = group_id
+        return [(x, y, group_id) for (x, y), group_id in cells.items()]
 
     @staticmethod
-    def _gen_marker_char_dict(marker_group_ids: set[int], chars: list[str]) -> dict[int, str]:
+    def _gen_marker_char_dict(marker_group_ids: set[int], chars: list[str], color_num: int = 0) -> dict[int, str]:
         char_num = len(chars)
-        if len(marker_group_ids) > char_num:
+        # with colours, a series is identified by the pair of its char and colour
+        if len(marker_group_ids) > char_num * max(color_num, 1):
             warnings.warn("The number of data series exceeds the number of marker types available. "
                           "Then, Markers are reused making data identification difficult.", UserWarning)
 
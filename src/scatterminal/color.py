@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import os
+import sys
+
+COLOR_CHOICES = ("auto", "never", "16", "256", "truecolor")
+RESET = "\x1b[0m"
+
+# The palette sizes are coprime with the 7 marker chars, so (char, colour) pairs repeat only after 7 * size series.
+_PALETTE_16 = ("31", "32", "33", "34", "35", "36", "91", "92", "93", "94", "95", "96")
+_PALETTE_256 = ("196", "46", "33", "226", "201", "51", "208", "118", "99", "220", "205", "37")
+_PALETTE_TRUECOLOR = (
+    (31, 119, 180), (255, 127, 14), (44, 160, 44), (214, 39, 40), (148, 103, 189),
+    (140, 86, 75), (227, 119, 194), (127, 127, 127), (188, 189, 34), (23, 190, 207),
+)
+
+
+def resolve_color_mode(mode: str, stream=None) -> str:
+    # "auto" is colourless when NO_COLOR is set or the output is not a terminal
+    if mode != "auto":
+        return mode
+    stream = sys.stdout if stream is None else stream
+    if os.environ.get("NO_COLOR") or not (hasattr(stream, "isatty") and stream.isatty()):
+        return "never"
+    if os.environ.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return "truecolor"
+    if "256" in os.environ.get("TERM", ""):
+        return "256"
+    return "16"
+
+
+def palette_size(mode: str) -> int:
+    if mode == "16":
+        return len(_PALETTE_16)
+    if mode == "256":
+        return len(_PALETTE_256)
+    if mode == "truecolor":
+        return len(_PALETTE_TRUECOLOR)
+    return 0
+
+
+def escape(mode: str, color_id: int) -> str:
+    if mode == "16":
+        return "\x1b[%sm" % _PALETTE_16[color_id % len(_PALETTE_16)]
+    if mode == "256":
+        return "\x1b[38;5;%sm" % _PALETTE_256[color_id % len(_PALETTE_256)]
+    return "\x1b[38;2;%d;%d;%dm" % _PALETTE_TRUECOLOR[color_id % len(_PALETTE_TRUECOLOR)]
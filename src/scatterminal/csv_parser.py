@@ -1,29 +1,94 @@
-from typing import TextIO
+from typing import Callable, Iterable, Iterator, TextIO
+import array
+import csv
+import itertools
 
 from scatterminal.data_layer_model import DataSequence
+from scatterminal.jsonl_parser import JSON_LINES_EXTENSIONS, iter_json_rows
+from scatterminal.overlay import Overlay, OverlaySpec, overlay_sequences
+from scatterminal.timestamp import detect_parser
 
 ValueType = str | int | float
 
+_SNIFF_CANDIDATES = (",", "\t", ";", "|")
+# lines read ahead to sniff the dialect
+_SNIFF_LINE_NUM = 20
 
-def read_file(file_obj: TextIO, ext: str, sep: str | None) -> list[list[str]]:
+
+def sniff_sep(line: str) -> str:
+    counts = [(line.count(candidate), candidate) for candidate in _SNIFF_CANDIDATES]
+    count, sep = max(counts, key=lambda c: c[0])
+    if count == 0:
+        # single column
+        return ","
+    return sep
+
+
+def sniff_dialect(sample: list[str]) -> type[csv.Dialect]:
+    # delimiter and quoting from the first lines; a single column (nothing to sniff) is read as plain CSV
+    try:
+        return csv.Sniffer().sniff("".join(sample), delimiters="".join(_SNIFF_CANDIDATES))
+    except csv.Error:
+        return csv.excel
+
+
+def _is_padded(line: str, sep: str) -> bool:
+    # spaces before a separator or at the end of the line (csv.reader skips the ones after a separator)
+    return (" " + sep) in line or ("\t" + sep) in line or line.rstrip("\r\n") != line.rstrip()
+
+
+def iter_rows(
+        file_obj: TextIO,
+        ext: str | None,
+        sep: str | None,
+        fields: list[str] | None = None
+) -> Iterator[list[str]]:
+    # `fields` selects the fields of JSON Lines (x first); they are ignored for delimited text.
+    # Rows are split by csv.reader (in C, and aware of quoted cells). A blank line is a row of one empty cell, as it
+    # was with str.split: a NaN in a single column, which keeps the indices of the later points.
+    lines = iter(file_obj)
+    dialect = csv.excel
     if sep is None:
         if ext == "csv":
             sep = ","
         elif ext == "tsv":
             sep = "\t"
+        elif ext in JSON_LINES_EXTENSIONS:
+            yield from iter_json_rows(lines, fields)
+            return
         else:
-            raise ValueError("Failed to estimate separator character. Please specify sep explicitly.")
+            # stream without extension (e.g. stdin) or an unknown extension: sniff from the first lines only
+            sample = list(itertools.islice(lines, _SNIFF_LINE_NUM))
+            if len(sample) == 0:
+                return
+            lines = itertools.chain(sample, lines)
+            if sample[0].lstrip().startswith("{"):
+                yield from iter_json_rows(lines, fields)
+                return
+            dialect = sniff_dialect(sample)
+            sep = dialect.delimiter if dialect is not csv.excel else sniff_sep(sample[0])
+
+    if len(sep) != 1:
+        # csv.reader takes a one-character delimiter
+        for line in lines:
+            yield [cell.strip() for cell in line.split(sep)]
+        return
+    first_line = next(lines, None)
+    if first_line is None:
+        return
+    rows = (row or [""] for row in csv.reader(
+        itertools.chain((first_line,), lines), dialect, delimiter=sep, skipinitialspace=True
+    ))
+    if _is_padded(first_line, sep):
+        rows = ([cell.strip() for cell in row] for row in rows)
+    yield from rows
 
-    lines = file_obj.readlines()
 
-    cell_lines = []
-    for line in lines:
-        cells = [cell.strip() for cell in line.split(sep)]
-        cell_lines.append(cells)
-    return cell_lines
+def read_file(file_obj: TextIO, ext: str | None, sep: str | None) -> list[list[str]]:
+    return list(iter_rows(file_obj, ext, sep))
 
 
-def _parse_cell(v: str) -> ValueType:
+def parse_cell(v: str) -> ValueType:
     if len(v) == 0:
         return float("nan")
     if v.isalpha():
@@ -42,43 +107,248 @@ def _check_col_num(str_cells: list[list[str]]):
         raise ValueError("The length of column is not aligned.")
 
 
-def _check_col_type(column: list[ValueType]):
-    if isinstance(column[0], str):
-        value_column = column[1:]
-    else:
-        value_column = column
+def parse(str_cells: list[list[str]], next_id: int) -> list[DataSequence]:
+    _check_col_num(str_cells)
+    return parse_stream(str_cells, next_id)
 
-    numeric_type_set = {float, int}
-    type_set = set(type(cell) for cell in value_column)
-    if not type_set.issubset(numeric_type_set):
-        raise TypeError("int or float type are only available.")
 
+def _is_label(cell: str) -> bool:
+    # a cell of a header line: neither a number nor a timestamp
+    return isinstance(parse_cell(cell), str) and (detect_parser(cell) is None)
 
-def _has_header(column: list[ValueType]) -> bool:
-    return isinstance(column[0], str)
 
+def _detect_x_parser(cell: str) -> Callable[[str], float] | None:
+    # the x column may hold timestamps; the format is detected once from the first data row
+    if isinstance(parse_cell(cell), str):
+        return detect_parser(cell)
+    return None
 
-def parse(str_cells: list[list[str]], next_id: int) -> list[DataSequence]:
-    _check_col_num(str_cells)
-    # parse and transpose
-    parsed_cells = [[_parse_cell(line[i]) for line in str_cells] for i in range(len(str_cells[0]))]
 
-    _ = tuple(_check_col_type(col) for col in parsed_cells)
-    col_num = len(parsed_cells)
+def _new_column(parse_func: Callable[[str], ValueType]) -> list[int | float] | array.array:
+    # timestamps are kept as float epoch seconds in a compact array
+    return [] if parse_func is parse_cell else array.array("d")
+
+
+def _start_stream(
+        rows: Iterable[list[str]]
+) -> tuple[list[str] | None, Iterator[list[str]], list[Callable[[str], ValueType]]]:
+    # returns (header line or None, data rows, parse function of each column)
+    row_iter = iter(rows)
+    first_row = next(row_iter, None)
+    if first_row is None:
+        raise ValueError("No data to parse.")
+
+    col_num = len(first_row)
+    has_header = any(_is_label(cell) for cell in first_row)
+    if not has_header:
+        row_iter = itertools.chain((first_row,), row_iter)
+
+    parse_funcs: list[Callable[[str], ValueType]] = [parse_cell] * col_num
+    first_data = next(row_iter, None)
+    if first_data is not None:
+        row_iter = itertools.chain((first_data,), row_iter)
+        x_parser = _detect_x_parser(first_data[0]) if col_num > 1 else None
+        if x_parser is not None:
+            parse_funcs[0] = x_parser
+    return (first_row if has_header else None), row_iter, parse_funcs
+
+
+def _iter_parsed(row_iter: Iterator[list[str]], parse_funcs: list[Callable[[str], ValueType]]) -> Iterator[list[int | float]]:
+    col_num = len(parse_funcs)
+    for row in row_iter:
+        if len(row) != col_num:
+            raise ValueError("The length of column is not aligned.")
+        values = [parse_func(cell) for parse_func, cell in zip(parse_funcs, row)]
+        if any(isinstance(value, str) for value in values):
+            raise TypeError("int or float type are only available.")
+        yield values
+
 
-    has_header = any(_has_header(col) for col in parsed_cells)
-    header_line = str_cells[0] if has_header else [None] * col_num
-    content_slice = slice(int(has_header), None)
+def iter_values(
+        rows: Iterable[list[str]],
+        skip_labels: bool = False
+) -> tuple[list[str | None], Iterator[list[int | float]]]:
+    # header line and parsed rows, for consumers that do not keep the columns (e.g. statistics).
+    # With skip_labels, columns whose first value is a label (e.g. host names) are left out.
+    header_line, row_iter, parse_funcs = _start_stream(rows)
+    if header_line is None:
+        header_line = [None] * len(parse_funcs)
+    if not skip_labels:
+        return header_line, _iter_parsed(row_iter, parse_funcs)
+
+    first_data = next(row_iter, None)
+    if first_data is None:
+        return header_line, iter(())
+    row_iter = itertools.chain((first_data,), row_iter)
+    kept = [i for i, (parse_func, cell) in enumerate(zip(parse_funcs, first_data)) if not isinstance(parse_func(cell), str)]
+    kept_rows = ([row[i] for i in kept] if len(row) == len(parse_funcs) else row for row in row_iter)
+    return [header_line[i] for i in kept], _iter_parsed(kept_rows, [parse_funcs[i] for i in kept])
+
+
+def parse_stream(rows: Iterable[list[str]], next_id: int, overlay_spec: OverlaySpec | None = None) -> list[DataSequence]:
+    # row-by-row equivalent of `parse`: only the parsed columns are kept in memory.
+    # Overlays (rolling mean, fit) are fed in the same pass and appended after the data sequences.
+    header_line, row_iter, parse_funcs = _start_stream(rows)
+    col_num = len(parse_funcs)
+    if header_line is None:
+        header_line = [None] * col_num
+    columns = [_new_column(parse_func) for parse_func in parse_funcs]
+    y_cols = list(range(1, col_num)) if col_num > 1 else [0]
+    overlays = [overlay_spec.new_overlays() for _ in y_cols] if overlay_spec is not None else []
+
+    for row in row_iter:
+        if len(row) != col_num:
+            raise ValueError("The length of column is not aligned.")
+        for column, parse_func, cell in zip(columns, parse_funcs, row):
+            value = parse_func(cell)
+            if isinstance(value, str):
+                raise TypeError("int or float type are only available.")
+            column.append(value)
+        if overlays:
+            x = columns[0][-1] if col_num > 1 else len(columns[0]) - 1
+            for col, col_overlays in zip(y_cols, overlays):
+                for overlay in col_overlays:
+                    overlay.add(x, columns[col][-1])
 
     if col_num == 1:
-        content = parsed_cells[0][content_slice]
-        return [DataSequence(list(range(len(content))), content, next_id, header_line[0], None)]
-    return [
-        DataSequence(
-            parsed_cells[0][content_slice],
-            parsed_cells[i][content_slice],
-            next_id + i - 1,
-            header_line[i],
-            header_line[0]
-        ) for i in range(1, col_num)
+        data_sequences = [DataSequence.trusted(list(range(len(columns[0]))), columns[0], next_id, header_line[0], None)]
+    else:
+        x_time = parse_funcs[0] is not parse_cell
+        data_sequences = [
+            DataSequence.trusted(columns[0], columns[i], next_id + i - 1, header_line[i], header_line[0], x_time)
+            for i in range(1, col_num)
+        ]
+    return data_sequences + overlay_sequences(list(zip(data_sequences, overlays)), next_id + len(data_sequences))
+
+
+def stream_sequences(
+        rows: Iterable[list[str]],
+        next_id: int
+) -> tuple[list[DataSequence], Iterator[list[int | float]]]:
+    # The sequences `parse_stream` would return, without their values (x and y are empty), and the parsed rows
+    # [x, y1, y2, ...] for consumers that do not keep them. A single column gets its row index as x.
+    header_line, row_iter, parse_funcs = _start_stream(rows)
+    col_num = len(parse_funcs)
+    if header_line is None:
+        header_line = [None] * col_num
+    values_iter = _iter_parsed(row_iter, parse_funcs)
+    if col_num == 1:
+        sequences = [DataSequence.trusted([], [], next_id, header_line[0], None)]
+        return sequences, ([i, values[0]] for i, values in enumerate(values_iter))
+    x_time = parse_funcs[0] is not parse_cell
+    sequences = [
+        DataSequence.trusted([], [], next_id + i - 1, header_line[i], header_line[0], x_time)
+        for i in range(1, col_num)
     ]
+    return sequences, values_iter
+
+
+def _find_column(first_row: list[str], column: str) -> tuple[int, bool]:
+    # returns (index of the column, whether the first row is a header); column is a header name or an index
+    if column.isdigit() and int(column) < len(first_row):
+        col = int(column)
+        has_header = any(_is_label(cell) for i, cell in enumerate(first_row) if i != col)
+        return col, has_header
+    if column in first_row:
+        return first_row.index(column), True
+    raise ValueError("Column is not found: %s" % column)
+
+
+def parse_grouped_stream(
+        rows: Iterable[list[str]],
+        group_by: str,
+        next_id: int,
+        overlay_spec: OverlaySpec | None = None
+) -> list[DataSequence]:
+    # long format (e.g. `timestamp,host,latency`): rows are partitioned by the value of the group column
+    row_iter = iter(rows)
+    first_row = next(row_iter, None)
+    if first_row is None:
+        raise ValueError("No data to parse.")
+
+    col_num = len(first_row)
+    group_col, has_header = _find_column(first_row, group_by)
+    value_cols = [i for i in range(col_num) if i != group_col]
+    if len(value_cols) == 0:
+        raise ValueError("No value column except the group-by column.")
+    header_line = first_row if has_header else [None] * col_num
+    if not has_header:
+        row_iter = itertools.chain((first_row,), row_iter)
+
+    parse_funcs: list[Callable[[str], ValueType]] = [parse_cell] * len(value_cols)
+    first_data = next(row_iter, None)
+    if first_data is not None:
+        row_iter = itertools.chain((first_data,), row_iter)
+        x_parser = _detect_x_parser(first_data[value_cols[0]]) if len(value_cols) > 1 else None
+        if x_parser is not None:
+            parse_funcs[0] = x_parser
+
+    # key -> one buffer per value column; dict keeps the order of first appearance
+    groups: dict[str, list[list[int | float]]] = {}
+    # key -> overlays of each y column
+    group_overlays: dict[str, list[list[Overlay]]] = {}
+    y_buffer_start = 1 if len(value_cols) > 1 else 0
+    for row in row_iter:
+        if len(row) != col_num:
+            raise ValueError("The length of column is not aligned.")
+        key = row[group_col]
+        buffers = groups.get(key)
+        if buffers is None:
+            buffers = groups[key] = [_new_column(parse_func) for parse_func in parse_funcs]
+            if overlay_spec is not None:
+                group_overlays[key] = [overlay_spec.new_overlays() for _ in buffers[y_buffer_start:]]
+        for buffer, parse_func, col in zip(buffers, parse_funcs, value_cols):
+            value = parse_func(row[col])
+            if isinstance(value, str):
+                raise TypeError("int or float type are only available.")
+            buffer.append(value)
+        if overlay_spec is not None:
+            x = buffers[0][-1] if y_buffer_start == 1 else len(buffers[0]) - 1
+            for buffer, overlays in zip(buffers[y_buffer_start:], group_overlays[key]):
+                for overlay in overlays:
+                    overlay.add(x, buffer[-1])
+
+    data_sequences = []
+    overlay_sources = []
+    if len(value_cols) == 1:
+        for key, (ys,) in groups.items():
+            data_sequences.append(DataSequence.trusted(list(range(len(ys))), ys, next_id + len(data_sequences), key, None))
+            overlay_sources.extend(zip([data_sequences[-1]], group_overlays.get(key, [])))
+        return data_sequences + overlay_sequences(overlay_sources, next_id + len(data_sequences))
+
+    x_name = header_line[value_cols[0]]
+    x_time = parse_funcs[0] is not parse_cell
+    y_cols = value_cols[1:]
+    for key, buffers in groups.items():
+        for col, ys in zip(y_cols, buffers[1:]):
+            if len(y_cols) == 1:
+                name = key
+            else:
+                name = "%s %s" % (key, col if header_line[col] is None else header_line[col])
+            data_sequences.append(DataSequence.trusted(buffers[0], ys, next_id + len(data_sequences), name, x_name, x_time))
+        overlay_sources.extend(zip(data_sequences[-len(y_cols):], group_overlays.get(key, [])))
+    return data_sequences + overlay_sequences(overlay_sources, next_id + len(data_sequences))
+
+
+def column_name(first_row: list[str], column: str) -> str:
+    # the header name of a column given by name or index; an index stays as it is without a header
+    col, has_header = _find_column(first_row, column)
+    return first_row[col] if has_header else column
+
+
+def iter_column(rows: Iterable[list[str]], column: str) -> Iterator[int | float]:
+    # values of one column, e.g. for a histogram; nothing but the current row is kept in memory
+    row_iter = iter(rows)
+    first_row = next(row_iter, None)
+    if first_row is None:
+        return
+    col, has_header = _find_column(first_row, column)
+    if not has_header:
+        row_iter = itertools.chain((first_row,), row_iter)
+    for row in row_iter:
+        if len(row) <= col:
+            raise ValueError("The length of column is not aligned.")
+        value = parse_cell(row[col])
+        if isinstance(value, str):
+            raise TypeError("int or float type are only available.")
+        yield value
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+# This module is imported by the thin client, so only light-weight modules are imported at the top level.
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+
+from scatterminal.color import resolve_color_mode
+
+SOCKET_ENV_NAME = "SCATTERMINAL_SOCKET"
+_HELP_ARGS = {"-h", "--help"}
+_REQUEST_WARNINGS = threading.local()
+
+
+def default_socket_path() -> str:
+    env_path = os.environ.get(SOCKET_ENV_NAME)
+    if env_path:
+        return env_path
+    return os.path.join(tempfile.gettempdir(), "scatterminal-%d.sock" % os.getuid())
+
+
+def request(
+        argv: list[str],
+        socket_path: str | None = None,
+        cwd: str | None = None,
+        terminal_size: os.terminal_size | None = None
+) -> dict:
+    if terminal_size is None:
+        terminal_size = shutil.get_terminal_size()
+    payload = {
+        "argv": argv,
+        "cwd": os.getcwd() if cwd is None else cwd,
+        "columns": terminal_size.columns,
+        "lines": terminal_size.lines,
+        # "auto" depends on the client's stdout and environment
+        "color_mode": resolve_color_mode("auto", sys.stdout),
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def _split_client_args(args: list[str]) -> tuple[list[str], str | None]:
+    forwarded = []
+    socket_path = None
+    arg_iter = iter(args)
+    for arg in arg_iter:
+        if arg == "--client":
+            continue
+        if arg == "--socket":
+            socket_path = next(arg_iter, None)
+        elif arg.startswith("--socket="):
+            socket_path = arg[len("--socket="):]
+        else:
+            forwarded.append(arg)
+    return forwarded, socket_path
+
+
+def client_main(args: list[str]) -> bool:
+    # Returns False when the call has to be handled locally (no daemon, help, stdin input)
+    forwarded, socket_path = _split_client_args(args)
+    if _HELP_ARGS.intersection(forwarded) or "-" in forwarded:
+        return False
+    try:
+        response = request(forwarded, socket_path)
+    except (OSError, ValueError):
+        return False
+    if response.get("fallback"):
+        return False
+
+    for message in response.get("warnings", []):
+        # formatted as warnings.showwarning does, so the output is the same as without the daemon
+        sys.stderr.write(message)
+    if response.get("out"):
+        sys.stdout.write(response["out"] + "\n")
+    if response.get("err"):
+        sys.stderr.write(response["err"] + "\n")
+    if response["status"] != 0:
+        sys.exit(response["status"])
+    return True
+
+
+class _ParsedFileCache:
+    def __init__(self, max_entries: int = 64):
+        import collections
+
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+
+    def read(
+            self,
+            file_path: str,
+            sep: str | None,
+            next_id: int,
+            group_by: str | None = None,
+            overlay_spec=None,
+            fields: list[str] | None = None
+    ) -> list:
+        from scatterminal.plot import _read_file_path
+
+        stat = os.stat(file_path)
+        # the sequences are cached with their IDs, so a hit returns the same objects and their computed stats
+        key = (
+            os.path.realpath(file_path), sep, next_id, group_by, overlay_spec, None if fields is None else tuple(fields)
+        )
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                sequences = entry[1]
+            else:
+                sequences = None
+
+        if sequences is None:
+            sequences = _read_file_path(file_path, sep, next_id, group_by, overlay_spec, fields)
+            with self._lock:
+                self._entries[key] = (stamp, sequences)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return sequences
+
+
+def _route_warnings():
+    # The warnings of a request go back to its client. They are recorded by the thread of the request, so requests
+    # are still handled concurrently, and shown on every request (once each, as by a new process).
+    import warnings
+
+    show = warnings.showwarning
+
+    def showwarning(message, category, filename, lineno, file=None, line=None):
+        records = getattr(_REQUEST_WARNINGS, "records", None)
+        if records is None:
+            show(message, category, filename, lineno, file, line)
+            return
+        formatted = warnings.formatwarning(message, category, filename, lineno, line)
+        if formatted not in records:
+            records.append(formatted)
+
+    warnings.showwarning = showwarning
+    warnings.simplefilter("always")
+
+
+def _handle_request(payload: dict, cache: _ParsedFileCache) -> dict:
+    import argparse
+    from scatterminal import plot
+
+    class _RequestArgumentParser(argparse.ArgumentParser):
+        def error(self, message):
+            raise ValueError(message)
+
+    try:
+        parser = plot._build_parser(_RequestArgumentParser)
+        argv = parser.parse_args(payload["argv"])
+        plot._check_clip(parser, argv)
+        if len(argv.file_path) == 0 or plot.STDIN_PATH in argv.file_path or argv.sqlite \
+                or argv.facet or argv.hist or argv.stats or argv.animate or argv.profile:
+            # stdin of the client is not forwarded, and grids, histograms, stats, animations and profiles
+            # are written by the client itself
+            return {"status": 0, "fallback": True}
+        file_paths = [os.path.join(payload["cwd"], file_path) for file_path in argv.file_path]
+        terminal_size = os.terminal_size((payload["columns"], payload["lines"]))
+        color_mode = payload.get("color_mode", "never") if argv.color == "auto" else argv.color
+        _REQUEST_WARNINGS.records = []
+        data_sequences = plot._read_sequences(
+            file_paths, argv.sep, cache.read, argv.group_by, plot._overlay_spec(argv.rolling, argv.fit), argv.fields
+        )
+        out = plot._render(
+            data_sequences, **plot._plot_kwargs(argv), terminal_size=terminal_size, color_mode=color_mode,
+            workers=argv.workers
+        )
+        response = {"status": 0, "out": out}
+        if len(_REQUEST_WARNINGS.records) > 0:
+            response["warnings"] = _REQUEST_WARNINGS.records
+        return response
+    except Exception as e:
+        return {"status": 1, "err": "%s: %s" % (type(e).__name__, e)}
+    finally:
+        _REQUEST_WARNINGS.records = None
+
+
+def create_server(socket_path: str | None = None):
+    import socketserver
+
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(socket_path)
+            except OSError:
+                # stale socket file of a dead daemon
+                os.unlink(socket_path)
+            else:
+                raise RuntimeError("Daemon is already running: %s" % socket_path)
+
+    class _RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            payload = json.loads(self.rfile.readline())
+            response = _handle_request(payload, self.server.cache)
+            self.wfile.write(json.dumps(response).encode())
+
+    class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        cache = _ParsedFileCache()
+
+        def server_close(self):
+            super().server_close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    _route_warnings()
+    # only the user may connect: the socket is created with mode 0600
+    umask = os.umask(0o177)
+    try:
+        return _DaemonServer(socket_path, _RequestHandler)
+    finally:
+        os.umask(umask)
+
+
+def serve(socket_path: str | None = None):
+    import signal
+
+    server = create_server(socket_path)
+    # make `kill` remove the socket file as well
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
-from typing import Callable, Type
+from typing import Callable, Iterable, Type, TYPE_CHECKING
 import abc
+import array
 import dataclasses
 from enum import Enum
+import functools
+import itertools
+import math
+import operator
 import warnings
 
 from scatterminal.common import log, abs_to_rel
-import scatterminal.canvas_layer_model as canvas
+from scatterminal.stats import QuantileSketch
+
+if TYPE_CHECKING:
+    import scatterminal.canvas_layer_model as canvas
+
+_AUTOSCALE_SKETCH_K = 1000  # rank error about 0.1%
 
 
 class CanvasConvertible(metaclass=abc.ABCMeta):
@@ -18,14 +28,75 @@ class CanvasConvertible(metaclass=abc.ABCMeta):
 
 @dataclasses.dataclass(frozen=True)
 class SimpleDataSequence:
-    x: list[int | float]
-    y: list[int | float]
+    # x and y are lists, or iterables (e.g. generators) that are consumed once
+    x: list[int | float] | Iterable[int | float]
+    y: list[int | float] | Iterable[int | float]
     name: str | None = None
 
+    @property
+    def is_lazy(self) -> bool:
+        return not (hasattr(self.x, "__len__") and hasattr(self.y, "__len__"))
+
+    def pairs(self) -> Iterable[tuple[int | float, int | float]]:
+        return zip(self.x, self.y, strict=True)
+
     def to_data_sequence(self, seq_id: int) -> DataSequence:
+        if self.is_lazy:
+            return consume_pairs(self.pairs(), seq_id, self.name)
         return DataSequence(self.x, self.y, seq_id, self.name)
 
 
+def consume_pairs(pairs: Iterable[tuple[int | float, int | float]], seq_id: int, name: str | None = None) -> DataSequence:
+    # One pass into compact float buffers (16 bytes per point instead of two boxed floats and list slots).
+    # The buffers only accept numbers, so no validation pass is needed afterwards.
+    xs = array.array("d")
+    ys = array.array("d")
+    append_x = xs.append
+    append_y = ys.append
+    try:
+        for x, y in pairs:
+            append_x(x)
+            append_y(y)
+    except TypeError:
+        raise TypeError("x and y must be int | float: seq_id={0}".format(seq_id)) from None
+    return DataSequence.trusted(xs, ys, seq_id, name)
+
+
+@dataclasses.dataclass(frozen=True)
+class DataSequenceStats:
+    # NaN points (NaN in x or y) are counted but left out of the other fields
+    count: int
+    nan_count: int
+    x_min: float
+    x_max: float
+    y_min: float
+    y_max: float
+    x_positive_min: float  # inf when there is no positive value
+    y_positive_min: float
+    x_monotonic: bool  # x is non-decreasing
+
+    @classmethod
+    def of(cls, x: list[int | float], y: list[int | float]) -> DataSequenceStats:
+        # builtin min/max and map run in C; the pairs are only rebuilt when NaN is present
+        if any(map(math.isnan, x)) or any(map(math.isnan, y)):
+            pairs = [(vx, vy) for vx, vy in zip(x, y) if not (math.isnan(vx) or math.isnan(vy))]
+            nan_count = len(x) - len(pairs)
+            x = [p[0] for p in pairs]
+            y = [p[1] for p in pairs]
+        else:
+            nan_count = 0
+        if len(x) == 0:
+            return cls(0, nan_count, math.inf, -math.inf, math.inf, -math.inf, math.inf, math.inf, True)
+        x_min, y_min = min(x), min(y)
+        return cls(
+            len(x), nan_count,
+            x_min, max(x), y_min, max(y),
+            x_min if x_min > 0 else min((v for v in x if v > 0), default=math.inf),
+            y_min if y_min > 0 else min((v for v in y if v > 0), default=math.inf),
+            all(map(operator.le, x, itertools.islice(x, 1, None)))
+        )
+
+
 @dataclasses.dataclass(frozen=True)
 class DataSequence:
     x: list[int | float]
@@ -33,16 +104,70 @@ class DataSequence:
     seq_id: int
     name: str | None = None
     x_name: str | None = None
+    x_time: bool = False  # x is epoch seconds parsed from timestamps
 
     def __post_init__(self):
+        self._check_shape()
+        # the distinct element types are collected in C and checked once each
+        if not all(issubclass(t, (int, float)) for t in set(map(type, self.x))):
+            raise TypeError("x must be list[int | float]: seq_id={0}".format(self.seq_id))
+        if not all(issubclass(t, (int, float)) for t in set(map(type, self.y))):
+            raise TypeError("y must be list[int | float]: seq_id={0}".format(self.seq_id))
+
+    @classmethod
+    def trusted(
+            cls,
+            x: list[int | float],
+            y: list[int | float],
+            seq_id: int,
+            name: str | None = None,
+            x_name: str | None = None,
+            x_time: bool = False
+    ) -> DataSequence:
+        # For values that are numbers by construction (parsed, derived or already validated):
+        # the per-element type check is skipped.
+        seq = cls.__new__(cls)
+        for field, value in zip(_DATA_SEQUENCE_FIELDS, (x, y, seq_id, name, x_name, x_time)):
+            object.__setattr__(seq, field, value)
+        seq._check_shape()
+        return seq
+
+    @functools.cached_property
+    def stats(self) -> DataSequenceStats:
+        # computed on first use and shared by every layer (and every render) of this sequence
+        return DataSequenceStats.of(self.x, self.y)
+
+    @functools.cached_property
+    def sketches(self) -> tuple[QuantileSketch, QuantileSketch]:
+        # quantile sketches of x and y for the quantile autoscale; built once, O(k log n) memory
+        x_sketch = QuantileSketch(_AUTOSCALE_SKETCH_K)
+        y_sketch = QuantileSketch(_AUTOSCALE_SKETCH_K)
+        if self.stats.nan_count == 0:
+            x_sketch.update(self.x)
+            y_sketch.update(self.y)
+        else:
+            x_sketch.update(v for v in self.x if not math.isnan(v))
+            y_sketch.update(v for v in self.y if not math.isnan(v))
+        return x_sketch, y_sketch
+
+    @functools.cached_property
+    def _positive_cache(self) -> dict[tuple[bool, bool], DataSequence]:
+        return {}
+
+    def derive(self, **changes) -> DataSequence:
+        # `dataclasses.replace` without validation; the stats are kept while x and y are unchanged
+        fields = {field: getattr(self, field) for field in _DATA_SEQUENCE_FIELDS}
+        fields.update(changes)
+        seq = DataSequence.trusted(**fields)
+        if "stats" in self.__dict__ and "x" not in changes and "y" not in changes:
+            seq.__dict__["stats"] = self.stats
+        return seq
+
+    def _check_shape(self):
         if len(self.x) != len(self.y):
             raise ValueError(
                 "length of x and y must be equal: (seq_id={0}, len(x)={1}, len(y)={2})".format(self.seq_id, len(self.x), len(self.y))
             )
-        if not all(map(lambda x: isinstance(x, (int, float)), self.x)):
-            raise TypeError("x must be list[int | float]: seq_id={0}".format(self.seq_id))
-        if not all(map(lambda y: isinstance(y, (int, float)), self.y)):
-            raise TypeError("y must be list[int | float]: seq_id={0}".format(self.seq_id))
         if (self.name is not None) and (not self.name.isascii()):
             raise ValueError("Sequence name must be ascii: seq_id={0}".format(self.seq_id))
         if (self.x_name is not None) and (not self.x_name.isascii()):
@@ -54,12 +179,34 @@ class DataSequence:
         for xy_pair in filter(filter_func, zip(self.x, self.y)):
             new_x.append(xy_pair[0])
             new_y.append(xy_pair[1])
-        return DataSequence(new_x, new_y, self.seq_id, self.name)
+        return self.derive(x=new_x, y=new_y)
+
+    def positive(self, x: bool, y: bool) -> DataSequence:
+        # points with positive x (and/or y), for log-scale axes; cached per sequence
+        key = (x, y)
+        cached = self._positive_cache.get(key)
+        if cached is not None:
+            return cached
+        stats = self.stats
+        if stats.nan_count == 0 and ((not x) or stats.x_min > 0) and ((not y) or stats.y_min > 0):
+            filtered = self
+        elif x and y:
+            filtered = self.create_filtered(lambda xy: xy[0] > 0 and xy[1] > 0)
+        elif x:
+            filtered = self.create_filtered(lambda xy: xy[0] > 0)
+        else:
+            filtered = self.create_filtered(lambda xy: xy[1] > 0)
+        self._positive_cache[key] = filtered
+        return filtered
+
+
+_DATA_SEQUENCE_FIELDS = tuple(field.name for field in dataclasses.fields(DataSequence))
 
 
 class DataScaleType(str, Enum):
     linear = "linear"
     log = "log"
+    time = "time"  # linear epoch seconds with date/time ticks
 
 
 @dataclasses.dataclass(frozen=True)
@@ -68,10 +215,13 @@ class DataAxis:
     name: str | None = None
     min_: int | float | None = None
     max_: int | float | None = None
+    clip: tuple[float, float] | None = None  # percentiles of the autoscaled range; None for min and max
 
     def __post_init__(self):
         if (self.name is not None) and (not self.name.isascii()):
             raise ValueError("Axis name must be ascii: %s" % self.name)
+        if (self.clip is not None) and not (0 <= self.clip[0] < self.clip[1] <= 100):
+            raise ValueError("Clip percentiles must be 0 <= low < high <= 100: (low, high)=(%s, %s)" % tuple(self.clip))
         if (self.min_ is None) != (self.max_ is None):
             raise ValueError("Axis min and Axis max should be defined simultaneously: (min, max)=(%s, %s)" % (self.min_, self.max_))
         if (self.min_ is not None) and (self.max_ is not None) and self.min_ >= self.max_:
@@ -87,126 +237,193 @@ class DataLegendLoc(str, Enum):
     right = "right"
 
 
+class DataPlotStyle(str, Enum):
+    scatter = "scatter"
+    line = "line"
+    bar = "bar"
+
+
 @dataclasses.dataclass(frozen=True)
 class Data(CanvasConvertible):
     data: list[DataSequence]
     x_axis: DataAxis
     y_axis: DataAxis
     legend_loc: DataLegendLoc
+    style: DataPlotStyle = DataPlotStyle.scatter
 
     def __post_init__(self):
         if self.x_axis.scale == DataScaleType.log:
             for datum in self.data:
-                if min(datum.x) <= 0:
+                if datum.stats.x_min <= 0:
                     warnings.warn(
                         "Non-positive value is detected on log-scale x axis. This data point is not plotted.: seq_id=%d" % datum.seq_id,
                         UserWarning
                     )
         if self.y_axis.scale == DataScaleType.log:
             for datum in self.data:
-                if min(datum.y) <= 0:
+                if datum.stats.y_min <= 0:
                     warnings.warn(
                         "Non-positive value is detected on log-scale y axis. This data point is not plotted.: seq_id=%d" % datum.seq_id,
                         UserWarning
                     )
 
-    def to_canvas(self, canvas_type: Type[canvas.TerminalConvertible]) -> canvas.TerminalConvertible:
+    def _filter_positive(self) -> list[DataSequence]:
         # positive-pass filter
-        if self.x_axis.scale == DataScaleType.log:
-            filtered_data = [datum.create_filtered(lambda xy: xy[0] > 0) for datum in self.data]
-        else:
-            filtered_data = self.data
+        x_log = self.x_axis.scale == DataScaleType.log
+        y_log = self.y_axis.scale == DataScaleType.log
+        if not (x_log or y_log):
+            return self.data
+        return [datum.positive(x_log, y_log) for datum in self.data]
 
-        if self.y_axis.scale == DataScaleType.log:
-            filtered_data = [datum.create_filtered(lambda xy: xy[1] > 0) for datum in filtered_data]
-        else:
-            filtered_data = filtered_data
+    def calc_canvas_ranges(self) -> tuple[tuple[float, float], tuple[float, float]]:
+        return self._calc_canvas_ranges(self._filter_positive())
 
+    def _calc_canvas_ranges(self, filtered_data: list[DataSequence]) -> tuple[tuple[float, float], tuple[float, float]]:
         is_x_range_undef = self.x_axis.min_ is None
+        if is_x_range_undef and (self.x_axis.clip is not None):
+            x_min, x_max = _quantile_range([datum.sketches[0] for datum in filtered_data], self.x_axis.clip)
+        elif is_x_range_undef:
+            x_min = min(datum.stats.x_min for datum in filtered_data)
+            x_max = max(datum.stats.x_max for datum in filtered_data)
         if is_x_range_undef:
-            x_min = min(min(datum.x) for datum in filtered_data)
-            x_max = max(max(datum.x) for datum in filtered_data)
+            if not x_min <= x_max:
+                raise ValueError("No data point to plot")
         else:
             x_min = self.x_axis.min_
             x_max = self.x_axis.max_
-        
-        edge_space_ratio = 0.1
 
         if is_x_range_undef:
-            if self.x_axis.scale == DataScaleType.linear:
-                white_delta = (x_max - x_min) * edge_space_ratio
-                canvas_x_range = (x_min - white_delta, x_max + white_delta)
-            else:
-                white_delta_ratio = log(x_max/x_min) * edge_space_ratio
-                canvas_x_range = (x_min / white_delta_ratio, x_max * white_delta_ratio)
+            canvas_x_range = edge_spaced_range(x_min, x_max, self.x_axis.scale)
         else:
             canvas_x_range = (self.x_axis.min_, self.x_axis.max_)
 
         is_y_range_undef = self.y_axis.min_ is None
+        if is_y_range_undef and (self.y_axis.clip is not None):
+            y_min, y_max = _quantile_range([datum.sketches[1] for datum in filtered_data], self.y_axis.clip)
+        elif is_y_range_undef:
+            y_min = min(datum.stats.y_min for datum in filtered_data)
+            y_max = max(datum.stats.y_max for datum in filtered_data)
         if is_y_range_undef:
-            y_min = min(min(datum.y) for datum in filtered_data)
-            y_max = max(max(datum.y) for datum in filtered_data)
+            if not y_min <= y_max:
+                raise ValueError("No data point to plot")
         else:
             y_min = self.y_axis.min_
             y_max = self.y_axis.max_
 
         if is_y_range_undef:
-            if self.y_axis.scale == DataScaleType.linear:
-                white_delta = (y_max - y_min) * edge_space_ratio
-                canvas_y_range = (y_min - white_delta, y_max + white_delta)
-            else:
-                white_delta_ratio = (log(y_max/y_min) * edge_space_ratio) + 1
-                canvas_y_range = (y_min / white_delta_ratio, y_max * white_delta_ratio)
+            canvas_y_range = edge_spaced_range(y_min, y_max, self.y_axis.scale)
         else:
             canvas_y_range = (self.y_axis.min_, self.y_axis.max_)
-
-        canvas_markers = []
-        canvas_legend_elements = []
+        return canvas_x_range, canvas_y_range
+
+    def projection(
+            self,
+            canvas_x_range: tuple[float, float],
+            canvas_y_range: tuple[float, float]
+    ) -> Callable[[int | float, int | float], tuple[float, float]]:
+        # (x, y) -> relative canvas position; values must be positive on log-scale axes
         x_process_func = log if self.x_axis.scale == DataScaleType.log else lambda v: v
         y_process_func = log if self.y_axis.scale == DataScaleType.log else lambda v: v
+        x_offset = x_process_func(canvas_x_range[0])
+        x_width = x_process_func(canvas_x_range[1]) - x_offset
+        y_offset = y_process_func(canvas_y_range[0])
+        y_width = y_process_func(canvas_y_range[1]) - y_offset
+
+        def project(x: int | float, y: int | float) -> tuple[float, float]:
+            return abs_to_rel(x_process_func(x), x_width, x_offset), abs_to_rel(y_process_func(y), y_width, y_offset)
+        return project
+
+    def culled_axes(self) -> tuple[bool, bool]:
+        # Points outside a quantile range are culled before any marker is made.
+        # Lines keep them, since the segments to them are clipped at the edge.
+        if self.style == DataPlotStyle.line:
+            return False, False
+        return (self.x_axis.clip is not None) and (self.x_axis.min_ is None), \
+            (self.y_axis.clip is not None) and (self.y_axis.min_ is None)
+
+    def to_canvas(self, canvas_type: Type[canvas.TerminalConvertible]) -> canvas.TerminalConvertible:
+        import scatterminal.canvas_layer_model as canvas
+
+        filtered_data = self._filter_positive()
+        canvas_x_range, canvas_y_range = self._calc_canvas_ranges(filtered_data)
+
+        canvas_markers = []
+        project = self.projection(canvas_x_range, canvas_y_range)
+        x_cull, y_cull = self.culled_axes()
+        cull = x_cull or y_cull
+        culled_num = 0
 
         for seq in filtered_data:
             # marker 追加
             for x, y in zip(seq.x, seq.y):
-                canvas_markers.append(
-                    canvas.CanvasMarker(
-                        abs_to_rel(
-                            x_process_func(x),
-                            x_process_func(canvas_x_range[1]) - x_process_func(canvas_x_range[0]),
-                            x_process_func(canvas_x_range[0])
-                        ),
-                        abs_to_rel(
-                            y_process_func(y),
-                            y_process_func(canvas_y_range[1]) - y_process_func(canvas_y_range[0]),
-                            y_process_func(canvas_y_range[0])
-                        ),
-                        seq.seq_id
-                    )
-                )
-
-            # legend 追加
-            canvas_legend_elements.append(
-                canvas.CanvasLegendElement(seq.seq_id, seq.name)
-            )
-
+                if cull and not (
+                        ((not x_cull) or canvas_x_range[0] <= x <= canvas_x_range[1])
+                        and ((not y_cull) or canvas_y_range[0] <= y <= canvas_y_range[1])
+                ):
+                    culled_num += 1
+                    continue
+                rel_x, rel_y = project(x, y)
+                canvas_markers.append(canvas.CanvasMarker(rel_x, rel_y, seq.seq_id))
+
+        warn_culled(culled_num)
+        return self.new_canvas(canvas_markers, filtered_data, canvas_x_range, canvas_y_range)
+
+    def new_canvas(
+            self,
+            canvas_markers: list[canvas.CanvasMarker],
+            filtered_data: list[DataSequence],
+            canvas_x_range: tuple[float, float],
+            canvas_y_range: tuple[float, float]
+    ) -> canvas.Canvas:
+        import scatterminal.canvas_layer_model as canvas
+
+        # legend 追加
+        canvas_legend_elements = [canvas.CanvasLegendElement(seq.seq_id, seq.name) for seq in filtered_data]
         canvas_legend = canvas.CanvasLegend(canvas_legend_elements, canvas.CanvasLegendLoc(self.legend_loc))
 
         # NOTE: データの min, max をそのまま渡している
         canvas_x_axis = canvas.CanvasAxis(
             canvas_x_range[0],
             canvas_x_range[1],
-            canvas.CanvasScaleType.linear if self.x_axis.scale == DataScaleType.linear else canvas.CanvasScaleType.log,
+            canvas.CanvasScaleType(self.x_axis.scale.value),
             self.x_axis.name
         )
         canvas_y_axis = canvas.CanvasAxis(
             canvas_y_range[0],
             canvas_y_range[1],
-            canvas.CanvasScaleType.linear if self.y_axis.scale == DataScaleType.linear else canvas.CanvasScaleType.log,
+            canvas.CanvasScaleType(self.y_axis.scale.value),
             self.y_axis.name
         )
         return canvas.Canvas(
             canvas_markers,
             canvas_x_axis,
             canvas_y_axis,
-            canvas_legend
+            canvas_legend,
+            canvas.CanvasPlotStyle(self.style)
         )
+
+
+def warn_culled(culled_num: int):
+    if culled_num > 0:
+        warnings.warn("%d points outside the autoscaled range are not plotted." % culled_num, UserWarning)
+
+
+def _quantile_range(sketches: list[QuantileSketch], clip: tuple[float, float]) -> tuple[float, float]:
+    merged = QuantileSketch(_AUTOSCALE_SKETCH_K)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged.quantile(clip[0] / 100), merged.quantile(clip[1] / 100)
+
+
+def edge_spaced_range(min_: float, max_: float, scale: DataScaleType, edge_space_ratio: float = 0.1) -> tuple[float, float]:
+    # autoscaled canvas range: the data range with 10% space at both edges (multiplicative on log-scale)
+    if min_ == max_:
+        # a single value (e.g. constant data, or a quantile range without the outliers) is centered
+        if scale == DataScaleType.log:
+            return min_ / 2, max_ * 2
+        return min_ - 0.5, max_ + 0.5
+    if scale != DataScaleType.log:
+        white_delta = (max_ - min_) * edge_space_ratio
+        return min_ - white_delta, max_ + white_delta
+    white_delta_ratio = (log(max_/min_) * edge_space_ratio) + 1
+    return min_ / white_delta_ratio, max_ * white_delta_ratio
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from typing import Iterable
+import math
+import warnings
+
+from scatterminal.data_layer_model import DataScaleType, DataSequence
+
+
+class StreamingHistogram:
+    # Bin counts in a single pass with O(bins) memory.
+    # Without a fixed range, the range is estimated from the first `sample_size` values, and a later value outside it
+    # doubles the bin width (adjacent bins are merged), so every value is still counted exactly.
+    def __init__(
+            self,
+            bins: int = 20,
+            range_: tuple[float, float] | None = None,
+            scale: DataScaleType = DataScaleType.linear,
+            sample_size: int = 1000
+    ):
+        if bins < 1:
+            raise ValueError("The number of bins must be positive: %d" % bins)
+        if scale == DataScaleType.log and (range_ is not None) and range_[0] <= 0:
+            raise ValueError("Histogram range must be positive on log-scale")
+        if (range_ is not None) and range_[0] >= range_[1]:
+            raise ValueError("Histogram min is larger than max: (min, max)=(%f, %f)" % range_)
+
+        self.bins = bins
+        self.scale = scale
+        self.counts = [0] * bins
+        self.skipped = 0  # NaN, or non-positive on log-scale
+        self.out_of_range = 0  # only with a fixed range
+        self._fixed = range_ is not None
+        self._upper_edge_num = 0  # values on the upper edge (counted in the last bin)
+        self._sample_size = sample_size
+        self._sample: list[float] | None = None if self._fixed else []
+        if range_ is not None:
+            self._lo = self._transform(range_[0])
+            self._hi = self._transform(range_[1])
+            self._width = (self._hi - self._lo) / bins
+
+    def _transform(self, value: float) -> float:
+        return math.log10(value) if self.scale == DataScaleType.log else value
+
+    def _inverse(self, value: float) -> float:
+        return 10 ** value if self.scale == DataScaleType.log else value
+
+    def update(self, values: Iterable[int | float]):
+        for value in values:
+            self.add(value)
+
+    def add(self, value: int | float):
+        if math.isnan(value) or (self.scale == DataScaleType.log and value <= 0):
+            self.skipped += 1
+            return
+        t = self._transform(value)
+        if self._sample is not None:
+            self._sample.append(t)
+            if len(self._sample) >= self._sample_size:
+                self._flush_sample()
+            return
+        self._count(t)
+
+    def _flush_sample(self):
+        sample, self._sample = self._sample, None
+        if len(sample) == 0:
+            # nothing has been counted yet; any range will do
+            self._lo, self._width = 0.0, 1.0 / self.bins
+            return
+        lo, hi = min(sample), max(sample)
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+        self._lo = lo
+        self._width = (hi - lo) / self.bins
+        for t in sample:
+            self._count(t)
+
+    def _index(self, t: float) -> int:
+        index = math.floor((t - self._lo) / self._width)
+        # agree with the edges exactly even when the division is rounded
+        if t < self._lo + self._width * index:
+            index -= 1
+        elif t >= self._lo + self._width * (index + 1):
+            index += 1
+        return index
+
+    def _bin(self, t: float) -> int:
+        index = self._index(t)
+        if index == self.bins and (t == self._lo + self._width * self.bins or (self._fixed and t <= self._hi)):
+            # the upper edge belongs to the last bin (lo + width * bins may be rounded below a fixed max)
+            index = self.bins - 1
+        return index
+
+    def add_range(self, min_: int | float, max_: int | float, count: int) -> bool:
+        # `count` values between min_ and max_ (e.g. aggregated by a database) counted at once, which is exact when
+        # both ends fall in the same bin or outside the same side of a fixed range. False when they do not.
+        if not self._fixed:
+            return False
+        if self.scale == DataScaleType.log and min_ <= 0:
+            return False
+        low, high = self._bin(self._transform(min_)), self._bin(self._transform(max_))
+        if low == high and 0 <= low < self.bins:
+            self.counts[low] += count
+        elif high < 0 or low >= self.bins:
+            self.out_of_range += count
+        else:
+            return False
+        return True
+
+    def _count(self, t: float):
+        index = self._bin(t)
+        if 0 <= index < self.bins:
+            self.counts[index] += 1
+            if index == self.bins - 1 and not self._fixed and t >= self._lo + self._width * self.bins:
+                self._upper_edge_num += 1
+            return
+        if self._fixed:
+            self.out_of_range += 1
+            return
+        while index < 0:
+            self._expand_lower()
+            index = self._index(t)
+        while index >= self.bins:
+            self._expand_upper()
+            index = self._index(t)
+        self.counts[index] += 1
+
+    def _expand_upper(self):
+        counts = [0] * self.bins
+        for i, count in enumerate(self.counts):
+            counts[i // 2] += count
+        if self.bins % 2 == 0:
+            # the old upper edge is the lower edge of the bin after the merged last bin now
+            counts[self.bins // 2 - 1] -= self._upper_edge_num
+            counts[self.bins // 2] += self._upper_edge_num
+        self._upper_edge_num = 0
+        self.counts = counts
+        self._width *= 2
+
+    def _expand_lower(self):
+        counts = [0] * self.bins
+        for i, count in enumerate(self.counts):
+            counts[(self.bins + i) // 2] += count
+        self.counts = counts
+        self._lo -= self._width * self.bins
+        self._width *= 2
+
+    def edges(self) -> list[float]:
+        if self._sample is not None:
+            self._flush_sample()
+        return [self._inverse(self._lo + self._width * i) for i in range(self.bins + 1)]
+
+    def centers(self) -> list[float]:
+        if self._sample is not None:
+            self._flush_sample()
+        return [self._inverse(self._lo + self._width * (i + 0.5)) for i in range(self.bins)]
+
+    def to_data_sequence(self, seq_id: int = 0, name: str | None = None) -> DataSequence:
+        if self.skipped + self.out_of_range > 0:
+            warnings.warn(
+                "Values out of the histogram range or not plottable are not counted: (skipped, out_of_range)=(%d, %d)"
+                % (self.skipped, self.out_of_range),
+                UserWarning
+            )
+        centers = self.centers()
+        if sum(self.counts) == 0:
+            raise ValueError("No value is counted in the histogram.")
+        return DataSequence.trusted(centers, list(self.counts), seq_id, name, name)
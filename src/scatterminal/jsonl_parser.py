@@ -0,0 +1,127 @@
+from typing import Iterable, Iterator
+import itertools
+import json
+import re
+import warnings
+
+JSON_LINES_EXTENSIONS = ("jsonl", "ndjson")
+
+# a key and its value (a string without escapes, or a number, true, false or null)
+_FIELD_PATTERN = r'"(%s)"\s*:\s*("[^"]*"|[^\s,}\]\[{"]+)'
+_MISSING = object()
+
+
+def _scalar_cell(value: object) -> object:
+    # a JSON value as the text of a CSV cell; null is an empty cell (NaN), and objects and arrays are not plottable
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return value
+    return _MISSING
+
+
+def _token_cell(token: str) -> str:
+    if token == "null":
+        return ""
+    if token == "true":
+        return "1"
+    if token == "false":
+        return "0"
+    return token
+
+
+def _scan_pattern(fields: list[str]) -> re.Pattern:
+    return re.compile(_FIELD_PATTERN % "|".join(re.escape(field) for field in fields))
+
+
+def _scan(line: str, pattern: re.Pattern, fields: list[str]) -> list[str] | object | None:
+    # Field values by one regex search instead of decoding the line. Only for a flat object without escapes:
+    # then a quoted text followed by a colon is a key of the object (a quote in a string would be escaped).
+    # Returns None when the line has to be decoded, _MISSING when a field is not in the line.
+    if "\\" in line or line.count("{") != 1:
+        return None
+    found = dict(pattern.findall(line))
+    if len(found) < len(fields):
+        # a field with an array as its value is found by decoding; an absent one needs nothing more
+        absent = (json.dumps(field, ensure_ascii=False) not in line for field in fields if field not in found)
+        return _MISSING if any(absent) else None
+    cells = []
+    for field in fields:
+        value = found[field]
+        cells.append(value[1:-1] if value.startswith('"') else _token_cell(value))
+    return cells
+
+
+def _lookup(obj: dict, field: str) -> object:
+    # a key with dots is looked up as it is first, then as a path of nested objects
+    if field in obj:
+        return obj[field]
+    value = obj
+    for key in field.split("."):
+        if not (isinstance(value, dict) and key in value):
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _decode(line: str, fields: list[str]) -> list[str] | object:
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return _MISSING
+    if not isinstance(obj, dict):
+        return _MISSING
+    cells = []
+    for field in fields:
+        value = _lookup(obj, field)
+        cell = _MISSING if value is _MISSING else _scalar_cell(value)
+        if cell is _MISSING:
+            return _MISSING
+        cells.append(cell)
+    return cells
+
+
+def _default_fields(line: str) -> list[str]:
+    # the top-level fields of the first line that hold a number, a string, a boolean or null
+    obj = json.loads(line)
+    if not isinstance(obj, dict):
+        raise ValueError("JSON Lines must hold an object per line.")
+    return [key for key, value in obj.items() if _scalar_cell(value) is not _MISSING]
+
+
+def iter_json_rows(lines: Iterable[str], fields: list[str] | None = None) -> Iterator[list[str]]:
+    # JSON Lines as the rows of a CSV file: the field names as the header, then the values of the fields
+    # (x first, as for CSV columns) of every line that has them all. Lines without them are counted and skipped.
+    line_iter = (line.strip() for line in lines)
+    line_iter = (line for line in line_iter if len(line) > 0)
+    if fields is None:
+        first_line = next(line_iter, None)
+        if first_line is None:
+            return
+        fields = _default_fields(first_line)
+        line_iter = itertools.chain((first_line,), line_iter)
+    if len(fields) == 0:
+        raise ValueError("No field to plot.")
+    yield list(fields)
+
+    pattern = _scan_pattern(fields) if all("." not in field for field in fields) else None
+    line_num = 0
+    skipped = 0
+    for line in line_iter:
+        line_num += 1
+        cells = None if pattern is None else _scan(line, pattern, fields)
+        if cells is None:
+            cells = _decode(line, fields)
+        if cells is _MISSING:
+            skipped += 1
+            continue
+        yield cells
+    if skipped > 0:
+        warnings.warn(
+            "%d of %d lines without the fields (%s) are skipped." % (skipped, line_num, ", ".join(fields)),
+            UserWarning
+        )
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import os
+import stat
+
+from scatterminal.csv_parser import parse_cell
+from scatterminal.data_layer_model import DataScaleType, DataLegendLoc, DataSequence
+from scatterminal.plot import plot_sequences
+
+UNIX_SOCKET_PREFIX = "unix:"
+_CLEAR_SCREEN = "\x1b[H\x1b[2J"
+_READ_SIZE = 65536
+
+
+@dataclasses.dataclass(frozen=True)
+class LiveSource:
+    path: str  # file, named pipe, or "unix:<socket path>"
+    name: str | None = None
+    sep: str = ","
+    max_points: int | None = 1000
+    max_age: float | None = None  # seconds
+
+
+class _SequenceBuffer:
+    def __init__(self, max_points: int | None, max_age: float | None):
+        self._max_age = max_age
+        self._points: collections.deque[tuple[float, int | float, int | float]] = collections.deque(maxlen=max_points)
+        self._next_x = 0
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def append(self, x: int | float | None, y: int | float, now: float):
+        if x is None:
+            x = self._next_x
+        self._next_x += 1
+        self._points.append((now, x, y))
+
+    def expire(self, now: float):
+        if self._max_age is None:
+            return
+        while self._points and (now - self._points[0][0]) > self._max_age:
+            self._points.popleft()
+
+    def to_data_sequence(self, seq_id: int, name: str | None) -> DataSequence:
+        return DataSequence.trusted([p[1] for p in self._points], [p[2] for p in self._points], seq_id, name)
+
+
+def _parse_line(line: str, sep: str) -> tuple[int | float | None, int | float] | None:
+    values = [parse_cell(cell.strip()) for cell in line.split(sep)]
+    if any(isinstance(v, str) for v in values):
+        # header or broken line
+        return None
+    if len(values) == 1:
+        return None, values[0]
+    return values[0], values[1]
+
+
+@contextlib.asynccontextmanager
+async def _open_reader(path: str):
+    # the connection or pipe is closed when the source task ends or is cancelled
+    socket_path = path[len(UNIX_SOCKET_PREFIX):] if path.startswith(UNIX_SOCKET_PREFIX) else None
+    mode = None if socket_path is not None else os.stat(path).st_mode
+    if socket_path is not None or stat.S_ISSOCK(mode):
+        reader, writer = await asyncio.open_unix_connection(socket_path or path)
+        try:
+            yield reader
+        finally:
+            writer.close()
+    elif stat.S_ISFIFO(mode):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        with os.fdopen(os.open(path, os.O_RDONLY | os.O_NONBLOCK), "rb", buffering=0) as pipe:
+            transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+            try:
+                yield reader
+            finally:
+                transport.close()
+    else:
+        # regular files cannot be polled by the event loop, so they are followed like `tail -f`
+        yield None
+
+
+async def _follow_file(path: str, poll_interval: float):
+    with open(path, "r") as f:
+        pending = ""
+        while True:
+            # in bounded chunks: a large existing file is not read into memory at once
+            chunk = f.read(_READ_SIZE)
+            if not chunk:
+                await asyncio.sleep(poll_interval)
+                continue
+            lines = (pending + chunk).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line
+
+
+async def _read_source(source: LiveSource, buffer: _SequenceBuffer, poll_interval: float):
+    loop = asyncio.get_running_loop()
+    async with _open_reader(source.path) as reader:
+        if reader is None:
+            async for line in _follow_file(source.path, poll_interval):
+                parsed = _parse_line(line, source.sep)
+                if parsed is not None:
+                    buffer.append(*parsed, loop.time())
+            return
+
+        while True:
+            raw = await reader.readline()
+            if not raw:
+                # writer side closed
+                return
+            parsed = _parse_line(raw.decode(), source.sep)
+            if parsed is not None:
+                buffer.append(*parsed, loop.time())
+
+
+def _render(
+        sources: list[LiveSource],
+        buffers: list[_SequenceBuffer],
+        now: float,
+        plot_kwargs: dict
+) -> list[DataSequence]:
+    data_sequences = []
+    for seq_id, (source, buffer) in enumerate(zip(sources, buffers)):
+        buffer.expire(now)
+        if len(buffer) > 0:
+            data_sequences.append(buffer.to_data_sequence(seq_id, source.name or source.path))
+    if len(data_sequences) > 0:
+        print(_CLEAR_SCREEN, end="")
+        plot_sequences(data_sequences, **plot_kwargs)
+    return data_sequences
+
+
+def _raise_failed(tasks: list[asyncio.Task]):
+    # a source that cannot be opened or read stops the dashboard instead of leaving it empty
+    for task in tasks:
+        if task.done() and not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+
+
+async def run_live(
+        sources: list[LiveSource],
+        interval: float = 1.0,
+        duration: float | None = None,
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower"
+) -> list[DataSequence]:
+    if len(sources) == 0:
+        raise ValueError("Specify at least one source")
+
+    plot_kwargs = dict(
+        x_label=x_label, y_label=y_label, x_scale=x_scale, y_scale=y_scale,
+        x_lim=x_lim, y_lim=y_lim, legend_loc=legend_loc
+    )
+    loop = asyncio.get_running_loop()
+    buffers = [_SequenceBuffer(source.max_points, source.max_age) for source in sources]
+    tasks = [asyncio.create_task(_read_source(s, b, min(interval, 0.1))) for s, b in zip(sources, buffers)]
+
+    next_tick = loop.time()
+    end_time = None if duration is None else next_tick + duration
+    try:
+        while True:
+            # the ticks are fixed, so the render time does not add up to a drift
+            next_tick += interval
+            if (end_time is not None) and (next_tick > end_time):
+                await asyncio.sleep(max(end_time - loop.time(), 0))
+                _raise_failed(tasks)
+                return _render(sources, buffers, loop.time(), plot_kwargs)
+            await asyncio.sleep(max(next_tick - loop.time(), 0))
+            _raise_failed(tasks)
+            _render(sources, buffers, loop.time(), plot_kwargs)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # the failures were raised above; the rest are the cancellations
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def live(sources: list[LiveSource], interval: float = 1.0, duration: float | None = None, **kwargs) -> list[DataSequence]:
+    return asyncio.run(run_live(sources, interval, duration, **kwargs))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="scatterminal.live",
+        description="Plot live data from files, named pipes and unix sockets on terminal",
+    )
+    parser.add_argument(
+        "source",
+        nargs="+",
+        help="File path, named pipe path or unix socket ('unix:' prefix is optional for socket files)"
+    )
+    parser.add_argument("--sep", help="Separator character", default=",")
+    parser.add_argument("--interval", type=float, help="Re-render interval in seconds", default=1.0)
+    parser.add_argument("--max-points", type=int, help="Number of points retained per source", default=1000)
+    parser.add_argument("--max-age", type=float, help="Retention time of points in seconds")
+    parser.add_argument("--xscale", choices=[scale.value for scale in DataScaleType], default="linear")
+    parser.add_argument("--yscale", choices=[scale.value for scale in DataScaleType], default="linear")
+    parser.add_argument(
+        "--legend-loc",
+        choices=[loc.value for loc in DataLegendLoc],
+        help="Position of legend",
+        default="lower"
+    )
+
+    argv = parser.parse_args()
+    sources = [LiveSource(path, None, argv.sep, argv.max_points, argv.max_age) for path in argv.source]
+    try:
+        live(sources, argv.interval, x_scale=argv.xscale, y_scale=argv.yscale, legend_loc=argv.legend_loc)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
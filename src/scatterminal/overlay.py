@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import abc
+import collections
+import dataclasses
+import math
+
+from scatterminal.data_layer_model import DataSequence
+
+FIT_TYPES = ("linear", "loglog")
+_ROLLING_POINT_NUM = 1000
+_FIT_SAMPLE_NUM = 100
+
+
+class Overlay(metaclass=abc.ABCMeta):
+    # fed with every (x, y) of a sequence while the sequence is built
+    @abc.abstractmethod
+    def add(self, x: int | float, y: int | float):
+        pass
+
+    @abc.abstractmethod
+    def to_data_sequence(self, seq_id: int, name: str | None, x_time: bool = False) -> DataSequence | None:
+        pass
+
+
+class RollingMean(Overlay):
+    # O(window + _ROLLING_POINT_NUM) memory: a running sum over a fixed-size deque, and the means decimated to at most
+    # 2 * _ROLLING_POINT_NUM points (every stride-th mean, the stride doubled when the output is full), far more
+    # than a terminal can show. The last mean is always kept so the line ends with the data.
+    def __init__(self, window: int):
+        self.window = window
+        self._values: collections.deque[float] = collections.deque()
+        self._sum = 0.0
+        self._x: list[int | float] = []
+        self._y: list[float] = []
+        self._stride = 1
+        self._mean_num = 0
+        self._last: tuple[int | float, float] | None = None
+
+    def add(self, x: int | float, y: int | float):
+        if math.isnan(y):
+            return
+        self._values.append(y)
+        self._sum += y
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+        if len(self._values) < self.window:
+            return
+        mean = self._sum / self.window
+        if self._mean_num % self._stride == 0:
+            self._x.append(x)
+            self._y.append(mean)
+            if len(self._x) == 2 * _ROLLING_POINT_NUM:
+                del self._x[1::2], self._y[1::2]
+                self._stride *= 2
+            self._last = None
+        else:
+            self._last = (x, mean)
+        self._mean_num += 1
+
+    def to_data_sequence(self, seq_id: int, name: str | None, x_time: bool = False) -> DataSequence | None:
+        if len(self._x) == 0:
+            return None
+        xs, ys = self._x, self._y
+        if self._last is not None:
+            xs, ys = xs + [self._last[0]], ys + [self._last[1]]
+        return DataSequence.trusted(xs, ys, seq_id, "%s rolling %d" % (name or "y", self.window), None, x_time)
+
+
+class LeastSquaresFit(Overlay):
+    # O(1) memory: only the means and the centred co-moments are kept (Welford), of x relative to the first x.
+    # Both keep the fit accurate for x far from 0 such as epoch seconds, where the raw sums of the normal
+    # equations cancel.
+    # With log_log, log10(y) = a * log10(x) + b is fitted, i.e. y = 10**b * x**a.
+    def __init__(self, log_log: bool = False):
+        self.log_log = log_log
+        self.n = 0
+        self.x0 = 0.0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.c_xy = 0.0
+        self.x_min = math.inf
+        self.x_max = -math.inf
+
+    def add(self, x: int | float, y: int | float):
+        if math.isnan(x) or math.isnan(y):
+            return
+        if self.log_log:
+            if x <= 0 or y <= 0:
+                return
+            fx, fy = math.log10(x), math.log10(y)
+        else:
+            fx, fy = x, y
+        if self.n == 0:
+            self.x0 = fx
+        fx -= self.x0
+        self.n += 1
+        dx = fx - self.mean_x
+        self.mean_x += dx / self.n
+        self.mean_y += (fy - self.mean_y) / self.n
+        self.m2_x += dx * (fx - self.mean_x)
+        self.c_xy += dx * (fy - self.mean_y)
+        self.x_min = min(self.x_min, x)
+        self.x_max = max(self.x_max, x)
+
+    def coefficients(self) -> tuple[float, float] | None:
+        # (slope, intercept), or None when x has no spread
+        if self.n < 2 or self.m2_x == 0:
+            return None
+        slope = self.c_xy / self.m2_x
+        return slope, self.mean_y - slope * (self.x0 + self.mean_x)
+
+    def to_data_sequence(self, seq_id: int, name: str | None, x_time: bool = False) -> DataSequence | None:
+        coefficients = self.coefficients()
+        if coefficients is None:
+            return None
+        slope, intercept = coefficients
+        if self.log_log:
+            lo, hi = math.log10(self.x_min), math.log10(self.x_max)
+            xs = [10 ** (lo + (hi - lo) * i / (_FIT_SAMPLE_NUM - 1)) for i in range(_FIT_SAMPLE_NUM)]
+            ys = [10 ** intercept * x ** slope for x in xs]
+            label = "%s fit y=%.3gx^%.3g" % (name or "y", 10 ** intercept, slope)
+        else:
+            xs = [self.x_min + (self.x_max - self.x_min) * i / (_FIT_SAMPLE_NUM - 1) for i in range(_FIT_SAMPLE_NUM)]
+            ys = [slope * x + intercept for x in xs]
+            label = "%s fit y=%.3gx%+.3g" % (name or "y", slope, intercept)
+        return DataSequence.trusted(xs, ys, seq_id, label, None, x_time)
+
+
+@dataclasses.dataclass(frozen=True)
+class OverlaySpec:
+    rolling: int | None = None
+    fit: str | None = None
+
+    def __post_init__(self):
+        if (self.rolling is not None) and self.rolling < 1:
+            raise ValueError("Rolling window must be positive: %d" % self.rolling)
+        if (self.fit is not None) and (self.fit not in FIT_TYPES):
+            raise ValueError("Unknown fit type: %s" % self.fit)
+
+    def new_overlays(self) -> list[Overlay]:
+        overlays: list[Overlay] = []
+        if self.rolling is not None:
+            overlays.append(RollingMean(self.rolling))
+        if self.fit is not None:
+            overlays.append(LeastSquaresFit(self.fit == "loglog"))
+        return overlays
+
+
+def overlay_sequences(
+        sources: list[tuple[DataSequence, list[Overlay]]],
+        next_id: int
+) -> list[DataSequence]:
+    # overlay series follow the data series; their ids start at next_id
+    sequences = []
+    for seq, overlays in sources:
+        for overlay in overlays:
+            overlay_seq = overlay.to_data_sequence(next_id + len(sequences), seq.name, seq.x_time)
+            if overlay_seq is not None:
+                # keeps the x label inferred from the data
+                sequences.append(overlay_seq.derive(x_name=seq.x_name))
+    return sequences
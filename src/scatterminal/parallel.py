@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import array
+import concurrent.futures
+import dataclasses
+import math
+import os
+import sys
+from typing import Iterator, Sequence
+
+from scatterminal.canvas_layer_model import _quantize
+from scatterminal.data_layer_model import Data, DataPlotStyle, DataSequence, warn_culled
+from scatterminal.shared import AttachedSequences, SharedSequenceHandle, SharedSequences
+import scatterminal.terminal_layer_model as terminal
+
+# below this many points per worker, starting the workers costs more than it saves
+MIN_POINTS_PER_WORKER = 200_000
+
+
+@dataclasses.dataclass(frozen=True)
+class _ShardSpec:
+    # what a worker needs besides its points; `axes` is the Data without sequences (for its projection)
+    axes: Data
+    canvas_x_range: tuple[float, float]
+    canvas_y_range: tuple[float, float]
+    columns: int
+    lines: int
+    x_cull: bool
+    y_cull: bool
+
+
+class CellGridShard:
+    # Per-cell result of a contiguous run of points: the number of points, the highest position of the series
+    # (the one drawn last, so its marker wins the cell) and the global order of the first two points
+    # (the second write to a blank cell is the one the serial renderer warns about).
+    def __init__(self, cell_num: int):
+        self.counts = array.array("q", [0]) * cell_num
+        self.series = array.array("q", [-1]) * cell_num
+        self.first = array.array("q", [-1]) * cell_num
+        self.second = array.array("q", [-1]) * cell_num
+        self.culled_num = 0
+
+    def merge(self, later: CellGridShard):
+        # `later` holds points after all the points merged so far, so the reduction is fixed by the shard order
+        counts, series, first, second = self.counts, self.series, self.first, self.second
+        for cell, count in enumerate(later.counts):
+            if count == 0:
+                continue
+            if counts[cell] == 0:
+                first[cell] = later.first[cell]
+                second[cell] = later.second[cell]
+            elif counts[cell] == 1:
+                second[cell] = later.first[cell]
+            counts[cell] += count
+            series[cell] = later.series[cell]
+        self.culled_num += later.culled_num
+
+
+def rasterize_shard(spec: _ShardSpec, segments: list[tuple[int, int, Sequence[float], Sequence[float]]]) -> CellGridShard:
+    # segments are (series position, global order of the first point, x, y), in drawing order.
+    # The arithmetic is the same as Data.to_canvas and Canvas._gen_scatter_cells, so the cells are the same.
+    columns, lines = spec.columns, spec.lines
+    shard = CellGridShard(columns * lines)
+    counts, series, first, second = shard.counts, shard.series, shard.first, shard.second
+    project = spec.axes.projection(spec.canvas_x_range, spec.canvas_y_range)
+    x_low, x_high = spec.canvas_x_range
+    y_low, y_high = spec.canvas_y_range
+    x_cull, y_cull = spec.x_cull, spec.y_cull
+    cull = x_cull or y_cull
+    isfinite = math.isfinite
+    for position, order, xs, ys in segments:
+        for x, y in zip(xs, ys):
+            if cull and not (((not x_cull) or x_low <= x <= x_high) and ((not y_cull) or y_low <= y <= y_high)):
+                shard.culled_num += 1
+                order += 1
+                continue
+            rel_x, rel_y = project(x, y)
+            if isfinite(rel_x) and isfinite(rel_y):
+                cell_x = _quantize(rel_x, columns)
+                cell_y = _quantize(rel_y, lines)
+                if 0 <= cell_x < columns and 0 <= cell_y < lines:
+                    cell = cell_y * columns + cell_x
+                    count = counts[cell]
+                    if count == 0:
+                        first[cell] = order
+                    elif count == 1:
+                        second[cell] = order
+                    counts[cell] = count + 1
+                    series[cell] = position
+            order += 1
+    return shard
+
+
+def rasterize_shared_shard(
+        spec: _ShardSpec,
+        handles: list[SharedSequenceHandle],
+        segments: list[tuple[int, int, int, int]]
+) -> CellGridShard:
+    # segments are (series position, global order of the first point, start, end) of the published sequences
+    with AttachedSequences() as attached:
+        views = []
+        for position, order, start, end in segments:
+            seq = attached.sequence(handles[position], start, end)
+            views.append((position, order, seq.x, seq.y))
+        return rasterize_shard(spec, views)
+
+
+def _split(sequences: list[DataSequence], shard_num: int) -> list[list[tuple[int, int, int, int]]]:
+    # contiguous runs (series position, global order, start, end) of the points in drawing order
+    total = sum(len(seq.x) for seq in sequences)
+    size = -(-total // shard_num)
+    shards = [[] for _ in range(shard_num)]
+    order = 0
+    for position, seq in enumerate(sequences):
+        start = 0
+        while start < len(seq.x):
+            shard = order // size
+            end = min(len(seq.x), start + (shard + 1) * size - order)
+            shards[shard].append((position, order, start, end))
+            order += end - start
+            start = end
+    return [segments for segments in shards if len(segments) > 0]
+
+
+def _rasterize_shards(spec: _ShardSpec, sequences: list[DataSequence], workers: int) -> Iterator[CellGridShard]:
+    shards = _split(sequences, workers)
+    if not getattr(sys, "_is_gil_enabled", lambda: True)():
+        # threads run in parallel on free-threaded builds, and share the sequences as they are
+        with concurrent.futures.ThreadPoolExecutor(len(shards)) as executor:
+            yield from executor.map(rasterize_shard, [spec] * len(shards), [
+                [(position, order, sequences[position].x[start:end], sequences[position].y[start:end])
+                 for position, order, start, end in segments]
+                for segments in shards
+            ])
+        return
+    # the points are published once in shared memory; the workers only receive the small handles
+    with SharedSequences(sequences) as published, concurrent.futures.ProcessPoolExecutor(len(shards)) as executor:
+        yield from executor.map(
+            rasterize_shared_shard, [spec] * len(shards), [published.handles] * len(shards), shards
+        )
+
+
+def worker_num(requested: int | None, point_num: int) -> int:
+    # 0 is one worker per core; at least MIN_POINTS_PER_WORKER points per worker
+    if requested is None:
+        return 1
+    requested = requested or os.cpu_count() or 1
+    return max(1, min(requested, point_num // MIN_POINTS_PER_WORKER))
+
+
+def draw(
+        data: Data,
+        terminal_size: os.terminal_size,
+        color_mode: str = "never",
+        workers: int = 2
+) -> terminal._CharField:
+    # Scatter plot of `data` drawn by `workers` processes, each rasterizing a contiguous shard of the points
+    # (read from shared memory).
+    # The char field (markers, their colours and the overlap warnings) is the same as the serial renderer's.
+    if data.style != DataPlotStyle.scatter:
+        raise ValueError("Only the scatter style is rasterized in parallel: %s" % data.style.value)
+    filtered_data = data._filter_positive()
+    canvas_x_range, canvas_y_range = data._calc_canvas_ranges(filtered_data)
+    canvas_ = data.new_canvas([], filtered_data, canvas_x_range, canvas_y_range)
+    marker_char_dict, marker_color_dict, layout = canvas_._layout(terminal.Terminal, terminal_size, color_mode)
+    terminal_size_, terminal_x_axis, terminal_y_axis, terminal_legend = layout
+    columns, lines = terminal_size_.canvas_columns, terminal_size_.canvas_lines
+
+    spec = _ShardSpec(
+        dataclasses.replace(data, data=[]), canvas_x_range, canvas_y_range, columns, lines, *data.culled_axes()
+    )
+    grid = CellGridShard(columns * lines)
+    for shard in _rasterize_shards(spec, filtered_data, workers):
+        grid.merge(shard)
+    warn_culled(grid.culled_num)
+
+    # The axes, labels and legend are drawn as usual. Then the writes of the markers that decide the result are
+    # replayed in their global order: the first two of each cell (for the overlap warnings) with the marker of
+    # the winning series, which is also what the last write leaves in the cell.
+    cf = terminal.Terminal(
+        terminal_size_.lines, terminal_size_.columns, [], terminal_x_axis, terminal_y_axis, terminal_legend, color_mode
+    ).draw()
+    writes = []
+    for cell, count in enumerate(grid.counts):
+        if count == 0:
+            continue
+        group_id = filtered_data[grid.series[cell]].seq_id
+        marker = terminal.TerminalMarker(
+            x=terminal_size_.from_canvas_to_terminal_columns(cell % columns),
+            y=terminal_size_.from_canvas_to_terminal_lines(cell // columns),
+            char=marker_char_dict[group_id],
+            color=marker_color_dict.get(group_id)
+        )
+        writes.append((grid.first[cell], marker))
+        if count > 1:
+            writes.append((grid.second[cell], marker))
+    writes.sort(key=lambda write: write[0])
+    for _, marker in writes:
+        cf.write_marker(marker)
+    return cf
@@ -1,11 +1,34 @@
-import argparse
+from __future__ import annotations
+
+# The layer modules (and argparse) are imported in the functions that use them,
+# so that `plot --help`, `plot --client` and `import scatterminal.plot` start fast.
+from typing import TYPE_CHECKING
 import dataclasses
+import os
+import sys
+
+if TYPE_CHECKING:
+    import argparse
+    from typing import Callable, Iterable
+    from scatterminal.data_layer_model import Data, DataScaleType, DataSequence, SimpleDataSequence
+    from scatterminal.histogram import StreamingHistogram
+    from scatterminal.overlay import OverlaySpec
+    from scatterminal.profiling import Profiler
+    from scatterminal.terminal_layer_model import _CharField
+
 
+STDIN_PATH = "-"
 
-from scatterminal.canvas_layer_model import Canvas
-from scatterminal.csv_parser import read_file, parse
-from scatterminal.data_layer_model import DataScaleType, DataAxis, Data, DataLegendLoc, DataSequence, SimpleDataSequence
-from scatterminal.terminal_layer_model import Terminal
+# same values as DataScaleType, DataLegendLoc and DataPlotStyle (kept literal to avoid importing the data layer for argparse)
+SCALE_CHOICES = ("linear", "log", "time")
+LEGEND_LOC_CHOICES = ("none", "lower", "right")
+STYLE_CHOICES = ("scatter", "line", "bar")
+FIT_CHOICES = ("linear", "loglog")
+AUTOSCALE_CHOICES = ("minmax", "quantile")
+DEFAULT_CLIP = (0.5, 99.5)
+DEFAULT_FPS = 10.0
+# same values as color.COLOR_CHOICES
+COLOR_CHOICES = ("auto", "never", "16", "256", "truecolor")
 
 
 @dataclasses.dataclass(frozen=True)
@@ -23,35 +46,515 @@ def plot_csv(
         y_scale: str = "linear",
         x_lim: tuple[float, float] | None = None,
         y_lim: tuple[float, float] | None = None,
-        legend_loc: str = "lower"
-) -> None:
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        autoscale: str = "minmax",
+        clip: tuple[float, float] = DEFAULT_CLIP,
+        profile: bool = False,
+        group_by: str | None = None,
+        rolling: int | None = None,
+        fit: str | None = None,
+        color: str = "auto",
+        workers: int | None = None,
+        fields: list[str] | None = None
+) -> dict | None:
+    profiler = _new_profiler(profile)
+    overlay_spec = _overlay_spec(rolling, fit)
+    terminal_size = None
+    with _stage(profiler, "parse") as stage:
+        if _can_rasterize_while_reading(x_lim, y_lim, style, overlay_spec) and group_by is None:
+            import shutil
+
+            terminal_size = shutil.get_terminal_size()
+            data_sequences, stage.points = _rasterize_csv(
+                file_paths, sep, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, terminal_size, fields
+            )
+        else:
+            data_sequences = _read_sequences(
+                file_paths, sep, group_by=group_by, overlay_spec=overlay_spec, fields=fields
+            )
+            stage.points = sum(len(seq.x) for seq in data_sequences)
+    plot_sequences(
+        data_sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, style, autoscale, clip,
+        profiler=profiler, color=color, terminal_size=terminal_size, workers=workers
+    )
+    return None if profiler is None else profiler.to_dict()
+
+
+def _rasterize_csv(
+        file_paths: list[str],
+        sep: str | None,
+        x_label: str | None,
+        y_label: str | None,
+        x_scale: str,
+        y_scale: str,
+        x_lim: tuple[float, float],
+        y_lim: tuple[float, float],
+        legend_loc: str,
+        terminal_size: os.terminal_size,
+        fields: list[str] | None = None
+) -> tuple[list[DataSequence], int]:
+    # Each parsed row goes straight to the cell grid, so the memory is O(terminal cells) for any input size.
+    # The legend (and so the grid) depends on the names in all the files, so every header is read first.
+    import contextlib
+    from scatterminal.csv_parser import iter_rows, stream_sequences
+    from scatterminal.raster import CellReducer
+
+    if len(file_paths) == 0:
+        raise ValueError("Specify at least one file")
+    with contextlib.ExitStack() as stack:
+        streams = []
+        placeholders = []
+        for file_path in file_paths:
+            if file_path == STDIN_PATH:
+                rows = iter_rows(sys.stdin, None, sep, fields)
+            else:
+                rows = iter_rows(stack.enter_context(open(file_path, "r")), file_path.split(".")[-1], sep, fields)
+            sequences, values_iter = stream_sequences(rows, len(placeholders))
+            streams.append((len(placeholders), len(sequences), values_iter))
+            placeholders.extend(sequences)
+
+        grid = _new_cell_grid(placeholders, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, terminal_size)
+        reducers = [CellReducer(grid, seq) for seq in placeholders]
+        for start, num, values_iter in streams:
+            file_reducers = [reducer.add for reducer in reducers[start:start + num]]
+            for values in values_iter:
+                x = values[0]
+                for add, y in zip(file_reducers, values[1:]):
+                    add(x, y)
+    return [reducer.to_data_sequence() for reducer in reducers], sum(reducer.points for reducer in reducers)
+
+
+def _can_rasterize_while_reading(
+        x_lim: tuple[float, float] | None,
+        y_lim: tuple[float, float] | None,
+        style: str,
+        overlay_spec: OverlaySpec | None
+) -> bool:
+    # Scatter markers are independent points; lines and bars (and overlays) need every point of a sequence
+    return (x_lim is not None) and (y_lim is not None) and style == "scatter" and overlay_spec is None
+
+
+def _overlay_spec(rolling: int | None, fit: str | None) -> OverlaySpec | None:
+    if rolling is None and fit is None:
+        return None
+    from scatterminal.overlay import OverlaySpec
+    return OverlaySpec(rolling, fit)
+
+
+def _read_file_path(
+        file_path: str,
+        sep: str | None,
+        next_id: int,
+        group_by: str | None = None,
+        overlay_spec: OverlaySpec | None = None,
+        fields: list[str] | None = None
+) -> list[DataSequence]:
+    from scatterminal.csv_parser import iter_rows, parse_stream, parse_grouped_stream
+
+    if fields is not None and group_by is not None and group_by not in fields:
+        fields = fields + [group_by]
+
+    def _parse(rows):
+        if group_by is None:
+            return parse_stream(rows, next_id, overlay_spec)
+        return parse_grouped_stream(rows, group_by, next_id, overlay_spec)
+
+    if file_path == STDIN_PATH:
+        return _parse(iter_rows(sys.stdin, None, sep, fields))
+    with open(file_path, "r") as f:
+        return _parse(iter_rows(f, file_path.split(".")[-1], sep, fields))
+
+
+def _read_sequences(
+        file_paths: list[str],
+        sep: str | None,
+        read_func: Callable[
+            [str, str | None, int, str | None, OverlaySpec | None, list[str] | None], list[DataSequence]
+        ] = _read_file_path,
+        group_by: str | None = None,
+        overlay_spec: OverlaySpec | None = None,
+        fields: list[str] | None = None
+) -> list[DataSequence]:
     next_id = 0
     data_sequences = []
     if len(file_paths) == 0:
         raise ValueError("Specify at least one file")
 
     for file_path in file_paths:
-        with open(file_path, "r") as f:
-            str_cells = read_file(f, file_path.split(".")[-1], sep)
-        data_sequences.extend(parse(str_cells, next_id))
+        data_sequences.extend(read_func(file_path, sep, next_id, group_by, overlay_spec, fields))
         next_id = len(data_sequences)
-    _plot(data_sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc)
+    return data_sequences
 
 
 def plot_inline(
-        data_sequences: list[SimpleDataSequence],
+        data_sequences: list[SimpleDataSequence | Iterable[tuple[int | float, int | float]]],
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        autoscale: str = "minmax",
+        clip: tuple[float, float] = DEFAULT_CLIP,
+        profile: bool = False,
+        rolling: int | None = None,
+        fit: str | None = None,
+        color: str = "auto",
+        workers: int | None = None) -> dict | None:
+    # Besides SimpleDataSequence of lists, generators are accepted: SimpleDataSequence of x and y iterables,
+    # or any iterable of (x, y) pairs. They are consumed once.
+    from scatterminal.data_layer_model import SimpleDataSequence
+
+    profiler = _new_profiler(profile)
+    sources = [seq if isinstance(seq, SimpleDataSequence) else _PairSource(seq) for seq in data_sequences]
+    overlay_spec = _overlay_spec(rolling, fit)
+    terminal_size = None
+    grid = None
+    if _can_rasterize_while_reading(x_lim, y_lim, style, overlay_spec) and any(source.is_lazy for source in sources):
+        # with fixed limits, lazy sources are reduced to the cells they are drawn in, so the memory stays bounded
+        import shutil
+        from scatterminal.data_layer_model import DataSequence
+        from scatterminal.raster import CellReducer
+
+        terminal_size = shutil.get_terminal_size()
+        placeholders = [DataSequence.trusted([], [], i, source.name) for i, source in enumerate(sources)]
+        grid = _new_cell_grid(placeholders, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, terminal_size)
+
+    identified_data_sequences = []
+    for i, source in enumerate(sources):
+        if source.is_lazy and (grid is not None):
+            reducer = CellReducer(grid, placeholders[i])
+            reducer.update(source.pairs())
+            identified_data_sequences.append(reducer.to_data_sequence())
+        else:
+            identified_data_sequences.append(source.to_data_sequence(i))
+    if overlay_spec is not None:
+        identified_data_sequences += _overlay_sequences(identified_data_sequences, overlay_spec)
+    plot_sequences(
+        identified_data_sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, style, autoscale, clip,
+        profiler=profiler, color=color, terminal_size=terminal_size, workers=workers
+    )
+    return None if profiler is None else profiler.to_dict()
+
+
+def _overlay_sequences(data_sequences: list[DataSequence], overlay_spec: OverlaySpec) -> list[DataSequence]:
+    # overlays of sequences that are already built (the CSV parser feeds them while parsing instead)
+    from scatterminal.overlay import overlay_sequences
+
+    overlay_sources = []
+    for seq in data_sequences:
+        overlays = overlay_spec.new_overlays()
+        for x, y in zip(seq.x, seq.y):
+            for overlay in overlays:
+                overlay.add(x, y)
+        overlay_sources.append((seq, overlays))
+    return overlay_sequences(overlay_sources, len(data_sequences))
+
+
+def plot_sqlite(
+        db_path: str,
+        query: str,
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        autoscale: str = "minmax",
+        clip: tuple[float, float] = DEFAULT_CLIP,
+        profile: bool = False,
+        rolling: int | None = None,
+        fit: str | None = None,
+        color: str = "auto",
+        workers: int | None = None
+) -> dict | None:
+    # The columns of the query are read like the columns of a CSV file (x first).
+    # With fixed limits (as for `plot_csv`), the rasterization is pushed down into SQL as GROUP BY cell.
+    from scatterminal import sqlite_source
+
+    query = sqlite_source.strip_query(query)
+    profiler = _new_profiler(profile)
+    overlay_spec = _overlay_spec(rolling, fit)
+    terminal_size = None
+    connection = sqlite_source.connect(db_path)
+    try:
+        with _stage(profiler, "parse") as stage:
+            pushed_down = False
+            if _can_rasterize_while_reading(x_lim, y_lim, style, overlay_spec):
+                import shutil
+                from scatterminal.data_layer_model import DataSequence
+                from scatterminal.raster import CellReducer
+
+                terminal_size = shutil.get_terminal_size()
+                names = sqlite_source.query_columns(connection, query)
+                placeholders = [DataSequence.trusted([], [], i, name, names[0]) for i, name in enumerate(names[1:])]
+                grid = _new_cell_grid(
+                    placeholders, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, terminal_size
+                )
+                if sqlite_source.can_push_down(connection, query, grid):
+                    reducers = [CellReducer(grid, seq) for seq in placeholders]
+                    stage.points = sqlite_source.reduce_to_cells(connection, query, grid, reducers)
+                    data_sequences = [reducer.to_data_sequence() for reducer in reducers]
+                    pushed_down = True
+            if not pushed_down:
+                data_sequences = sqlite_source.read_query(connection, query)
+                stage.points = sum(len(seq.x) for seq in data_sequences)
+    finally:
+        connection.close()
+    if overlay_spec is not None:
+        data_sequences += _overlay_sequences(data_sequences, overlay_spec)
+    plot_sequences(
+        data_sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, style, autoscale, clip,
+        profiler=profiler, color=color, terminal_size=terminal_size, workers=workers
+    )
+    return None if profiler is None else profiler.to_dict()
+
+
+def _plot_hist_sqlite(
+        db_path: str,
+        query: str,
+        column: str,
+        bins: int = 20,
+        x_label: str | None = None,
+        y_label: str | None = "count",
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        color: str = "auto"):
+    # the bins are counted by SQL (GROUP BY bin), so only O(bins) rows are fetched
+    from scatterminal import sqlite_source
+    from scatterminal.data_layer_model import DataScaleType
+
+    query = sqlite_source.strip_query(query)
+    connection = sqlite_source.connect(db_path)
+    try:
+        # an index is labelled with the name of the column
+        name = sqlite_source._find_column(sqlite_source.query_columns(connection, query), column)
+        histogram = sqlite_source.fill_histogram(connection, query, name, bins, x_lim, DataScaleType(x_scale))
+    finally:
+        connection.close()
+    _plot_histogram(histogram, name, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, color)
+
+
+class _PairSource:
+    # an iterable of (x, y) pairs in place of a SimpleDataSequence
+    is_lazy = True
+    name = None
+
+    def __init__(self, pairs: Iterable[tuple[int | float, int | float]]):
+        self._pairs = pairs
+
+    def pairs(self) -> Iterable[tuple[int | float, int | float]]:
+        return self._pairs
+
+    def to_data_sequence(self, seq_id: int) -> DataSequence:
+        from scatterminal.data_layer_model import consume_pairs
+        return consume_pairs(self._pairs, seq_id)
+
+
+def _new_cell_grid(
+        sequences: list[DataSequence],
+        x_label: str | None,
+        y_label: str | None,
+        x_scale: str,
+        y_scale: str,
+        x_lim: tuple[float, float],
+        y_lim: tuple[float, float],
+        legend_loc: str,
+        terminal_size: os.terminal_size
+):
+    # the cells of the plot area, from the names of the sequences and the fixed limits (the values are not needed)
+    from scatterminal.raster import CellGrid
+
+    return CellGrid(_build_data(sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc), terminal_size)
+
+
+def plot_hist(
+        values: Iterable[int | float],
+        bins: int = 20,
+        name: str | None = None,
+        x_label: str | None = None,
+        y_label: str | None = "count",
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        color: str = "auto"):
+    # values are consumed once; only the bin counts are kept
+    from scatterminal.histogram import StreamingHistogram
+    from scatterminal.data_layer_model import DataScaleType
+
+    histogram = StreamingHistogram(bins, x_lim, DataScaleType(x_scale))
+    histogram.update(values)
+    _plot_histogram(histogram, name, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, color)
+
+
+def _plot_hist_csv(
+        file_paths: list[str],
+        sep: str | None,
+        column: str,
+        bins: int = 20,
+        x_label: str | None = None,
+        y_label: str | None = "count",
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        color: str = "auto"):
+    import itertools
+    from scatterminal.csv_parser import iter_rows, iter_column, column_name
+    from scatterminal.histogram import StreamingHistogram
+    from scatterminal.data_layer_model import DataScaleType
+
+    if len(file_paths) == 0:
+        raise ValueError("Specify at least one file")
+    histogram = StreamingHistogram(bins, x_lim, DataScaleType(x_scale))
+    names = []
+
+    def _count(rows):
+        # an index is labelled with the header name of the first file
+        first_row = next(rows, None)
+        if first_row is None:
+            return
+        names.append(column_name(first_row, column))
+        histogram.update(iter_column(itertools.chain((first_row,), rows), column))
+
+    for file_path in file_paths:
+        if file_path == STDIN_PATH:
+            _count(iter_rows(sys.stdin, None, sep, [column]))
+            continue
+        with open(file_path, "r") as f:
+            _count(iter_rows(f, file_path.split(".")[-1], sep, [column]))
+    _plot_histogram(histogram, names[0] if names else column, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, color)
+
+
+def _stats_csv(file_paths: list[str], sep: str | None, fields: list[str] | None = None) -> str:
+    # each file is summarized in one pass and the partial results are merged by column name
+    from scatterminal.csv_parser import iter_rows
+    from scatterminal.stats import collect_column_stats, merge_column_stats, format_stats
+
+    if len(file_paths) == 0:
+        raise ValueError("Specify at least one file")
+    stats_list = []
+    for file_path in file_paths:
+        if file_path == STDIN_PATH:
+            stats_list.append(collect_column_stats(iter_rows(sys.stdin, None, sep, fields)))
+            continue
+        with open(file_path, "r") as f:
+            stats_list.append(collect_column_stats(iter_rows(f, file_path.split(".")[-1], sep, fields)))
+    return format_stats(merge_column_stats(stats_list))
+
+
+def _plot_histogram(
+        histogram: StreamingHistogram,
+        name: str | None,
+        x_label: str | None,
+        y_label: str | None,
+        x_scale: str,
+        y_scale: str,
+        x_lim: tuple[float, float] | None,
+        y_lim: tuple[float, float] | None,
+        legend_loc: str,
+        color: str = "auto"):
+    data_sequence = histogram.to_data_sequence(0, name)
+    if y_scale == "log":
+        # empty bins cannot be drawn on log-scale
+        pairs = [(x, y) for x, y in zip(data_sequence.x, data_sequence.y) if y > 0]
+        data_sequence = data_sequence.derive(x=[p[0] for p in pairs], y=[p[1] for p in pairs])
+    if x_lim is None:
+        # the estimated range only grows, so it is trimmed to the non-empty bins
+        edges = histogram.edges()
+        filled = [i for i, count in enumerate(histogram.counts) if count > 0]
+        x_lim = (edges[filled[0]], edges[filled[-1] + 1])
+    if y_lim is None and y_scale == "linear":
+        # bars stand on zero
+        y_lim = (0, max(data_sequence.y) * 1.1)
+    plot_sequences([data_sequence], x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, "bar", color=color)
+
+
+class _NullStage:
+    points = 0
+
+    def __enter__(self) -> _NullStage:
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _new_profiler(profile: bool) -> Profiler | None:
+    if not profile:
+        return None
+    from scatterminal.profiling import Profiler
+    return Profiler()
+
+
+def _stage(profiler: Profiler | None, name: str):
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name)
+
+
+def plot_sequences(
+        data_sequences: list[DataSequence],
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        autoscale: str = "minmax",
+        clip: tuple[float, float] = DEFAULT_CLIP,
+        profiler: Profiler | None = None,
+        color: str = "auto",
+        terminal_size: os.terminal_size | None = None,
+        workers: int | None = None):
+    from scatterminal.color import resolve_color_mode
+
+    print(_render(
+        data_sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, style, autoscale, clip,
+        terminal_size=terminal_size, profiler=profiler, color_mode=resolve_color_mode(color, sys.stdout),
+        workers=workers
+    ))
+
+
+def _render(
+        data_sequences: list[DataSequence],
         x_label: str | None = None,
         y_label: str | None = None,
         x_scale: str = "linear",
         y_scale: str = "linear",
         x_lim: tuple[float, float] | None = None,
         y_lim: tuple[float, float] | None = None,
-        legend_loc: str = "lower"):
-    identified_data_sequences = [data_sequences[i].to_data_sequence(i) for i in range(len(data_sequences))]
-    _plot(identified_data_sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc)
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        autoscale: str = "minmax",
+        clip: tuple[float, float] = DEFAULT_CLIP,
+        terminal_size: os.terminal_size | None = None,
+        profiler: Profiler | None = None,
+        color_mode: str = "never",
+        workers: int | None = None) -> str:
+    return _draw(
+        data_sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, style, autoscale, clip,
+        terminal_size=terminal_size, profiler=profiler, color_mode=color_mode, workers=workers
+    ).render(color_mode)
 
 
-def _plot(
+def _build_data(
         data_sequences: list[DataSequence],
         x_label: str | None = None,
         y_label: str | None = None,
@@ -59,7 +562,12 @@ def _plot(
         y_scale: str = "linear",
         x_lim: tuple[float, float] | None = None,
         y_lim: tuple[float, float] | None = None,
-        legend_loc: str = "lower"):
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        autoscale: str = "minmax",
+        clip: tuple[float, float] = DEFAULT_CLIP) -> Data:
+    from scatterminal.data_layer_model import DataScaleType, DataAxis, Data, DataLegendLoc, DataPlotStyle
+
     if x_label is None:
         x_labels = set(seq.x_name for seq in data_sequences)
         if len(x_labels) == 1:
@@ -69,40 +577,230 @@ def _plot(
         if len(y_labels) == 1:
             y_label = y_labels.pop()
 
+    if x_scale == "linear" and len(data_sequences) > 0 and all(seq.x_time for seq in data_sequences):
+        # x parsed from timestamps
+        x_scale = "time"
+
+    if autoscale not in AUTOSCALE_CHOICES:
+        raise ValueError("Unknown autoscale: %s" % autoscale)
+    quantile_clip = tuple(clip) if autoscale == "quantile" else None
+
     x_lim = (None, None) if x_lim is None else x_lim
-    x_axis = DataAxis(DataScaleType(x_scale), x_label, x_lim[0], x_lim[1])
+    x_axis = DataAxis(DataScaleType(x_scale), x_label, x_lim[0], x_lim[1], quantile_clip)
     y_lim = (None, None) if y_lim is None else y_lim
-    y_axis = DataAxis(DataScaleType(y_scale), y_label, y_lim[0], y_lim[1])
+    y_axis = DataAxis(DataScaleType(y_scale), y_label, y_lim[0], y_lim[1], quantile_clip)
 
-    data = Data(data_sequences, x_axis, y_axis, DataLegendLoc(legend_loc))
-    canvas = data.to_canvas(Canvas)
-    terminal_ = canvas.to_terminal(Terminal)
-    terminal_.plot()
+    return Data(data_sequences, x_axis, y_axis, DataLegendLoc(legend_loc), DataPlotStyle(style))
 
 
-def main():
-    parser = argparse.ArgumentParser(
+def _draw(
+        data_sequences: list[DataSequence],
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        autoscale: str = "minmax",
+        clip: tuple[float, float] = DEFAULT_CLIP,
+        terminal_size: os.terminal_size | None = None,
+        profiler: Profiler | None = None,
+        color_mode: str = "never",
+        workers: int | None = None) -> _CharField:
+    from scatterminal.canvas_layer_model import Canvas
+    from scatterminal.terminal_layer_model import Terminal
+
+    data = _build_data(data_sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, style, autoscale, clip)
+    if (workers is not None) and style == "scatter":
+        from scatterminal import parallel
+
+        point_num = sum(len(seq.x) for seq in data_sequences)
+        worker_num = parallel.worker_num(workers, point_num)
+        if worker_num > 1:
+            import shutil
+
+            with _stage(profiler, "parallel rasterize (%d workers)" % worker_num) as stage:
+                stage.points = point_num
+                return parallel.draw(data, terminal_size or shutil.get_terminal_size(), color_mode, worker_num)
+    with _stage(profiler, "Data.to_canvas") as stage:
+        canvas = data.to_canvas(Canvas)
+        stage.points = len(canvas.markers)
+    with _stage(profiler, "Canvas.to_terminal") as stage:
+        terminal_ = canvas.to_terminal(Terminal, terminal_size, color_mode)
+        stage.points = len(terminal_.plot_markers)
+    with _stage(profiler, "Terminal.render") as stage:
+        char_field = terminal_.draw()
+        stage.points = len(terminal_.plot_markers)
+    return char_field
+
+
+def plot_grid(
+        rows: int,
+        cols: int,
+        panels: list[list[SimpleDataSequence]],
+        share_x: bool = False,
+        share_y: bool = False,
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        autoscale: str = "minmax",
+        clip: tuple[float, float] = DEFAULT_CLIP,
+        color: str = "auto"):
+    from scatterminal.color import resolve_color_mode
+
+    identified_panels = [[panel[i].to_data_sequence(i) for i in range(len(panel))] for panel in panels]
+    frame = _render_grid(
+        rows, cols, identified_panels, share_x, share_y,
+        x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, style, autoscale, clip,
+        color_mode=resolve_color_mode(color, sys.stdout)
+    )
+    # one write for the whole grid
+    sys.stdout.write(frame + "\n")
+    sys.stdout.flush()
+
+
+def _render_grid(
+        rows: int,
+        cols: int,
+        panels: list[list[DataSequence]],
+        share_x: bool = False,
+        share_y: bool = False,
+        x_label: str | None = None,
+        y_label: str | None = None,
+        x_scale: str = "linear",
+        y_scale: str = "linear",
+        x_lim: tuple[float, float] | None = None,
+        y_lim: tuple[float, float] | None = None,
+        legend_loc: str = "lower",
+        style: str = "scatter",
+        autoscale: str = "minmax",
+        clip: tuple[float, float] = DEFAULT_CLIP,
+        terminal_size: os.terminal_size | None = None,
+        color_mode: str = "never") -> str:
+    import shutil
+
+    if rows < 1 or cols < 1:
+        raise ValueError("rows and cols must be positive: (rows, cols)=(%d, %d)" % (rows, cols))
+    if len(panels) > rows * cols:
+        raise ValueError("Too many panels for the grid: (panels, rows, cols)=(%d, %d, %d)" % (len(panels), rows, cols))
+
+    if terminal_size is None:
+        terminal_size = shutil.get_terminal_size()
+    panel_size = os.terminal_size((terminal_size.columns // cols, terminal_size.lines // rows))
+
+    if share_x or share_y:
+        # the shared range is computed once; equal axes then also share the cached ticks and axis rows
+        all_sequences = [seq for panel in panels for seq in panel]
+        shared_x_range, shared_y_range = _build_data(
+            all_sequences, x_label, y_label, x_scale, y_scale, x_lim, y_lim, autoscale=autoscale, clip=clip
+        ).calc_canvas_ranges()
+        x_lim = shared_x_range if share_x else x_lim
+        y_lim = shared_y_range if share_y else y_lim
+
+    char_fields = [
+        _draw(
+            panel, x_label, y_label, x_scale, y_scale, x_lim, y_lim, legend_loc, style, autoscale, clip,
+            terminal_size=panel_size, color_mode=color_mode
+        ) for panel in panels
+    ]
+
+    lines = []
+    for i_panel, char_field in enumerate(char_fields):
+        lines.extend("panel %d: %s" % (i_panel, w) for w in char_field.warning_lines())
+
+    empty_panel = [" " * panel_size.columns] * panel_size.lines
+    for i_row in range(rows):
+        row_frames = []
+        for i_col in range(cols):
+            index = i_row * cols + i_col
+            row_frames.append(char_fields[index].frame_lines(color_mode) if index < len(char_fields) else empty_panel)
+        for i_line in range(panel_size.lines):
+            lines.append("".join(frame[i_line] for frame in row_frames))
+    return "\n".join(lines)
+
+
+def _plot_facets(
+        file_paths: list[str],
+        sep: str | None,
+        facet_cols: int | None,
+        share_x: bool,
+        share_y: bool,
+        group_by: str | None = None,
+        overlay_spec: OverlaySpec | None = None,
+        color: str = "auto",
+        fields: list[str] | None = None,
+        **plot_kwargs):
+    import math
+    from scatterminal.color import resolve_color_mode
+
+    if len(file_paths) == 0:
+        raise ValueError("Specify at least one file")
+    panels = [_read_file_path(file_path, sep, 0, group_by, overlay_spec, fields) for file_path in file_paths]
+    cols = facet_cols or int(math.ceil(math.sqrt(len(panels))))
+    rows = int(math.ceil(len(panels) / cols))
+    frame = _render_grid(
+        rows, cols, panels, share_x, share_y, color_mode=resolve_color_mode(color, sys.stdout), **plot_kwargs
+    )
+    sys.stdout.write(frame + "\n")
+    sys.stdout.flush()
+
+
+def _build_parser(parser_class: type[argparse.ArgumentParser] | None = None) -> argparse.ArgumentParser:
+    import argparse
+
+    parser = (parser_class or argparse.ArgumentParser)(
         prog="scatterminal",
         description="Plot scatter plot on terminal",
     )
     parser.add_argument(
         "file_path",
         nargs="*",
-        help="File path to plot (multiple designations possible)"
+        help="File path to plot (multiple designations possible). "
+             "'-' or no file path with piped input reads from stdin."
     )
     parser.add_argument(
         "--sep",
-        help="Separator character. If not specified, it is inferred from the extension."
+        help="Separator character. If not specified, it is inferred from the extension "
+             "(.csv, .tsv; the dialect is sniffed from the first lines for other files and stdin)."
+    )
+    parser.add_argument(
+        "--fields",
+        metavar="FIELD[,FIELD...]",
+        type=_parse_fields,
+        help="Fields of JSON Lines (.jsonl, .ndjson) to plot, x first; dotted paths select nested fields. "
+             "Default: the top-level fields of the first line"
+    )
+    parser.add_argument(
+        "--sqlite",
+        metavar="DB",
+        help="Plot the rows of --query from the SQLite database DB instead of files (the first column is x)"
+    )
+    parser.add_argument(
+        "--query",
+        metavar="SQL",
+        help="SELECT statement with --sqlite. Fixed --xlim/--ylim and --hist are aggregated in the database"
+    )
+    parser.add_argument(
+        "--group-by",
+        metavar="COL",
+        help="Split long-format rows into one data sequence per value of column COL (header name or index)"
     )
     parser.add_argument(
         "--xscale",
-        choices=[scale.value for scale in DataScaleType],
-        help="Scale type of x axis",
+        choices=SCALE_CHOICES,
+        help="Scale type of x axis. 'time' shows epoch seconds as date and time (chosen automatically for timestamps)",
         default="linear"
     )
     parser.add_argument(
         "--yscale",
-        choices=[scale.value for scale in DataScaleType],
+        choices=SCALE_CHOICES,
         help="Scale type of y axis",
         default="linear"
     )
@@ -130,20 +828,285 @@ def main():
     )
     parser.add_argument(
         "--legend-loc",
-        choices=[loc.value for loc in DataLegendLoc],
+        choices=LEGEND_LOC_CHOICES,
         help="Position of legend",
         default="lower"
     )
+    parser.add_argument(
+        "--style",
+        choices=STYLE_CHOICES,
+        help="Plot style. 'line' connects consecutive points of each data sequence, 'bar' draws bars up to each point",
+        default="scatter"
+    )
+    parser.add_argument(
+        "--autoscale",
+        choices=AUTOSCALE_CHOICES,
+        help="How axes without limits are ranged: 'minmax' of the data, "
+             "or 'quantile' to leave outliers out (see --clip)",
+        default="minmax"
+    )
+    parser.add_argument(
+        "--clip",
+        type=_parse_clip,
+        metavar="LOW,HIGH",
+        help="Percentiles of the range with --autoscale quantile (default: %g,%g)" % DEFAULT_CLIP,
+        default=DEFAULT_CLIP
+    )
+    parser.add_argument(
+        "--rolling",
+        type=int,
+        metavar="N",
+        help="Overlay the rolling mean of the last N points of each data sequence"
+    )
+    parser.add_argument(
+        "--fit",
+        choices=FIT_CHOICES,
+        help="Overlay the least-squares fit of each data sequence ('loglog' fits a power law)"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print count, min, max, mean, std and approximate quantiles of every column instead of plotting"
+    )
+    parser.add_argument(
+        "--hist",
+        metavar="COL",
+        help="Plot the histogram of column COL (header name or index), counted in a single pass"
+    )
+    parser.add_argument(
+        "--bins",
+        type=int,
+        help="Number of histogram bins with --hist",
+        default=20
+    )
+    parser.add_argument(
+        "--facet",
+        action="store_true",
+        help="Plot each file in its own panel of a grid written as one frame"
+    )
+    parser.add_argument(
+        "--facet-cols",
+        type=int,
+        help="Number of panel columns with --facet (default: square-ish grid)"
+    )
+    parser.add_argument(
+        "--sharex",
+        action="store_true",
+        help="Use the same x range in all panels with --facet"
+    )
+    parser.add_argument(
+        "--sharey",
+        action="store_true",
+        help="Use the same y range in all panels with --facet"
+    )
+    parser.add_argument(
+        "--animate",
+        action="store_true",
+        help="Replay time-ordered rows as frames of an x window sliding forward (see --window, --step and --fps). "
+             "y is autoscaled to each window unless --ylim is given"
+    )
+    parser.add_argument(
+        "--window",
+        type=float,
+        help="Width of the x window with --animate (seconds for timestamps)"
+    )
+    parser.add_argument(
+        "--step",
+        type=float,
+        help="Distance the window moves per frame with --animate (default: a tenth of --window)"
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        help="Maximum frame rate with --animate",
+        default=DEFAULT_FPS
+    )
+    parser.add_argument(
+        "--color",
+        choices=COLOR_CHOICES,
+        help="Colour each data sequence with ANSI escapes. "
+             "'auto' picks the palette from the terminal and is colourless when NO_COLOR is set or stdout is not a tty",
+        default="auto"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Rasterize scatter plots of many points in N processes (0: one per core). "
+             "The output is the same as with one process"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print wall time, processed points and peak memory of each stage to stderr"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Serve plot requests on a unix socket (see --socket) to avoid interpreter startup per call"
+    )
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help="Forward this call to a running daemon. Falls back to local plotting if no daemon is listening."
+    )
+    parser.add_argument(
+        "--socket",
+        help="Unix socket path of the daemon"
+    )
+    return parser
+
+
+def _parse_fields(value: str) -> list[str]:
+    import argparse
+
+    fields = [field.strip() for field in value.split(",")]
+    if any(len(field) == 0 for field in fields):
+        raise argparse.ArgumentTypeError("expected comma-separated field names: %s" % value)
+    return fields
+
+
+def _parse_clip(value: str) -> tuple[float, float]:
+    import argparse
 
-    argv = parser.parse_args()
-    plot_csv(
-        file_paths=argv.file_path,
-        sep=argv.sep,
+    try:
+        low, high = (float(v) for v in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected LOW,HIGH percentiles: %s" % value) from None
+    if not (0 <= low < high <= 100):
+        raise argparse.ArgumentTypeError("percentiles must be 0 <= LOW < HIGH <= 100: %s" % value)
+    return low, high
+
+
+def _plot_kwargs(argv: argparse.Namespace) -> dict:
+    return dict(
         x_label=argv.xlabel,
         y_label=argv.ylabel,
         x_scale=argv.xscale,
         y_scale=argv.yscale,
         x_lim=argv.xlim,
         y_lim=argv.ylim,
+        legend_loc=argv.legend_loc,
+        style=argv.style,
+        autoscale=argv.autoscale,
+        clip=argv.clip
+    )
+
+
+def _reject_options(parser: argparse.ArgumentParser, argv: argparse.Namespace, mode: str, dests: tuple[str, ...]):
+    # an option the mode does not use is an error rather than silently ignored
+    for dest in dests:
+        if getattr(argv, dest) != parser.get_default(dest):
+            parser.error("--%s is not available with %s" % (dest.replace("_", "-"), mode))
+
+
+def _check_clip(parser: argparse.ArgumentParser, argv: argparse.Namespace):
+    # the percentiles only range the axes of a quantile autoscale (--hist and --animate reject both options)
+    if argv.hist is None and not argv.animate and argv.clip != parser.get_default("clip") and argv.autoscale != "quantile":
+        parser.error("--clip is only used with --autoscale quantile")
+
+
+def _hist_kwargs(parser: argparse.ArgumentParser, argv: argparse.Namespace) -> dict:
+    # --xlim is the range of the bins
+    _reject_options(parser, argv, "--hist", ("style", "autoscale", "clip", "group_by", "rolling", "fit", "workers"))
+    return dict(
+        x_label=argv.xlabel,
+        y_label="count" if argv.ylabel is None else argv.ylabel,
+        x_scale=argv.xscale,
+        y_scale=argv.yscale,
+        x_lim=argv.xlim,
+        y_lim=argv.ylim,
         legend_loc=argv.legend_loc
     )
+
+
+def _animate_kwargs(parser: argparse.ArgumentParser, argv: argparse.Namespace) -> dict:
+    # x is ranged by the window, and y by each frame unless --ylim is given
+    _reject_options(parser, argv, "--animate", ("xlim", "autoscale", "clip", "group_by", "rolling", "fit", "workers"))
+    return dict(
+        x_label=argv.xlabel,
+        y_label=argv.ylabel,
+        x_scale=argv.xscale,
+        y_scale=argv.yscale,
+        y_lim=argv.ylim,
+        legend_loc=argv.legend_loc,
+        style=argv.style
+    )
+
+
+def main():
+    args = sys.argv[1:]
+    if "--client" in args:
+        # thin path: nothing but the socket round trip when a daemon is listening
+        from scatterminal.daemon import client_main
+        if client_main(args):
+            return
+
+    parser = _build_parser()
+    argv = parser.parse_args(args)
+    _check_clip(parser, argv)
+    if argv.daemon:
+        from scatterminal.daemon import serve
+        serve(argv.socket)
+        return
+
+    if argv.sqlite is not None:
+        _sqlite_main(parser, argv)
+        return
+
+    file_paths = argv.file_path
+    if len(file_paths) == 0 and not sys.stdin.isatty():
+        file_paths = [STDIN_PATH]
+    if argv.stats:
+        sys.stdout.write(_stats_csv(file_paths, argv.sep, argv.fields) + "\n")
+        return
+    if argv.hist is not None:
+        _plot_hist_csv(file_paths, argv.sep, argv.hist, argv.bins, color=argv.color, **_hist_kwargs(parser, argv))
+        return
+    if argv.animate:
+        if argv.window is None:
+            parser.error("--window is required with --animate")
+        for option, value in (("--window", argv.window), ("--step", argv.step), ("--fps", argv.fps)):
+            if value is not None and not value > 0:
+                parser.error("%s must be positive: %g" % (option, value))
+        from scatterminal.animate import animate_csv
+        plot_kwargs = _animate_kwargs(parser, argv)
+        try:
+            animate_csv(
+                file_paths, argv.window, argv.step, argv.fps, argv.sep, color=argv.color, fields=argv.fields,
+                **plot_kwargs
+            )
+        except KeyboardInterrupt:
+            pass
+        return
+    if argv.facet:
+        _plot_facets(
+            file_paths, argv.sep, argv.facet_cols, argv.sharex, argv.sharey, argv.group_by,
+            _overlay_spec(argv.rolling, argv.fit), argv.color, argv.fields, **_plot_kwargs(argv)
+        )
+        return
+    profile = plot_csv(
+        file_paths=file_paths, sep=argv.sep, profile=argv.profile, group_by=argv.group_by,
+        rolling=argv.rolling, fit=argv.fit, color=argv.color, workers=argv.workers, fields=argv.fields,
+        **_plot_kwargs(argv)
+    )
+    if profile is not None:
+        from scatterminal.profiling import format_report
+        print(format_report(profile), file=sys.stderr)
+
+
+def _sqlite_main(parser: argparse.ArgumentParser, argv: argparse.Namespace):
+    if argv.query is None:
+        parser.error("--query is required with --sqlite")
+    if len(argv.file_path) > 0 or argv.group_by or argv.stats or argv.facet or argv.animate:
+        parser.error("--sqlite plots the query alone, as a plot or with --hist")
+    if argv.hist is not None:
+        _plot_hist_sqlite(argv.sqlite, argv.query, argv.hist, argv.bins, color=argv.color, **_hist_kwargs(parser, argv))
+        return
+    profile = plot_sqlite(
+        argv.sqlite, argv.query, profile=argv.profile, rolling=argv.rolling, fit=argv.fit, color=argv.color,
+        workers=argv.workers, **_plot_kwargs(argv)
+    )
+    if profile is not None:
+        from scatterminal.profiling import format_report
+        print(format_report(profile), file=sys.stderr)
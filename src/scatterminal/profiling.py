@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Callable, Iterator
+import contextlib
+import dataclasses
+import time
+import tracemalloc
+
+
+@dataclasses.dataclass(frozen=True)
+class StageRecord:
+    stage: str
+    seconds: float
+    points: int
+    peak_bytes: int | None
+
+    @property
+    def points_per_second(self) -> float | None:
+        if self.seconds <= 0:
+            return None
+        return self.points / self.seconds
+
+
+ProfileHook = Callable[[StageRecord], None]
+
+_global_hooks: list[ProfileHook] = []
+
+
+def register_hook(hook: ProfileHook):
+    # called with every StageRecord of every profiled plot (e.g. to forward timings to a metrics system)
+    _global_hooks.append(hook)
+
+
+def unregister_hook(hook: ProfileHook):
+    _global_hooks.remove(hook)
+
+
+class StageHandle:
+    def __init__(self):
+        self.points = 0
+
+
+class Profiler:
+    def __init__(self, trace_memory: bool = True, hooks: list[ProfileHook] | None = None):
+        self.trace_memory = trace_memory
+        self.hooks = list(hooks or [])
+        self.records: list[StageRecord] = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[StageHandle]:
+        handle = StageHandle()
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base_memory = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = None
+            if self.trace_memory:
+                peak_bytes = tracemalloc.get_traced_memory()[1] - base_memory
+                if started_tracing:
+                    tracemalloc.stop()
+            self._add(StageRecord(name, seconds, handle.points, peak_bytes))
+
+    def _add(self, record: StageRecord):
+        self.records.append(record)
+        for hook in self.hooks + _global_hooks:
+            hook(record)
+
+    def to_dict(self) -> dict:
+        return {
+            "stages": [
+                {
+                    "stage": r.stage,
+                    "seconds": r.seconds,
+                    "points": r.points,
+                    "points_per_second": r.points_per_second,
+                    "peak_bytes": r.peak_bytes,
+                } for r in self.records
+            ],
+            "total_seconds": sum(r.seconds for r in self.records),
+        }
+
+    def report(self) -> str:
+        return format_report(self.to_dict())
+
+
+def format_report(profile: dict) -> str:
+    lines = ["%-20s %10s %12s %14s %12s" % ("stage", "seconds", "points", "points/s", "peak KiB")]
+    for stage in profile["stages"]:
+        pps = "-" if stage["points_per_second"] is None else "%.0f" % stage["points_per_second"]
+        peak = "-" if stage["peak_bytes"] is None else "%.1f" % (stage["peak_bytes"] / 1024)
+        lines.append("%-20s %10.6f %12d %14s %12s" % (stage["stage"], stage["seconds"], stage["points"], pps, peak))
+    lines.append("%-20s %10.6f" % ("total", profile["total_seconds"]))
+    return "\n".join(lines)
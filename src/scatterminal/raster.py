@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import Iterable
+import math
+import os
+
+from scatterminal.canvas_layer_model import Canvas
+from scatterminal.data_layer_model import Data, DataScaleType, DataSequence
+from scatterminal.terminal_layer_model import Terminal
+
+
+class CellGrid:
+    # With fixed axis limits, the layout (and so the cells of the plot area) does not depend on the data,
+    # so a point can be mapped to the cell it will be drawn in as soon as it is read.
+    # `data` holds the sequences with their names only (x and y may be empty).
+    def __init__(self, data: Data, terminal_size: os.terminal_size):
+        if (data.x_axis.min_ is None) or (data.y_axis.min_ is None):
+            raise ValueError("Both axis limits must be fixed to rasterize while reading")
+        self.canvas_x_range, self.canvas_y_range = data.calc_canvas_ranges()
+        self.columns, self.lines = data.to_canvas(Canvas).grid_size(Terminal, terminal_size)
+        self.x_log = data.x_axis.scale == DataScaleType.log
+        self.y_log = data.y_axis.scale == DataScaleType.log
+        self._project = data.projection(self.canvas_x_range, self.canvas_y_range)
+
+    def is_plottable(self, x: int | float, y: int | float) -> bool:
+        # non-positive values on log-scale (and NaN there) are left to the filter of the data layer
+        return not ((self.x_log and not x > 0) or (self.y_log and not y > 0))
+
+    def cell(self, x: int | float, y: int | float) -> tuple[int, int] | None:
+        # same quantization as the canvas layer; None outside the plot area (or for NaN)
+        rel_x, rel_y = self._project(x, y)
+        if not (math.isfinite(rel_x) and math.isfinite(rel_y)):
+            return None
+        cell_x = round(rel_x * (self.columns - 1))
+        cell_y = round(rel_y * (self.lines - 1))
+        if 0 <= cell_x < self.columns and 0 <= cell_y < self.lines:
+            return cell_x, cell_y
+        return None
+
+
+class CellReducer:
+    # Keeps at most two points of a sequence per cell, in their original order: every point of a cell is drawn
+    # at the same place, and the second one keeps the overlap warning of the cell. The memory is bounded by the
+    # number of cells however many points are added, and the drawn frame is the same as with all points.
+    def __init__(self, grid: CellGrid, sequence: DataSequence):
+        self._grid = grid
+        self._sequence = sequence
+        self._cell_counts: dict[tuple[int, int], int] = {}
+        self._has_non_positive = False
+        self.x: list[int | float] = []
+        self.y: list[int | float] = []
+        self.points = 0
+
+    def add(self, x: int | float, y: int | float):
+        self.points += 1
+        if not self._grid.is_plottable(x, y):
+            if not self._has_non_positive:
+                # one is enough for the warning of the data layer, which then filters it out
+                self._has_non_positive = True
+                self.x.append(x)
+                self.y.append(y)
+            return
+        cell = self._grid.cell(x, y)
+        if cell is None:
+            return
+        count = self._cell_counts.get(cell, 0)
+        if count < 2:
+            self._cell_counts[cell] = count + 1
+            self.x.append(x)
+            self.y.append(y)
+
+    def update(self, pairs: Iterable[tuple[int | float, int | float]]):
+        for x, y in pairs:
+            self.add(x, y)
+
+    def to_data_sequence(self) -> DataSequence:
+        return self._sequence.derive(x=self.x, y=self.y)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import array
+import dataclasses
+import sys
+from multiprocessing import shared_memory
+
+from scatterminal.data_layer_model import DataSequence
+
+_ITEM_SIZE = array.array("d").itemsize
+
+
+@dataclasses.dataclass(frozen=True)
+class SharedSequenceHandle:
+    # a sequence published in a shared memory segment; small to pickle whatever the number of points.
+    # x is the float64 items [offset, offset + length) of the segment and y the next `length` items.
+    segment: str
+    offset: int
+    length: int
+    seq_id: int
+    name: str | None = None
+    x_name: str | None = None
+    x_time: bool = False
+
+
+class SharedSequences:
+    # Publishes the x and y of sequences once, as float64 columns in one shared memory segment, for worker
+    # processes to attach to instead of receiving pickled copies. The publisher owns the segment: it is unlinked
+    # on close (the `with` block ends however the workers end, crashed or not), and the resource tracker of
+    # multiprocessing unlinks it if the publisher itself is killed.
+    def __init__(self, sequences: list[DataSequence]):
+        total = sum(len(seq.x) for seq in sequences)
+        self._segment = shared_memory.SharedMemory(create=True, size=max(2 * total, 1) * _ITEM_SIZE)
+        self.handles: list[SharedSequenceHandle] = []
+        try:
+            columns = self._segment.buf.cast("d")
+            try:
+                offset = 0
+                for seq in sequences:
+                    length = len(seq.x)
+                    columns[offset:offset + length] = _as_float64(seq.x)
+                    columns[offset + length:offset + 2 * length] = _as_float64(seq.y)
+                    self.handles.append(SharedSequenceHandle(
+                        self._segment.name, offset, length, seq.seq_id, seq.name, seq.x_name, seq.x_time
+                    ))
+                    offset += 2 * length
+            finally:
+                # the segment cannot be closed while a view of it is alive
+                columns.release()
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        self._segment.close()
+        try:
+            self._segment.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> SharedSequences:
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.close()
+        return False
+
+
+def _as_float64(values) -> array.array | memoryview:
+    if isinstance(values, array.array) and values.typecode == "d":
+        return values
+    if isinstance(values, memoryview) and values.format == "d":
+        return values
+    return array.array("d", values)
+
+
+class AttachedSequences:
+    # Worker side: the sequences are wrapped around memoryviews of the segment, without copying.
+    # They are valid until close, which releases the views and unmaps the segments (the publisher unlinks them).
+    def __init__(self):
+        self._segments: dict[str, tuple[shared_memory.SharedMemory, memoryview]] = {}
+        self._views: list[memoryview] = []
+
+    def sequence(self, handle: SharedSequenceHandle, start: int = 0, end: int | None = None) -> DataSequence:
+        # points [start, end) of the sequence
+        if handle.segment not in self._segments:
+            segment = _attach(handle.segment)
+            self._segments[handle.segment] = (segment, segment.buf.cast("d"))
+        columns = self._segments[handle.segment][1]
+        end = handle.length if end is None else min(end, handle.length)
+        x = columns[handle.offset + start:handle.offset + end]
+        y = columns[handle.offset + handle.length + start:handle.offset + handle.length + end]
+        self._views.extend((x, y))
+        return DataSequence.trusted(x, y, handle.seq_id, handle.name, handle.x_name, handle.x_time)
+
+    def close(self):
+        # a segment cannot be unmapped while a view of it is alive
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        for segment, columns in self._segments.values():
+            columns.release()
+            segment.close()
+        self._segments.clear()
+
+    def __enter__(self) -> AttachedSequences:
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.close()
+        return False
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        # the publisher tracks the segment; an attaching process must not unlink it when it exits
+        return shared_memory.SharedMemory(name, track=False)
+    # workers of a pool share the tracker of the publisher, where the registration is idempotent
+    return shared_memory.SharedMemory(name)
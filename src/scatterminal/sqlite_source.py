@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from typing import Callable, Iterator
+import array
+import math
+import pathlib
+import sqlite3
+
+from scatterminal.data_layer_model import DataScaleType, DataSequence
+from scatterminal.histogram import StreamingHistogram
+from scatterminal.raster import CellGrid, CellReducer
+from scatterminal.timestamp import detect_parser
+
+BATCH_SIZE = 4096
+_NUMERIC = "typeof(%s) IN ('integer', 'real')"
+_CELL_MARGIN = 1e-9
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    # read-only: a query given on the command line must not modify the database
+    if not pathlib.Path(db_path).is_file():
+        raise FileNotFoundError("No such database: %s" % db_path)
+    return sqlite3.connect(pathlib.Path(db_path).absolute().as_uri() + "?mode=ro", uri=True)
+
+
+def _quote(name: str) -> str:
+    return '"%s"' % name.replace('"', '""')
+
+
+def strip_query(query: str) -> str:
+    # the query is wrapped as a subquery (SELECT ... FROM (query)), where a closing ';' is a syntax error
+    return query.strip().rstrip(";").rstrip()
+
+
+def query_columns(connection: sqlite3.Connection, query: str) -> list[str]:
+    return [description[0] for description in connection.execute("SELECT * FROM (%s) LIMIT 0" % query).description]
+
+
+def _iter_batches(cursor: sqlite3.Cursor, batch_size: int) -> Iterator[list[tuple]]:
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if len(rows) == 0:
+            return
+        yield rows
+
+
+def _extend(column: array.array, values: tuple, parse: Callable[[object], float]):
+    # `array.extend` converts a batch in C; only a batch with NULL or text goes value by value
+    length = len(column)
+    try:
+        column.extend(values)
+    except TypeError:
+        del column[length:]
+        column.extend(map(parse, values))
+
+
+def _parse_number(value: object) -> float:
+    if value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return value
+    raise TypeError("int or float type are only available.")
+
+
+def read_query(
+        connection: sqlite3.Connection,
+        query: str,
+        next_id: int = 0,
+        batch_size: int = BATCH_SIZE
+) -> list[DataSequence]:
+    # The first column is x and the others are y, like the columns of a CSV file (a single column is y over
+    # the row index). Rows are fetched in batches straight into float64 columns; NULL is NaN, and text in x
+    # is parsed as timestamps.
+    cursor = connection.execute(query)
+    names = [description[0] for description in cursor.description]
+    columns = [array.array("d") for _ in names]
+    parsers = [_parse_number] * len(names)
+    x_time = False
+    for rows in _iter_batches(cursor, batch_size):
+        if len(columns) > 1 and len(columns[0]) == 0 and isinstance(rows[0][0], str):
+            timestamp_parser = detect_parser(rows[0][0])
+            if timestamp_parser is None:
+                raise TypeError("int or float type are only available.")
+            parsers[0] = lambda value: math.nan if value is None else timestamp_parser(value)
+            x_time = True
+        for column, values, parse in zip(columns, zip(*rows), parsers):
+            _extend(column, values, parse)
+
+    if len(names) == 1:
+        return [DataSequence.trusted(array.array("d", range(len(columns[0]))), columns[0], next_id, names[0])]
+    return [
+        DataSequence.trusted(columns[0], column, next_id + i, name, names[0], x_time)
+        for i, (name, column) in enumerate(zip(names[1:], columns[1:]))
+    ]
+
+
+def can_push_down(connection: sqlite3.Connection, query: str, grid: CellGrid) -> bool:
+    # the cells are computed in SQL on linear axes of numbers (timestamps as text are parsed in Python)
+    if grid.x_log or grid.y_log or len(query_columns(connection, query)) < 2:
+        return False
+    first_row = connection.execute("SELECT * FROM (%s) LIMIT 1" % query).fetchone()
+    return (first_row is None) or not isinstance(first_row[0], str)
+
+
+def _is_one_cell(low: float, high: float) -> bool:
+    # whether values in [low, high] all round to the same cell, whichever way a .5 tie is rounded
+    # (with a margin for the last bits of the arithmetic in SQL)
+    cell = math.floor(low + 0.5)
+    return cell - 0.5 + _CELL_MARGIN < low and high < cell + 0.5 - _CELL_MARGIN
+
+
+def reduce_to_cells(
+        connection: sqlite3.Connection,
+        query: str,
+        grid: CellGrid,
+        reducers: list[CellReducer]
+) -> int:
+    # Pushdown of the fixed-limit rasterization: the rows are grouped by their cell in SQL, and one point and the
+    # count of each cell come out, so the rows leaving the database are bounded by the number of cells.
+    # CAST(u + 0.5) rounds ties up where the canvas rounds them to even, so SQL only proposes the groups: a group
+    # whose u and v ranges are inside one cell is added as one point (twice for a cell of several points, to keep
+    # its overlap warning), and the rows of a group near a cell edge are fetched and put in their cells in Python.
+    # Text in x or y raises TypeError, as read_query does. Returns the number of aggregated rows.
+    names = query_columns(connection, query)
+    x = _quote(names[0])
+    (x_low, x_high), (y_low, y_high) = grid.canvas_x_range, grid.canvas_y_range
+    params = {
+        "x_low": float(x_low), "x_width": float(x_high - x_low), "x_cells": float(grid.columns - 1),
+        "y_low": float(y_low), "y_width": float(y_high - y_low), "y_cells": float(grid.lines - 1),
+    }
+    point_num = 0
+    for name, reducer in zip(names[1:], reducers):
+        y = _quote(name)
+        has_text = connection.execute(
+            "SELECT EXISTS (SELECT 1 FROM (%s) WHERE typeof(%s) IN ('text', 'blob') OR typeof(%s) IN ('text', 'blob'))"
+            % (query, x, y)
+        ).fetchone()[0]
+        if has_text:
+            raise TypeError("int or float type are only available.")
+        # same arithmetic as the projection; rows just outside the plot area are kept for the check of their group
+        cells = (
+            "SELECT x, y, u, v, CAST(u + 0.5 AS INTEGER) AS cell_x, CAST(v + 0.5 AS INTEGER) AS cell_y FROM ("
+            " SELECT %s AS x, %s AS y,"
+            " ((%s - :x_low) / :x_width) * :x_cells AS u, ((%s - :y_low) / :y_width) * :y_cells AS v"
+            " FROM (%s) WHERE %s AND %s"
+            ") WHERE u > -1 AND u < :x_cells + 1 AND v > -1 AND v < :y_cells + 1"
+            % (x, y, x, y, query, _NUMERIC % x, _NUMERIC % y)
+        )
+        groups = connection.execute(
+            "SELECT cell_x, cell_y, x, y, COUNT(*), MIN(u), MAX(u), MIN(v), MAX(v) FROM (%s) GROUP BY cell_x, cell_y"
+            % cells,
+            params
+        ).fetchall()
+        for cell_x, cell_y, x_value, y_value, count, u_min, u_max, v_min, v_max in groups:
+            point_num += count
+            if _is_one_cell(u_min, u_max) and _is_one_cell(v_min, v_max):
+                reducer.add(x_value, y_value)
+                if count > 1:
+                    reducer.add(x_value, y_value)
+                continue
+            cursor = connection.execute(
+                "SELECT x, y FROM (%s) WHERE cell_x = :cell_x AND cell_y = :cell_y" % cells,
+                dict(params, cell_x=cell_x, cell_y=cell_y)
+            )
+            for rows in _iter_batches(cursor, BATCH_SIZE):
+                reducer.update(rows)
+    return point_num
+
+
+def _find_column(names: list[str], column: str) -> str:
+    if column in names:
+        return column
+    if column.isdigit() and int(column) < len(names):
+        return names[int(column)]
+    raise ValueError("Column is not found: %s" % column)
+
+
+def fill_histogram(
+        connection: sqlite3.Connection,
+        query: str,
+        column: str,
+        bins: int,
+        range_: tuple[float, float] | None,
+        scale: DataScaleType,
+        batch_size: int = BATCH_SIZE
+) -> StreamingHistogram:
+    # Pushdown of the histogram: the bins are counted with GROUP BY, so O(bins) rows leave the database.
+    # Without a fixed range, the range is the min/max found by SQL. A group is counted at once when its min and
+    # max fall in the same bin, which is checked in Python; otherwise (rounding at an edge) its values are fetched.
+    value = _quote(_find_column(query_columns(connection, query), column))
+    numeric = _NUMERIC % "value"
+    source = "SELECT %s AS value FROM (%s)" % (value, query)
+    if scale == DataScaleType.log:
+        # the bins are not computed in SQL on log-scale
+        histogram = StreamingHistogram(bins, range_, scale)
+        for rows in _iter_batches(connection.execute(source), batch_size):
+            histogram.update(_parse_number(row[0]) for row in rows)
+        return histogram
+
+    low, high, skipped = connection.execute(
+        "SELECT MIN(CASE WHEN %s THEN value END), MAX(CASE WHEN %s THEN value END), SUM(NOT %s) FROM (%s)"
+        % (numeric, numeric, numeric, source)
+    ).fetchone()
+    if range_ is None:
+        if low is None:
+            raise ValueError("No value is counted in the histogram.")
+        range_ = (low - 0.5, high + 0.5) if low == high else (low, high)
+    histogram = StreamingHistogram(bins, range_, scale)
+    histogram.skipped += skipped or 0
+
+    bucket = (
+        "CASE WHEN value < :low THEN -1 WHEN value > :high THEN :bins + 1"
+        " ELSE CAST((value - :low) / :width AS INTEGER) END"
+    )
+    params = {"low": float(range_[0]), "high": float(range_[1]), "bins": bins, "width": (range_[1] - range_[0]) / bins}
+    groups = connection.execute(
+        "SELECT %s AS bucket, MIN(value), MAX(value), COUNT(*) FROM (%s) WHERE %s GROUP BY bucket"
+        % (bucket, source, numeric),
+        params
+    ).fetchall()
+    for bucket_index, min_, max_, count in groups:
+        if histogram.add_range(min_, max_, count):
+            continue
+        cursor = connection.execute(
+            "SELECT value FROM (%s) WHERE %s AND %s = :bucket" % (source, numeric, bucket),
+            dict(params, bucket=bucket_index)
+        )
+        for rows in _iter_batches(cursor, batch_size):
+            histogram.update(row[0] for row in rows)
+    return histogram
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from typing import Iterable
+import itertools
+import math
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class RunningStats:
+    # Welford's online mean and variance; `merge` combines partial results (e.g. files or chunks) exactly
+    def __init__(self):
+        self.count = 0
+        self.nan_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min_ = math.inf
+        self.max_ = -math.inf
+
+    def add(self, value: int | float):
+        if math.isnan(value):
+            self.nan_count += 1
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min_:
+            self.min_ = value
+        if value > self.max_:
+            self.max_ = value
+
+    def merge(self, other: RunningStats):
+        count = self.count + other.count
+        if count > 0:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.nan_count += other.nan_count
+        self.min_ = min(self.min_, other.min_)
+        self.max_ = max(self.max_, other.max_)
+
+    @property
+    def std(self) -> float:
+        # sample standard deviation
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(self.m2 / (self.count - 1))
+
+
+class QuantileSketch:
+    # KLL-style sketch: level h keeps items of weight 2**h. A full level is sorted and every other item is promoted,
+    # so the memory is O(k log(n / k)) and the rank error is about 1/k. Exact while n <= k.
+    def __init__(self, k: int = 200):
+        if k < 2:
+            raise ValueError("k of the quantile sketch must be larger than 1: %d" % k)
+        self.k = k
+        self.count = 0
+        self._levels: list[list[float]] = [[]]
+        self._offset = 0  # alternated to cancel the bias of the compactions
+
+    def add(self, value: int | float):
+        if math.isnan(value):
+            return
+        self.count += 1
+        self._levels[0].append(value)
+        if len(self._levels[0]) >= self.k:
+            self._compress()
+
+    def update(self, values: Iterable[int | float]):
+        # bulk `add` (without NaN): level 0 is filled a chunk at a time, so the per-value work stays in C
+        values = iter(values)
+        while True:
+            level = self._levels[0]
+            chunk = list(itertools.islice(values, self.k - len(level)))
+            if len(chunk) == 0:
+                return
+            self.count += len(chunk)
+            level.extend(chunk)
+            if len(level) >= self.k:
+                self._compress()
+
+    def merge(self, other: QuantileSketch):
+        for h, items in enumerate(other._levels):
+            if h >= len(self._levels):
+                self._levels.append([])
+            self._levels[h].extend(items)
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self._levels):
+            level = self._levels[h]
+            if len(level) >= self.k:
+                level.sort()
+                # an odd item out stays at this level
+                pairs_end = len(level) - len(level) % 2
+                promoted = level[self._offset:pairs_end:2]
+                self._offset ^= 1
+                if h + 1 == len(self._levels):
+                    self._levels.append([])
+                self._levels[h + 1].extend(promoted)
+                self._levels[h] = level[pairs_end:]
+            h += 1
+
+    def quantile(self, q: float) -> float:
+        weighted = sorted((value, 1 << h) for h, level in enumerate(self._levels) for value in level)
+        if len(weighted) == 0:
+            return math.nan
+        total = sum(w for _, w in weighted)
+        rank = q * total
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= rank:
+                return value
+        return weighted[-1][0]
+
+
+class ColumnStats:
+    def __init__(self, name: str, k: int = 200):
+        self.name = name
+        self.running = RunningStats()
+        self.sketch = QuantileSketch(k)
+
+    def add(self, value: int | float):
+        self.running.add(value)
+        self.sketch.add(value)
+
+    def update(self, values: Iterable[int | float]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: ColumnStats):
+        self.running.merge(other.running)
+        self.sketch.merge(other.sketch)
+
+
+def collect_column_stats(rows: Iterable[list[str]], k: int = 200) -> list[ColumnStats]:
+    # one pass over the rows; nothing but the accumulators is kept in memory
+    from scatterminal.csv_parser import iter_values
+
+    header_line, values_iter = iter_values(rows, skip_labels=True)
+    stats = [ColumnStats(str(i) if name is None else name, k) for i, name in enumerate(header_line)]
+    for values in values_iter:
+        for column, value in zip(stats, values):
+            column.add(value)
+    return stats
+
+
+def merge_column_stats(stats_list: Iterable[list[ColumnStats]]) -> list[ColumnStats]:
+    # columns of the same name (or position, for files without header) are merged in order of appearance
+    merged: dict[str, ColumnStats] = {}
+    for stats in stats_list:
+        for column in stats:
+            if column.name in merged:
+                merged[column.name].merge(column)
+            else:
+                merged[column.name] = column
+    return list(merged.values())
+
+
+def format_stats(stats: list[ColumnStats]) -> str:
+    header = ["column", "count", "nan", "min", "max", "mean", "std"] + ["p%g" % (q * 100) for q in QUANTILES]
+    rows = [header]
+    for column in stats:
+        running = column.running
+        values = [running.min_, running.max_, running.mean, running.std] if running.count > 0 else [math.nan] * 4
+        values.extend(column.sketch.quantile(q) for q in QUANTILES)
+        rows.append([column.name, str(running.count), str(running.nan_count)] + ["%.6g" % v for v in values])
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    lines = []
+    for row in rows:
+        cells = [row[0].ljust(widths[0])] + [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+        lines.append("  ".join(cells))
+    return "\n".join(lines)
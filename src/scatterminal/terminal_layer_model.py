@@ -2,6 +2,8 @@ from __future__ import annotations
 import abc
 import dataclasses
 
+import scatterminal.color as color
+
 
 class Plottable(metaclass=abc.ABCMeta):
     @staticmethod
@@ -12,6 +14,10 @@ class Plottable(metaclass=abc.ABCMeta):
     def plot(self) -> None:
         pass
 
+    @abc.abstractmethod
+    def render(self) -> str:
+        pass
+
 
 class _CharFieldWarning(str):
     pass
@@ -32,6 +38,7 @@ class TerminalPoint:
 @dataclasses.dataclass(frozen=True)
 class TerminalMarker(TerminalPoint):
     char: str
+    color: int | None = None  # colour id of the series
 
     def __post_init__(self):
         if len(self.char) != 1:
@@ -42,6 +49,7 @@ class TerminalMarker(TerminalPoint):
 class TerminalLabel(TerminalPoint):
     label: str
     allow_left_shift: bool = False
+    color: int | None = None
 
     def __len__(self):
         return len(self.label)
@@ -69,10 +77,22 @@ class TerminalLegend:
 class _CharField:
     def __init__(self, line_num: int, col_num: int):
         self.char_field: list[list[str]] = [[" " for _c in range(col_num)] for _l in range(line_num)]
+        # allocated on the first coloured write
+        self.color_field: list[list[int | None]] | None = None
         self.cfw_list = []
+        self._overlapped: set[tuple[int, int]] = set()
+
+    def _set_color(self, x: int, y: int, color: int | None):
+        if self.color_field is None:
+            if color is None:
+                return
+            self.color_field = [[None] * len(line) for line in self.char_field]
+        self.color_field[y][x] = color
 
     def write_marker(self, marker: TerminalMarker):
-        if self.char_field[marker.y][marker.x] != " ":
+        if self.char_field[marker.y][marker.x] != " " and (marker.x, marker.y) not in self._overlapped:
+            # one warning per cell
+            self._overlapped.add((marker.x, marker.y))
             self.cfw_list.append(
                 _CharFieldWarning(
                     "Overlapping markers detected. "
@@ -80,12 +100,13 @@ class _CharField:
                 )
             )
         self.char_field[marker.y][marker.x] = marker.char
+        self._set_color(marker.x, marker.y, marker.color)
 
     def write_label(self, label: TerminalLabel):
         if label.allow_left_shift and (label.x + len(label)) > len(self.char_field[0]):
             # ラベルの左移動が許可されている and ラベルが右にはみ出ている
             shift = label.x + len(label) - len(self.char_field[0])
-            label = TerminalLabel(label.x - shift, label.y, label.label)
+            label = TerminalLabel(label.x - shift, label.y, label.label, color=label.color)
 
         y = label.y
         for i in range(len(label)):
@@ -98,12 +119,39 @@ class _CharField:
                     )
                 )
             self.char_field[y][x] = label.label[i]
+            self._set_color(x, y, label.color)
+
+    def warning_lines(self) -> list[str]:
+        return [str(w) for w in self.cfw_list]
+
+    def frame_lines(self, color_mode: str = "never") -> list[str]:
+        if self.color_field is None or color.palette_size(color_mode) == 0:
+            return ["".join(line) for line in reversed(self.char_field)]
+        return [
+            self._colored_line(line, color_line, color_mode)
+            for line, color_line in zip(reversed(self.char_field), reversed(self.color_field))
+        ]
+
+    @staticmethod
+    def _colored_line(line: list[str], color_line: list[int | None], color_mode: str) -> str:
+        # An escape is emitted only where the colour changes along the row; blanks take any colour,
+        # so the output grows with the number of colour runs rather than with the number of marked cells.
+        chunks = []
+        current = None
+        for char, cell_color in zip(line, color_line):
+            if char != " " and cell_color != current:
+                chunks.append(color.RESET if cell_color is None else color.escape(color_mode, cell_color))
+                current = cell_color
+            chunks.append(char)
+        if current is not None:
+            chunks.append(color.RESET)
+        return "".join(chunks)
+
+    def render(self, color_mode: str = "never") -> str:
+        return "\n".join(self.warning_lines() + self.frame_lines(color_mode))
 
     def project(self) -> None:
-        for w in self.cfw_list:
-            print(w)
-        for line in reversed(self.char_field):
-            print("".join(line))
+        print(self.render())
 
 
 @dataclasses.dataclass(frozen=True)
@@ -114,12 +162,19 @@ class Terminal(Plottable):
     x_axis: TerminalXAxis
     y_axis: TerminalYAxis
     legend: TerminalLegend | None
+    color_mode: str = "never"
 
     @staticmethod
     def get_marker_chars() -> list[str]:
         return ["*", "o", "+", "x", "v", "#", "."]
 
     def plot(self) -> None:
+        print(self.render())
+
+    def render(self) -> str:
+        return self.draw().render(self.color_mode)
+
+    def draw(self) -> _CharField:
         cf = _CharField(line_num=self.line_num, col_num=self.col_num)
 
         # x axis
@@ -147,4 +202,4 @@ class Terminal(Plottable):
         for marker in self.plot_markers:
             cf.write_marker(marker)
 
-        cf.project()
+        return cf
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Callable
+import datetime
+import functools
+import re
+
+# Timestamps are converted to float epoch seconds. Naive timestamps are regarded as UTC.
+_FIXED_ISO_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}")
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+_ISO_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}:?\d{2})?")
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _invalid(value: str) -> TypeError:
+    # the error of a cell that is not a number in the CSV parser
+    return TypeError("Invalid timestamp: %s" % value)
+
+
+@functools.lru_cache(maxsize=4096)
+def _epoch_of_date(date: str) -> float | None:
+    # rows of a log share a few dates, so the calendar arithmetic (and the check) is done once per date
+    try:
+        return float(datetime.date.fromisoformat(date).toordinal() - 719163) * 86400
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _epoch_of_minute(prefix: str) -> float | None:
+    # "YYYY-MM-DDTHH:MM"; consecutive rows of a log mostly share it
+    date, hour, minute = _epoch_of_date(prefix[:10]), prefix[11:13], prefix[14:16]
+    if date is None or prefix[10] not in "T " or prefix[13] != ":" or not (hour + minute).isdigit():
+        return None
+    if int(hour) >= 24 or int(minute) >= 60:
+        return None
+    return date + int(hour) * 3600 + int(minute) * 60
+
+
+def parse_iso(value: str) -> float:
+    if value.endswith("Z"):
+        # `fromisoformat` of python 3.10 does not accept "Z"
+        value = value[:-1] + "+00:00"
+    try:
+        dt = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise _invalid(value) from None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return (dt - _EPOCH).total_seconds()
+
+
+def parse_fixed_iso(value: str) -> float:
+    # "YYYY-MM-DDTHH:MM:SS" by slicing; anything else (fraction, offset, ...) goes to the general parser
+    if len(value) != 19:
+        return parse_iso(value)
+    minute, second = _epoch_of_minute(value[:16]), value[17:19]
+    # 60 is a leap second
+    if minute is None or value[16] != ":" or not second.isdigit() or int(second) > 60:
+        raise _invalid(value)
+    return minute + int(second)
+
+
+def parse_date(value: str) -> float:
+    if len(value) != 10:
+        return parse_iso(value)
+    date = _epoch_of_date(value)
+    if date is None:
+        raise _invalid(value)
+    return date
+
+
+def detect_parser(sample: str) -> Callable[[str], float] | None:
+    # The format is detected once per column from its first value
+    if _FIXED_ISO_PATTERN.fullmatch(sample):
+        parser = parse_fixed_iso
+    elif _DATE_PATTERN.fullmatch(sample):
+        parser = parse_date
+    elif _ISO_PATTERN.fullmatch(sample):
+        parser = parse_iso
+    else:
+        return None
+    try:
+        parser(sample)
+    except TypeError:
+        return None
+    return parser
@@ -0,0 +1,101 @@
+import io
+import math
+import operator
+import os
+import random
+
+import pytest
+
+import scatterminal.animate as animate
+import scatterminal.plot as plot
+from scatterminal.csv_parser import iter_rows, stream_sequences
+from scatterminal.data_layer_model import DataSequence
+
+TERMINAL_SIZE = os.terminal_size((60, 16))
+
+
+@pytest.mark.parametrize("better, extremum", [(operator.lt, min), (operator.gt, max)])
+def test_monotonic_extremum_matches_brute_force(better, extremum):
+    rng = random.Random(0)
+    values = [rng.randint(0, 20) for _ in range(500)]
+    tracker = animate.MonotonicExtremum(better)
+    width = 17
+    for i, value in enumerate(values):
+        tracker.push(i, value)
+        tracker.expire(i - width + 1)
+        assert tracker.value == extremum(values[max(i - width + 1, 0):i + 1])
+
+
+def test_sliding_window_y_range():
+    rows = [[x, y] for x, y in [(0, 5), (1, float("nan")), (2, -3), (4, 8), (7, 1)]]
+    window = animate.SlidingWindow(rows, 1)
+    assert window.first_x() == 0
+    window.advance(0, 3)
+    assert (len(window), window.y_range()) == (3, (-3, 5))
+    window.advance(2, 5)
+    assert (len(window), window.y_range()) == (2, (-3, 8))
+    window.advance(5, 8)
+    assert (len(window), window.y_range(), window.exhausted) == (1, (1, 1), True)
+
+
+def test_sliding_window_skips_non_positive_on_log_scale():
+    window = animate.SlidingWindow([[0, -1, 2], [1, 4, 0]], 2, positive_only=True)
+    window.advance(0, 2)
+    assert window.y_range() == (2, 4)
+
+
+def test_sliding_window_rejects_decreasing_x():
+    window = animate.SlidingWindow([[0, 1], [2, 1], [1, 1]], 1)
+    with pytest.raises(ValueError, match="non-decreasing"):
+        window.advance(0, 10)
+
+
+def _frames(rows: list[str], window: float, step: float, **kwargs) -> list[str]:
+    sequences, values_iter = stream_sequences(iter_rows(io.StringIO("\n".join(rows)), "csv", None), 0)
+    return list(animate.iter_frames([(sequences, values_iter)], window, step, terminal_size=TERMINAL_SIZE, **kwargs))
+
+
+def test_frames_match_plot_of_each_window():
+    points = [(i, math.sin(i / 5)) for i in range(100)]
+    frames = _frames(["x,y"] + ["%d,%r" % p for p in points], 30, 10)
+    assert len(frames) == 8
+    for k, frame in enumerate(frames):
+        start = k * 10
+        in_window = [p for p in points if start <= p[0] < start + 30]
+        y_range = animate._frame_y_range(min(p[1] for p in in_window), max(p[1] for p in in_window), "linear")
+        expected = plot._render(
+            [DataSequence([p[0] for p in in_window], [p[1] for p in in_window], 0, "y", "x")],
+            x_lim=(start, start + 30), y_lim=y_range, terminal_size=TERMINAL_SIZE
+        )
+        assert frame == expected
+
+
+def test_frames_jump_over_gaps():
+    frames = _frames(["x,y", "0,1", "1,2", "1000,3"], 2, 1)
+    # [0, 2), [1, 3) with a point, one empty frame [2, 4), then [999, 1001)
+    assert len(frames) == 4
+
+
+def test_frames_reject_non_positive_window():
+    with pytest.raises(ValueError, match="positive"):
+        _frames(["x,y", "0,1"], 0, 1)
+
+
+def test_play_caps_frame_rate():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    def frames():
+        for i in range(3):
+            # rendering takes 0.05 s
+            now[0] += 0.05
+            yield str(i)
+
+    out = io.StringIO()
+    assert animate.play(frames(), fps=10, stream=out, clock=lambda: now[0], sleep=sleep) == 3
+    assert sleeps == pytest.approx([0.05, 0.05])
+    assert out.getvalue() == "".join(animate._CLEAR_SCREEN + str(i) + "\n" for i in range(3))
@@ -0,0 +1,134 @@
+import os
+
+import pytest
+
+import scatterminal.canvas_layer_model as clm
+from scatterminal.terminal_layer_model import Terminal
+
+
+def _fit_x_ticks_by_loop(axis: clm.CanvasAxis, max_total_label_size: float) -> list[tuple[str, float]]:
+    # the former implementation in Canvas.to_terminal (with an iteration cap instead of looping forever)
+    primary, secondary = 18, 8
+    ticks = axis.calc_tick()
+    while sum(len(label) for label, _ in ticks) > max_total_label_size and primary > -100:
+        primary -= 1
+        secondary -= 1
+        ticks = axis.calc_tick(primary, secondary)
+    return ticks
+
+
+@pytest.mark.parametrize(
+    ("axis", "max_total_label_size"),
+    [
+        (clm.CanvasAxis(-0.5, 7.5), 40),
+        (clm.CanvasAxis(-0.5, 7.5), 100),
+        (clm.CanvasAxis(-0.5, 7.5), 20),
+        (clm.CanvasAxis(0.0013, 0.0092), 40),
+        (clm.CanvasAxis(12345.6, 98765.4), 30),
+        (clm.CanvasAxis(-3.0e7, 2.0e8), 60),
+        (clm.CanvasAxis(0.8, 500.0, clm.CanvasScaleType.log), 40),
+        (clm.CanvasAxis(0.8, 500.0, clm.CanvasScaleType.log), 15),
+    ]
+)
+def test_fit_x_ticks_matches_loop(axis: clm.CanvasAxis, max_total_label_size: float):
+    assert list(clm._fit_x_ticks(axis, max_total_label_size)) == _fit_x_ticks_by_loop(axis, max_total_label_size)
+
+
+def test_calc_tick_returns_copy():
+    axis = clm.CanvasAxis(0.0, 10.0)
+    ticks = axis.calc_tick()
+    ticks.append(("dummy", 0.0))
+    assert ("dummy", 0.0) not in axis.calc_tick()
+
+
+def test_layout_is_reused():
+    canvas = clm.Canvas(
+        [clm.CanvasMarker(0.1, 0.2, 0), clm.CanvasMarker(0.9, 0.8, 0)],
+        clm.CanvasAxis(0.0, 10.0, name="x"),
+        clm.CanvasAxis(-1.0, 1.0, name="y"),
+        clm.CanvasLegend([clm.CanvasLegendElement(0, "a")], clm.CanvasLegendLoc.lower)
+    )
+    terminal_size = os.terminal_size((80, 24))
+    first = canvas.to_terminal(Terminal, terminal_size)
+    second = canvas.to_terminal(Terminal, terminal_size)
+    assert first.x_axis is second.x_axis
+    assert first.y_axis is second.y_axis
+    assert first.render() == second.render()
+
+
+@pytest.mark.parametrize(
+    ("segment", "expected"),
+    [
+        ((0.2, 0.2, 0.8, 0.8), (0.2, 0.2, 0.8, 0.8)),
+        ((-1.0, 0.5, 2.0, 0.5), (0.0, 0.5, 1.0, 0.5)),
+        ((0.5, -1.0, 0.5, 0.5), (0.5, 0.0, 0.5, 0.5)),
+        ((-1.0, -1.0, -0.5, 2.0), None),
+        ((2.0, 0.5, 3.0, 0.5), None),
+        ((0.5, 0.5, 0.5, 0.5), (0.5, 0.5, 0.5, 0.5)),
+        ((float("nan"), 0.5, 0.5, 0.5), None),
+    ]
+)
+def test_clip_segment(segment: tuple[float, float, float, float], expected):
+    actual = clm._clip_segment(*segment)
+    if expected is None:
+        assert actual is None
+    else:
+        assert actual == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    ("segment", "expected"),
+    [
+        ((0, 0, 3, 0), [(0, 0), (1, 0), (2, 0), (3, 0)]),
+        ((0, 0, 3, 3), [(0, 0), (1, 1), (2, 2), (3, 3)]),
+        ((3, 1, 0, 0), [(3, 1), (2, 1), (1, 0), (0, 0)]),
+        ((0, 0, 1, 4), [(0, 0), (0, 1), (1, 2), (1, 3), (1, 4)]),
+        ((2, 2, 2, 2), [(2, 2)]),
+    ]
+)
+def test_rasterize_segment(segment: tuple[int, int, int, int], expected: list[tuple[int, int]]):
+    assert clm._rasterize_segment(*segment) == expected
+
+
+def test_line_cells_clip_large_span():
+    canvas = clm.Canvas(
+        [clm.CanvasMarker(-1e9, 0.5, 0), clm.CanvasMarker(1e9, 0.5, 0), clm.CanvasMarker(2e9, 2e9, 0)],
+        clm.CanvasAxis(0.0, 10.0),
+        clm.CanvasAxis(0.0, 10.0),
+        clm.CanvasLegend([clm.CanvasLegendElement(0, "a")], clm.CanvasLegendLoc.none),
+        clm.CanvasPlotStyle.line
+    )
+    cells = canvas._gen_line_cells(11, 5)
+    assert cells == [(x, 2, 0) for x in range(11)]
+
+
+def test_bar_cells_fill_without_gap():
+    bins = 7
+    markers = [clm.CanvasMarker((i + 0.5) / bins, (i + 1) / bins, 0) for i in range(bins)]
+    canvas = clm.Canvas(
+        markers, clm.CanvasAxis(0, 1), clm.CanvasAxis(0, 1),
+        clm.CanvasLegend([], clm.CanvasLegendLoc.none), clm.CanvasPlotStyle.bar
+    )
+    cells = canvas._gen_bar_cells(50, 20)
+    columns = set(x for x, _, _ in cells)
+    assert columns == set(range(1, 50))
+    assert all(y >= 1 for _, y, _ in cells)
+    heights = [max(y for x, y, _ in cells if x == col) for col in sorted(columns)]
+    assert heights == sorted(heights)
+
+
+@pytest.mark.parametrize(
+    ("min_", "max_", "expected_labels"),
+    [
+        (1704067200 + 3, 1704067200 + 40, ["00:00:05", "00:00:10", "00:00:15", "00:00:20", "00:00:25", "00:00:30", "00:00:35", "00:00:40"]),
+        (1704067200, 1704067200 + 3 * 3600, ["00:00", "00:30", "01:00", "01:30", "02:00", "02:30", "03:00"]),
+        (1704067200 - 1800, 1704067200 + 1800, ["12-31 23:30", "12-31 23:40", "12-31 23:50", "01-01 00:00", "01-01 00:10", "01-01 00:20", "01-01 00:30"]),
+        (1704067200, 1704067200 + 7 * 86400, ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05", "2024-01-06", "2024-01-07", "2024-01-08"]),
+        (1704067200, 1735689600, ["2024-01", "2024-03", "2024-05", "2024-07", "2024-09", "2024-11", "2025-01"]),
+        (1420070400, 1735689600, ["2015", "2016", "2017", "2018", "2019", "2020", "2021", "2022", "2023", "2024", "2025"]),
+    ]
+)
+def test_time_tick(min_: float, max_: float, expected_labels: list[str]):
+    ticks = clm.CanvasAxis(min_, max_, clm.CanvasScaleType.time).calc_tick()
+    assert [label for label, _ in ticks] == expected_labels
+    assert all(min_ <= value <= max_ for _, value in ticks)
@@ -0,0 +1,76 @@
+import io
+import os
+import re
+import warnings
+
+import pytest
+
+import scatterminal.canvas_layer_model as clm
+import scatterminal.color as color
+from scatterminal.terminal_layer_model import Terminal, TerminalMarker, _CharField
+
+_ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
+
+
+class _TtyStream(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+@pytest.mark.parametrize(
+    ("mode", "env", "stream", "expected"),
+    [
+        ("auto", {}, io.StringIO(), "never"),
+        ("auto", {"NO_COLOR": "1"}, _TtyStream(), "never"),
+        ("auto", {"COLORTERM": "truecolor"}, _TtyStream(), "truecolor"),
+        ("auto", {"TERM": "xterm-256color"}, _TtyStream(), "256"),
+        ("auto", {"TERM": "xterm"}, _TtyStream(), "16"),
+        ("256", {"NO_COLOR": "1"}, io.StringIO(), "256"),
+        ("never", {}, _TtyStream(), "never"),
+    ]
+)
+def test_resolve_color_mode(monkeypatch, mode: str, env: dict, stream, expected: str):
+    for name in ("NO_COLOR", "COLORTERM", "TERM"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert color.resolve_color_mode(mode, stream) == expected
+
+
+@pytest.mark.parametrize("mode", ["16", "256", "truecolor"])
+def test_escapes_only_at_color_changes(mode: str):
+    char_field = _CharField(1, 12)
+    # runs: 0 0 0, blank, 0 0 (same run across the blank), 1 1, uncoloured
+    for x, color_id in [(0, 0), (1, 0), (2, 0), (4, 0), (5, 0), (6, 1), (7, 1)]:
+        char_field.write_marker(TerminalMarker(x, 0, "*", color_id))
+    char_field.write_marker(TerminalMarker(9, 0, "|"))
+
+    line, = char_field.frame_lines(mode)
+    escapes = _ESCAPE_PATTERN.findall(line)
+    assert escapes == [color.escape(mode, 0), color.escape(mode, 1), color.RESET]
+    assert _ESCAPE_PATTERN.sub("", line) == "".join(char_field.char_field[0])
+
+
+def test_colored_frame_matches_plain():
+    canvas = clm.Canvas(
+        [clm.CanvasMarker(i / 10, (i % 3) / 2, i % 2) for i in range(11)],
+        clm.CanvasAxis(0.0, 10.0, name="x"),
+        clm.CanvasAxis(0.0, 2.0, name="y"),
+        clm.CanvasLegend([clm.CanvasLegendElement(0, "a"), clm.CanvasLegendElement(1, "b")], clm.CanvasLegendLoc.lower)
+    )
+    terminal_size = os.terminal_size((60, 20))
+    plain = canvas.to_terminal(Terminal, terminal_size).render()
+    colored = canvas.to_terminal(Terminal, terminal_size, "256").render()
+    assert plain == canvas.to_terminal(Terminal, terminal_size, "never").render()
+    assert "\x1b[" not in plain
+    assert color.escape("256", 1) in colored
+    assert _ESCAPE_PATTERN.sub("", colored) == plain
+
+
+def test_colors_extend_distinguishable_series():
+    group_ids = set(range(10))
+    with pytest.warns(UserWarning):
+        clm.Canvas._gen_marker_char_dict(group_ids, Terminal.get_marker_chars())
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        clm.Canvas._gen_marker_char_dict(group_ids, Terminal.get_marker_chars(), color.palette_size("16"))
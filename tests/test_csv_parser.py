@@ -1,8 +1,9 @@
+import math
 from io import StringIO
 
 import pytest
 
-from scatterminal.csv_parser import read_file, parse
+from scatterminal.csv_parser import read_file, parse, iter_rows, parse_stream, parse_grouped_stream
 from scatterminal.data_layer_model import DataSequence
 
 
@@ -74,16 +75,64 @@ def test_read_file_tsv_specified_sep():
     assert expected == actual
 
 
-def test_read_file_csv_file_type_error():
+def test_read_file_unknown_extension_sniffs_dialect():
     file_obj = StringIO(
-        "x,y,z\n"
-        "0,1,3\n"
-        "2,1,8\n"
-        "4,2,13\n"
+        "x;y;z\n"
+        "0;1;3\n"
+        "2;1;8\n"
     )
-    with pytest.raises(ValueError) as e:
-        _ = read_file(file_obj, "txt", None)
-    assert str(e.value) == "Failed to estimate separator character. Please specify sep explicitly."
+    expected = [
+        ["x", "y", "z"],
+        ["0", "1", "3"],
+        ["2", "1", "8"],
+    ]
+    actual = read_file(file_obj, "txt", None)
+    assert expected == actual
+
+
+@pytest.mark.parametrize(
+    ("text", "ext", "sep", "expected"),
+    [
+        # quoted header with the separator inside
+        ('"time","latency, ms"\n1,"2.5"\n', "csv", None, [["time", "latency, ms"], ["1", "2.5"]]),
+        ('"a";"b;c"\n1;2\n', None, None, [["a", "b;c"], ["1", "2"]]),
+        # padded cells, and a blank line as one empty cell
+        ("x , y \n0 , 1\n\n2,3\r\n", "csv", None, [["x", "y"], ["0", "1"], [""], ["2", "3"]]),
+        # multi-character separator
+        ("x::y\n0:: 1\n", "txt", "::", [["x", "y"], ["0", "1"]]),
+    ]
+)
+def test_read_file_quoted_and_padded(text: str, ext: str | None, sep: str | None, expected: list[list[str]]):
+    assert read_file(StringIO(text), ext, sep) == expected
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("x,y\n0,1\n", [["x", "y"], ["0", "1"]]),
+        ("x\ty\n0\t1\n", [["x", "y"], ["0", "1"]]),
+        ("x;y\n0;1\n", [["x", "y"], ["0", "1"]]),
+        ("value\n0.5\n", [["value"], ["0.5"]]),
+        ("", []),
+    ]
+)
+def test_iter_rows_sniff_sep(text: str, expected: list[list[str]]):
+    actual = list(iter_rows(StringIO(text), None, None))
+    assert expected == actual
+
+
+@pytest.mark.parametrize(("ext", "sep"), [("csv", None), ("txt", None), ("txt", "::")])
+def test_blank_line_of_single_column_is_nan(ext: str, sep: str | None):
+    # the blank cell keeps the index of the later points
+    actual = parse_stream(iter_rows(StringIO("value\n1\n\n3\n"), ext, sep), 0)
+    assert actual[0].x == [0, 1, 2]
+    assert actual[0].y[0] == 1 and math.isnan(actual[0].y[1]) and actual[0].y[2] == 3
+
+
+def test_parse_stream_consumes_iterator_once():
+    rows = (line.split(",") for line in ["x,y", "0.5,42.1", "1.5,42.2"])
+    actual = parse_stream(rows, 3)
+    assert actual == [DataSequence([0.5, 1.5], [42.1, 42.2], 3, "y", "x")]
 
 
 @pytest.mark.parametrize(
@@ -158,3 +207,74 @@ def test_parse_type_error():
     with pytest.raises(TypeError) as e:
         _ = parse(str_cells, 0)
     assert str(e.value) == "int or float type are only available."
+
+
+@pytest.mark.parametrize(
+    ("str_cells", "group_by", "next_id", "expected"),
+    [
+        (
+                # group column by name
+                [["t", "host", "v"], ["0", "a", "1"], ["0", "b", "2"], ["1", "a", "3"], ["2", "b", "4"]],
+                "host",
+                0,
+                [DataSequence([0, 1], [1, 3], 0, "a", "t"), DataSequence([0, 2], [2, 4], 1, "b", "t")]
+        ),
+        (
+                # group column by index, no header, next_id shifted
+                [["0", "a", "1"], ["1", "b", "2"], ["2", "a", "3"]],
+                "1",
+                3,
+                [DataSequence([0, 2], [1, 3], 3, "a", None), DataSequence([1], [2], 4, "b", None)]
+        ),
+        (
+                # only one value column
+                [["host", "v"], ["a", "1"], ["b", "2"], ["a", "3"]],
+                "host",
+                0,
+                [DataSequence([0, 1], [1, 3], 0, "a", None), DataSequence([0], [2], 1, "b", None)]
+        ),
+        (
+                # many value columns
+                [["host", "t", "v1", "v2"], ["a", "0", "1", "2"], ["b", "0", "3", "4"]],
+                "host",
+                0,
+                [
+                    DataSequence([0], [1], 0, "a v1", "t"),
+                    DataSequence([0], [2], 1, "a v2", "t"),
+                    DataSequence([0], [3], 2, "b v1", "t"),
+                    DataSequence([0], [4], 3, "b v2", "t"),
+                ]
+        ),
+    ]
+)
+def test_parse_grouped_stream(str_cells: list[list[str]], group_by: str, next_id: int, expected: list[DataSequence]):
+    actual = parse_grouped_stream(iter(str_cells), group_by, next_id)
+    assert actual == expected
+
+
+def test_parse_grouped_stream_column_not_found():
+    with pytest.raises(ValueError) as e:
+        _ = parse_grouped_stream(iter([["t", "v"], ["0", "1"]]), "host", 0)
+    assert str(e.value) == "Column is not found: host"
+
+
+def test_parse_stream_timestamp_x():
+    rows = iter([["time", "v"], ["2024-01-01T00:00:00", "1"], ["2024-01-01T00:01:00", "2"]])
+    actual = parse_stream(rows, 0)
+    assert list(actual[0].x) == [1704067200.0, 1704067260.0]
+    assert actual[0].x_time
+    assert actual[0].x_name == "time"
+
+
+def test_parse_stream_timestamp_x_without_header():
+    rows = iter([["2024-01-01", "1"], ["2024-01-02", "2"]])
+    actual = parse_stream(rows, 0)
+    assert list(actual[0].x) == [1704067200.0, 1704153600.0]
+    assert actual[0].name is None
+
+
+def test_parse_grouped_stream_timestamp_x():
+    rows = iter([["t", "host", "v"], ["2024-01-01T00:00:00", "a", "1"], ["2024-01-01T00:00:10", "b", "2"]])
+    actual = parse_grouped_stream(rows, "host", 0)
+    assert [list(seq.x) for seq in actual] == [[1704067200.0], [1704067210.0]]
+    assert all(seq.x_time for seq in actual)
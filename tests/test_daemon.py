@@ -0,0 +1,127 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+import scatterminal.daemon as daemon
+from scatterminal.plot import _read_sequences, _render
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="unix domain sockets are not available")
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "samples")
+TERMINAL_SIZE = os.terminal_size((80, 24))
+
+
+@pytest.fixture
+def socket_path():
+    # AF_UNIX paths are limited to ~100 characters, so tmp_path is not used
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "d.sock")
+        server = daemon.create_server(path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield path
+        server.shutdown()
+        server.server_close()
+
+
+def test_request_matches_local_render(socket_path: str):
+    argv = ["single_column.csv", "single_column_seq2.csv", "--yscale", "log"]
+    expected = _render(
+        _read_sequences([os.path.join(SAMPLE_DIR, p) for p in argv[:2]], None),
+        y_scale="log",
+        terminal_size=TERMINAL_SIZE
+    )
+    for _ in range(2):
+        # second request is served from the parsed-file cache
+        response = daemon.request(argv, socket_path, SAMPLE_DIR, TERMINAL_SIZE)
+        assert response == {"status": 0, "out": expected}
+
+
+@pytest.mark.parametrize(
+    ("argv", "expected"),
+    [
+        (["not_exist.csv"], {"status": 1}),
+        (["--xscale", "foo", "single_column.csv"], {"status": 1}),
+        (["single_column.csv", "--clip", "1,99"], {"status": 1}),
+        (["-"], {"status": 0, "fallback": True}),
+        (["single_column.csv", "--profile"], {"status": 0, "fallback": True}),
+    ]
+)
+def test_request_error(socket_path: str, argv: list[str], expected: dict):
+    response = daemon.request(argv, socket_path, SAMPLE_DIR, TERMINAL_SIZE)
+    assert {k: response[k] for k in expected} == expected
+
+
+def test_request_returns_warnings(socket_path: str, tmp_path):
+    (tmp_path / "negative.csv").write_text("x,y\n0,-1\n1,2\n2,3\n")
+    for _ in range(2):
+        # the same warning on every request, as for a new process
+        response = daemon.request(["negative.csv", "--yscale", "log"], socket_path, str(tmp_path), TERMINAL_SIZE)
+        assert response["status"] == 0
+        assert len(response["warnings"]) == 1 and "Non-positive value" in response["warnings"][0]
+
+
+def test_concurrent_requests_keep_their_warnings(socket_path: str, tmp_path):
+    (tmp_path / "negative.csv").write_text("x,y\n0,-1\n1,2\n2,3\n")
+    responses = {}
+
+    def run(name: str, argv: list[str]):
+        responses[name] = daemon.request(argv, socket_path, str(tmp_path), TERMINAL_SIZE)
+
+    threads = [
+        threading.Thread(target=run, args=(i, ["negative.csv", "--yscale", "log"] if i % 2 == 0 else ["negative.csv"]))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for i, response in responses.items():
+        assert response["status"] == 0
+        assert len(response.get("warnings", [])) == (1 if i % 2 == 0 else 0)
+
+
+def test_cache_hit_reuses_sequences():
+    cache = daemon._ParsedFileCache()
+    path = os.path.join(SAMPLE_DIR, "triple_column.csv")
+    sequences = cache.read(path, None, 3)
+    assert [seq.seq_id for seq in sequences] == [3, 4]
+    stats = [seq.stats for seq in sequences]
+    hit = cache.read(path, None, 3)
+    assert all(a is b for a, b in zip(hit, sequences))
+    assert all("stats" in seq.__dict__ for seq in hit) and [seq.stats for seq in hit] == stats
+
+
+def test_socket_is_private(socket_path: str):
+    assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+
+def test_split_client_args():
+    args = ["--client", "a.csv", "--socket", "/tmp/s.sock", "--yscale", "log"]
+    assert daemon._split_client_args(args) == (["a.csv", "--yscale", "log"], "/tmp/s.sock")
+
+
+def test_daemon_latency_is_lower_than_process_startup(socket_path: str):
+    argv = ["triple_column.csv"]
+    call_num = 3
+
+    start = time.perf_counter()
+    for _ in range(call_num):
+        subprocess.run(
+            [sys.executable, "-c", "from scatterminal.plot import main; main()", *argv],
+            cwd=SAMPLE_DIR, check=True, capture_output=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+        )
+    process_latency = (time.perf_counter() - start) / call_num
+
+    start = time.perf_counter()
+    for _ in range(call_num):
+        assert daemon.request(argv, socket_path, SAMPLE_DIR, TERMINAL_SIZE)["status"] == 0
+    daemon_latency = (time.perf_counter() - start) / call_num
+
+    assert daemon_latency < process_latency
@@ -1,4 +1,5 @@
 from typing import Callable
+import math
 
 import pytest
 
@@ -153,3 +154,96 @@ def test_data_warning(data: list[dlm.DataSequence], expected: str):
     with pytest.warns(UserWarning) as e:
         _ = dlm.Data(data, dlm.DataAxis(dlm.DataScaleType.log), dlm.DataAxis(dlm.DataScaleType.log), dlm.DataLegendLoc.lower)
     assert str(e.list[0].message) == expected
+
+
+@pytest.mark.parametrize(
+    ("x_scale", "y_scale"),
+    [
+        (dlm.DataScaleType.linear, dlm.DataScaleType.linear),
+        (dlm.DataScaleType.log, dlm.DataScaleType.linear),
+        (dlm.DataScaleType.linear, dlm.DataScaleType.log),
+        (dlm.DataScaleType.log, dlm.DataScaleType.log),
+    ]
+)
+def test_data_to_canvas_markers_inside_canvas(x_scale: dlm.DataScaleType, y_scale: dlm.DataScaleType):
+    import scatterminal.canvas_layer_model as clm
+
+    data = dlm.Data(
+        [dlm.DataSequence([1, 10, 1000], [0.01, 5, 300], 0)],
+        dlm.DataAxis(x_scale), dlm.DataAxis(y_scale), dlm.DataLegendLoc.lower
+    )
+    canvas = data.to_canvas(clm.Canvas)
+    assert all(0 <= m.x <= 1 and 0 <= m.y <= 1 for m in canvas.markers)
+
+
+@pytest.mark.parametrize(
+    ("x", "y", "expected"),
+    [
+        ([1, 2, 3], [3, -1, 2], dlm.DataSequenceStats(3, 0, 1, 3, -1, 3, 1, 2, True)),
+        ([-2, 0.5, 0.25], [1, 2, 3], dlm.DataSequenceStats(3, 0, -2, 0.5, 1, 3, 0.25, 1, False)),
+        ([1, math.nan, 3, 4], [1, 2, 3, math.nan], dlm.DataSequenceStats(2, 2, 1, 3, 1, 3, 1, 1, True)),
+        ([], [], dlm.DataSequenceStats(0, 0, math.inf, -math.inf, math.inf, -math.inf, math.inf, math.inf, True)),
+    ]
+)
+def test_data_sequence_stats(x: list[float], y: list[float], expected: dlm.DataSequenceStats):
+    assert dlm.DataSequence(x, y, 0).stats == expected
+
+
+def test_trusted_data_sequence():
+    assert dlm.DataSequence.trusted([0, 1], [2, 3], 1, "a", "b", True) == dlm.DataSequence([0, 1], [2, 3], 1, "a", "b", True)
+    with pytest.raises(ValueError):
+        dlm.DataSequence.trusted([0], [1, 2], 0)
+    with pytest.raises(ValueError):
+        dlm.DataSequence.trusted([0], [1], 0, "あ")
+
+
+def test_repeated_render_reuses_stats(monkeypatch):
+    import scatterminal.canvas_layer_model as clm
+
+    seq = dlm.DataSequence([0.5, 1, 2, -1], [1, 2, 3, 4], 0, "a")
+    calls = []
+    original = dlm.DataSequenceStats.of
+    monkeypatch.setattr(dlm.DataSequenceStats, "of", lambda x, y: calls.append(len(x)) or original(x, y))
+
+    for _ in range(3):
+        with pytest.warns(UserWarning):
+            data = dlm.Data([seq], dlm.DataAxis(dlm.DataScaleType.log), dlm.DataAxis(), dlm.DataLegendLoc.lower)
+        data.to_canvas(clm.Canvas)
+    # once for the sequence and once for its positive part
+    assert calls == [4, 3]
+    assert seq.derive(seq_id=5).stats is seq.stats
+
+
+def test_quantile_autoscale_leaves_outliers_out():
+    import scatterminal.canvas_layer_model as clm
+
+    seq = dlm.DataSequence(list(range(1000)), [float(i % 10) for i in range(999)] + [1e9], 0, "latency")
+    data = dlm.Data([seq], dlm.DataAxis(), dlm.DataAxis(clip=(0.5, 99.5)), dlm.DataLegendLoc.lower)
+    _, (y_min, y_max) = data.calc_canvas_ranges()
+    assert y_max < 20
+    with pytest.warns(UserWarning, match="1 points outside the autoscaled range"):
+        canvas = data.to_canvas(clm.Canvas)
+    assert len(canvas.markers) == 999
+
+    # lines keep the points: the segment to the outlier is clipped at the edge
+    data = dlm.Data([seq], dlm.DataAxis(), dlm.DataAxis(clip=(0.5, 99.5)), dlm.DataLegendLoc.lower, dlm.DataPlotStyle.line)
+    assert len(data.to_canvas(clm.Canvas).markers) == 1000
+
+
+@pytest.mark.parametrize("y_scale", [dlm.DataScaleType.linear, dlm.DataScaleType.log])
+def test_quantile_autoscale_of_constant_data_with_outlier(y_scale: dlm.DataScaleType):
+    import scatterminal.canvas_layer_model as clm
+
+    seq = dlm.DataSequence(list(range(1000)), [5.0] * 999 + [1e9], 0, "latency")
+    data = dlm.Data([seq], dlm.DataAxis(), dlm.DataAxis(y_scale, clip=(0.5, 99.5)), dlm.DataLegendLoc.lower)
+    _, (y_min, y_max) = data.calc_canvas_ranges()
+    assert y_min < 5 < y_max
+    with pytest.warns(UserWarning, match="1 points outside the autoscaled range"):
+        canvas = data.to_canvas(clm.Canvas)
+    assert len(canvas.markers) == 999
+
+
+@pytest.mark.parametrize("clip", [(-1, 50), (50, 50), (10, 101)])
+def test_data_axis_clip_error(clip: tuple[float, float]):
+    with pytest.raises(ValueError, match="Clip percentiles"):
+        dlm.DataAxis(clip=clip)
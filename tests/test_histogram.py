@@ -0,0 +1,93 @@
+import math
+import random
+
+import pytest
+
+from scatterminal.data_layer_model import DataScaleType
+from scatterminal.histogram import StreamingHistogram
+
+
+def _brute_force_counts(values: list[float], edges: list[float]) -> list[int]:
+    counts = [0] * (len(edges) - 1)
+    for v in values:
+        for i in range(len(counts)):
+            if edges[i] <= v < edges[i + 1] or (i == len(counts) - 1 and v == edges[-1]):
+                counts[i] += 1
+                break
+    return counts
+
+
+@pytest.mark.parametrize(
+    ("bins", "sample_size"),
+    [
+        (20, 10),
+        (7, 50),
+        (16, 1000),
+    ]
+)
+def test_estimated_range_counts_every_value(bins: int, sample_size: int):
+    rng = random.Random(0)
+    # Quarters between -50 * bins and 50 * bins: the first sample spans [0, bins] (bin width 1), so every edge, also
+    # after the range grows on both sides, is an integer and every value is counted without rounding, on edges too.
+    sample = [0, bins] + [rng.randint(0, 4 * bins) / 4 for _ in range(sample_size - 2)]
+    values = sample + [rng.randint(-200 * bins, 200 * bins) / 4 for _ in range(500)]
+    histogram = StreamingHistogram(bins, sample_size=sample_size)
+    histogram.update(values)
+
+    edges = histogram.edges()
+    assert edges[0] < min(values) and max(values) <= edges[-1]
+    assert histogram.counts == _brute_force_counts(values, edges)
+    assert len(histogram.counts) == bins
+
+
+def test_fixed_range():
+    histogram = StreamingHistogram(4, (0, 4))
+    histogram.update([0, 0.5, 1, 3.9, 4, 5, -1, float("nan")])
+    assert histogram.counts == [2, 1, 0, 2]
+    assert histogram.edges() == [0, 1, 2, 3, 4]
+    assert (histogram.skipped, histogram.out_of_range) == (1, 2)
+    with pytest.warns(UserWarning):
+        _ = histogram.to_data_sequence()
+
+
+def test_log_scale_bins():
+    histogram = StreamingHistogram(3, (1, 1000), DataScaleType.log)
+    histogram.update([1, 5, 10, 50, 500, 0, -3])
+    assert histogram.counts == [2, 2, 1]
+    assert histogram.edges() == pytest.approx([1, 10, 100, 1000])
+    assert histogram.centers()[0] == pytest.approx(math.sqrt(10))
+    assert histogram.skipped == 2
+
+
+def test_constant_values():
+    histogram = StreamingHistogram(5)
+    histogram.update([3] * 10)
+    seq = histogram.to_data_sequence(0, "v")
+    assert sum(seq.y) == 10
+    assert seq.name == "v"
+
+
+@pytest.mark.parametrize(
+    ("bins", "range_", "scale"),
+    [
+        (0, None, DataScaleType.linear),
+        (10, (1, 0), DataScaleType.linear),
+        (10, (0, 1), DataScaleType.log),
+    ]
+)
+def test_histogram_error(bins: int, range_, scale: DataScaleType):
+    with pytest.raises(ValueError):
+        _ = StreamingHistogram(bins, range_, scale)
+
+
+def test_empty_histogram_error():
+    with pytest.raises(ValueError):
+        _ = StreamingHistogram(5).to_data_sequence()
+
+
+def test_histogram_counts_fixed_max_in_last_bin():
+    # lo + width * bins is rounded below this max
+    low, high = -0.9999500387287682, 1.0999728416540575
+    histogram = StreamingHistogram(20, (low, high))
+    histogram.update([low, high])
+    assert (histogram.counts[0], histogram.counts[-1], histogram.out_of_range) == (1, 1, 0)
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import scatterminal.color as color
+import scatterminal.data_layer_model as dlm
+import scatterminal.overlay as overlay
+import scatterminal.plot as plot
+
+# Committed cold-start budget of `python -m scatterminal ...` (import time after the interpreter startup).
+# Raise these only together with a justification in the commit message.
+IMPORT_TIME_BUDGET_US = {
+    "help": 40_000,
+    "plot": 120_000,
+}
+HELP_FORBIDDEN_MODULES = {
+    "scatterminal.canvas_layer_model",
+    "scatterminal.csv_parser",
+    "scatterminal.data_layer_model",
+    "scatterminal.terminal_layer_model",
+}
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "samples", "triple_column.csv")
+
+
+def _measure_import_time(args: list[str]) -> tuple[int, set[str]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "scatterminal", *args],
+        check=True, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path), "COLUMNS": "80", "LINES": "24"}
+    )
+    total_us = 0
+    modules = set()
+    started = False
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        started = started or module.startswith("scatterminal")
+        if not started:
+            # interpreter startup (site, encodings, ...)
+            continue
+        modules.add(module)
+        if not name[1:].startswith(" "):
+            # top-level import
+            total_us += int(cumulative)
+    return total_us, modules
+
+
+@pytest.mark.parametrize(
+    ("budget_name", "args"),
+    [
+        ("help", ["--help"]),
+        ("plot", [SAMPLE_PATH]),
+    ]
+)
+def test_import_time_budget(budget_name: str, args: list[str]):
+    # the best of a few runs to be robust against noisy machines
+    total_us = min(_measure_import_time(args)[0] for _ in range(3))
+    assert total_us <= IMPORT_TIME_BUDGET_US[budget_name]
+
+
+def test_help_does_not_import_layers():
+    _, modules = _measure_import_time(["--help"])
+    assert modules.isdisjoint(HELP_FORBIDDEN_MODULES)
+
+
+def test_cli_choices_match_enums():
+    assert plot.SCALE_CHOICES == tuple(scale.value for scale in dlm.DataScaleType)
+    assert plot.LEGEND_LOC_CHOICES == tuple(loc.value for loc in dlm.DataLegendLoc)
+    assert plot.STYLE_CHOICES == tuple(style.value for style in dlm.DataPlotStyle)
+    assert plot.FIT_CHOICES == overlay.FIT_TYPES
+    assert plot.COLOR_CHOICES == color.COLOR_CHOICES
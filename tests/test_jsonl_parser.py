@@ -0,0 +1,95 @@
+import io
+import json
+import math
+import warnings
+
+import pytest
+
+from scatterminal import jsonl_parser
+from scatterminal.csv_parser import iter_rows, parse_grouped_stream, parse_stream
+
+
+def _rows(text: str, fields=None) -> list[list[str]]:
+    return list(jsonl_parser.iter_json_rows(io.StringIO(text), fields))
+
+
+@pytest.mark.parametrize("line, expected", [
+    ('{"t": 1, "y": 2.5}', ["1", "2.5"]),
+    ('{ "y" : -1e3 , "t":"2024-01-01" }', ["2024-01-01", "-1e3"]),
+    ('{"t": null, "y": true}', ["", "1"]),
+    ('{"t": 1, "name": "y", "y": 4, "t": 2}', ["2", "4"]),
+    ('{"t": 1, "y": false, "z": {"y": 5}}', None),
+    ('{"t": 1, "msg": "\\"y\\": 5", "y": 3}', None),
+    ('{"meta": {"y": 3}, "t": 1}', None),
+    ('{"t": 1, "y": [1, 2]}', None),
+    ('{"t": 1}', jsonl_parser._MISSING),
+])
+def test_scan(line, expected):
+    assert jsonl_parser._scan(line, jsonl_parser._scan_pattern(["t", "y"]), ["t", "y"]) == expected
+
+
+@pytest.mark.parametrize("line", [
+    '{"t": 1, "y": 2.5}',
+    '{"t": 1, "y": false, "z": {"y": 5}}',
+    '{"t": 1, "msg": "\\"y\\": 5", "y": 3}',
+    '{"t": 1, "name": "y", "y": 4}',
+    '{"t": "caf\\u00e9", "y": 1}',
+    '{"meta": {"y": 3}, "t": 1}',
+    '{"t": 1, "y": [1, 2]}',
+])
+def test_scan_agrees_with_decode(line):
+    scanned = jsonl_parser._scan(line, jsonl_parser._scan_pattern(["t", "y"]), ["t", "y"])
+    decoded = jsonl_parser._decode(line, ["t", "y"])
+    if scanned is not None:
+        assert scanned is jsonl_parser._MISSING or [float(c) for c in scanned] == [float(c) for c in decoded]
+        assert (scanned is jsonl_parser._MISSING) == (decoded is jsonl_parser._MISSING)
+
+
+def test_nested_fields_and_skipped_lines():
+    text = "\n".join([
+        json.dumps({"t": 0, "http": {"status": 200, "bytes": 10}}),
+        "",
+        json.dumps({"t": 1, "http": {"status": 500}}),
+        "not json",
+        json.dumps({"t": 2, "http": {"status": 404, "bytes": 30}}),
+    ])
+    with pytest.warns(UserWarning, match="2 of 4 lines without the fields"):
+        rows = _rows(text, ["t", "http.bytes"])
+    assert rows == [["t", "http.bytes"], ["0", "10"], ["2", "30"]]
+
+
+def test_default_fields_are_top_level_scalars():
+    rows = _rows('{"t": 0, "tags": ["a"], "y": 1.5, "host": "a"}\n{"t": 1, "y": 2, "host": "b"}\n')
+    assert rows == [["t", "y", "host"], ["0", "1.5", "a"], ["1", "2", "b"]]
+    assert _rows("") == []
+
+
+def test_no_warning_without_skipped_lines():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert len(_rows('{"t": 0, "y": 1}\n', ["t", "y"])) == 2
+
+
+@pytest.mark.parametrize("ext", ["jsonl", "ndjson", None])
+def test_iter_rows_dispatch(ext):
+    text = '{"t": "2024-01-01T00:00:00", "y": 1, "z": null}\n{"t": "2024-01-01T00:00:10", "y": 2, "z": 3}\n'
+    sequences = parse_stream(iter_rows(io.StringIO(text), ext, None), 0)
+    assert [seq.name for seq in sequences] == ["y", "z"]
+    assert sequences[0].x_time and list(sequences[0].x) == [1704067200.0, 1704067210.0]
+    assert list(sequences[0].y) == [1, 2]
+    assert math.isnan(sequences[1].y[0])
+
+
+def test_group_by_field():
+    text = "".join(json.dumps({"t": i, "host": "ab"[i % 2], "y": i * i}) + "\n" for i in range(6))
+    sequences = parse_grouped_stream(iter_rows(io.StringIO(text), "jsonl", None, ["t", "y", "host"]), "host", 0, None)
+    assert [(seq.name, list(seq.x)) for seq in sequences] == [("a", [0, 2, 4]), ("b", [1, 3, 5])]
+
+
+def test_read_file_path_adds_the_group_field(tmp_path):
+    import scatterminal.plot as plot
+
+    file_path = tmp_path / "requests.ndjson"
+    file_path.write_text("".join(json.dumps({"t": i, "host": "ab"[i % 2], "y": i, "z": 0}) + "\n" for i in range(4)))
+    sequences = plot._read_file_path(str(file_path), None, 0, "host", None, ["t", "y"])
+    assert [(seq.name, list(seq.y)) for seq in sequences] == [("a", [0, 2]), ("b", [1, 3])]
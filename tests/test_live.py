@@ -0,0 +1,123 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+import scatterminal.live as live
+from scatterminal.data_layer_model import DataSequence
+
+
+def test_sequence_buffer_max_points():
+    buffer = live._SequenceBuffer(max_points=3, max_age=None)
+    for i in range(5):
+        buffer.append(None, i * 10, float(i))
+    assert buffer.to_data_sequence(0, "a") == DataSequence([2, 3, 4], [20, 30, 40], 0, "a")
+
+
+def test_sequence_buffer_max_age():
+    buffer = live._SequenceBuffer(max_points=None, max_age=1.5)
+    for i in range(5):
+        buffer.append(i, i, float(i))
+    buffer.expire(4.0)
+    assert buffer.to_data_sequence(0, None) == DataSequence([3, 4], [3, 4], 0)
+
+
+@pytest.mark.parametrize(
+    ("line", "expected"),
+    [
+        ("1.5,2", (1.5, 2)),
+        ("7", (None, 7)),
+        ("x,y", None),
+    ]
+)
+def test_parse_line(line: str, expected):
+    assert live._parse_line(line, ",") == expected
+
+
+def test_run_live_file_and_fifo(tmp_path, capsys, monkeypatch):
+    if sys.platform == "win32":
+        pytest.skip("named pipes are not available")
+    file_path = tmp_path / "file.csv"
+    file_path.write_text("x,y\n0,1\n1,2\n")
+    fifo_path = tmp_path / "pipe"
+    os.mkfifo(fifo_path)
+    pipes = []
+    fdopen = os.fdopen
+    monkeypatch.setattr(live.os, "fdopen", lambda *args, **kwargs: pipes.append(fdopen(*args, **kwargs)) or pipes[-1])
+
+    async def write_fifo():
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(0.05)
+        fd = await loop.run_in_executor(None, os.open, fifo_path, os.O_WRONLY)
+        os.write(fd, b"5\n6\n7\n")
+        return fd
+
+    async def scenario():
+        writer = asyncio.create_task(write_fifo())
+        result = await live.run_live(
+            [live.LiveSource(str(file_path), "file"), live.LiveSource(str(fifo_path), "pipe", max_points=2)],
+            interval=0.1,
+            duration=0.4
+        )
+        # the writer is still open when the dashboard stops, but the pipe is closed with its task
+        assert len(pipes) == 1 and pipes[0].closed
+        os.close(await writer)
+        return result
+
+    actual = asyncio.run(scenario())
+    assert actual == [
+        DataSequence([0, 1], [1, 2], 0, "file"),
+        DataSequence([1, 2], [6, 7], 1, "pipe"),
+    ]
+    assert "*: file  o: pipe" in capsys.readouterr().out
+
+
+def test_run_live_reports_failed_source(tmp_path):
+    file_path = tmp_path / "file.csv"
+    file_path.write_text("0,1\n")
+    sources = [live.LiveSource(str(file_path), "file"), live.LiveSource(str(tmp_path / "missing.csv"), "missing")]
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(live.run_live(sources, interval=0.05, duration=5))
+
+
+@pytest.mark.parametrize("content", ["1,2\n", "0,3\n1,3\n2,3\n"])
+def test_run_live_single_point_or_constant(tmp_path, capsys, content: str):
+    file_path = tmp_path / "file.csv"
+    file_path.write_text(content)
+    actual = live.live([live.LiveSource(str(file_path), "file")], interval=0.2, duration=0.5)
+    assert len(actual) == 1 and len(actual[0].x) == content.count("\n")
+    assert "*: file" in capsys.readouterr().out
+
+
+def test_run_live_ticks_do_not_drift(tmp_path, monkeypatch):
+    file_path = tmp_path / "file.csv"
+    file_path.write_text("0,1\n1,2\n")
+    render_times = []
+
+    def slow_plot(*args, **kwargs):
+        render_times.append(time.perf_counter())
+        time.sleep(0.05)
+
+    monkeypatch.setattr(live, "plot_sequences", slow_plot)
+    start = time.perf_counter()
+    live.live([live.LiveSource(str(file_path))], interval=0.1, duration=0.55)
+    # ticks at 0.1, 0.2, ..., 0.5 and the last render at 0.55; the render time would delay every later tick
+    assert len(render_times) == 6
+    assert render_times[4] - start < 0.54
+
+
+def test_follow_file_in_chunks(tmp_path, monkeypatch):
+    file_path = tmp_path / "file.csv"
+    lines = ["%d,%d" % (i, i * i) for i in range(100)]
+    file_path.write_text("\n".join(lines) + "\n")
+    monkeypatch.setattr(live, "_READ_SIZE", 7)
+
+    async def read_lines():
+        follow = live._follow_file(str(file_path), 0.01)
+        result = [await follow.__anext__() for _ in lines]
+        await follow.aclose()
+        return result
+
+    assert asyncio.run(read_lines()) == lines
@@ -0,0 +1,95 @@
+import math
+
+import pytest
+
+import scatterminal.overlay as overlay
+from scatterminal.csv_parser import parse_stream, parse_grouped_stream
+from scatterminal.data_layer_model import DataSequence
+
+
+def test_rolling_mean():
+    rolling = overlay.RollingMean(3)
+    for x, y in enumerate([1, 2, 3, float("nan"), 4, 5]):
+        rolling.add(x, y)
+    seq = rolling.to_data_sequence(5, "v")
+    assert seq == DataSequence([2, 4, 5], [2.0, 3.0, 4.0], 5, "v rolling 3")
+
+
+def test_rolling_mean_output_is_bounded(monkeypatch):
+    monkeypatch.setattr(overlay, "_ROLLING_POINT_NUM", 4)
+    rolling = overlay.RollingMean(2)
+    for x in range(101):
+        rolling.add(x, float(x))
+        assert len(rolling._x) < 8
+    seq = rolling.to_data_sequence(0, "v")
+    # every 16th mean of the 100, and the last one
+    assert seq.x == [1, 17, 33, 49, 65, 81, 97, 100]
+    assert seq.y == [x - 0.5 for x in seq.x]
+
+
+def test_rolling_mean_shorter_than_window():
+    rolling = overlay.RollingMean(10)
+    rolling.add(0, 1)
+    assert rolling.to_data_sequence(0, "v") is None
+
+
+@pytest.mark.parametrize(
+    ("log_log", "func", "expected"),
+    [
+        (False, lambda x: 2 * x + 1, (2, 1)),
+        (True, lambda x: 3 * x ** 1.5, (1.5, math.log10(3))),
+    ]
+)
+def test_least_squares_fit(log_log: bool, func, expected: tuple[float, float]):
+    fit = overlay.LeastSquaresFit(log_log)
+    for x in range(1, 50):
+        fit.add(x, func(x))
+    assert fit.coefficients() == pytest.approx(expected)
+    seq = fit.to_data_sequence(0, "v")
+    assert (seq.x[0], seq.x[-1]) == pytest.approx((1, 49))
+    assert seq.y[-1] == pytest.approx(func(49))
+
+
+@pytest.mark.parametrize(("point_num", "span"), [(10000, 100), (1000, 1000)])
+def test_least_squares_fit_on_epoch_seconds(point_num: int, span: float):
+    # x as parsed from timestamps; y = 2 * (x - t0) + 5
+    t0 = 1700000000.0
+    fit = overlay.LeastSquaresFit()
+    for i in range(point_num):
+        x = t0 + span * i / point_num
+        fit.add(x, 2 * (x - t0) + 5)
+    slope, intercept = fit.coefficients()
+    assert slope == pytest.approx(2, rel=1e-9)
+    assert intercept == pytest.approx(5 - 2 * t0, rel=1e-9)
+    assert fit.to_data_sequence(0, "v", x_time=True).y[-1] == pytest.approx(2 * span * (1 - 1 / point_num) + 5)
+
+
+def test_least_squares_fit_without_spread():
+    fit = overlay.LeastSquaresFit()
+    fit.add(1, 1)
+    fit.add(1, 2)
+    assert fit.to_data_sequence(0, "v") is None
+
+
+def test_overlay_spec_error():
+    with pytest.raises(ValueError):
+        _ = overlay.OverlaySpec(rolling=0)
+    with pytest.raises(ValueError):
+        _ = overlay.OverlaySpec(fit="cubic")
+
+
+def test_parse_stream_with_overlays():
+    rows = iter([["x", "a", "b"], ["0", "1", "10"], ["1", "3", "30"], ["2", "5", "50"]])
+    actual = parse_stream(rows, 2, overlay.OverlaySpec(rolling=2, fit="linear"))
+    assert [(seq.seq_id, seq.name) for seq in actual] == [
+        (2, "a"), (3, "b"),
+        (4, "a rolling 2"), (5, "a fit y=2x+1"), (6, "b rolling 2"), (7, "b fit y=20x+10"),
+    ]
+    assert actual[2].y == [2.0, 4.0]
+    assert all(seq.x_name == "x" for seq in actual)
+
+
+def test_parse_grouped_stream_with_overlays():
+    rows = iter([["t", "host", "v"], ["0", "a", "1"], ["0", "b", "5"], ["1", "a", "3"], ["1", "b", "5"]])
+    actual = parse_grouped_stream(rows, "host", 0, overlay.OverlaySpec(rolling=2))
+    assert [(seq.seq_id, seq.name, seq.y) for seq in actual[2:]] == [(2, "a rolling 2", [2.0]), (3, "b rolling 2", [5.0])]
@@ -0,0 +1,81 @@
+import os
+import random
+import warnings
+
+import pytest
+
+import scatterminal.parallel as parallel
+import scatterminal.plot as plot
+from scatterminal.data_layer_model import DataSequence
+
+TERMINAL_SIZE = os.terminal_size((70, 20))
+
+
+@pytest.fixture(autouse=True)
+def _small_shards(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_POINTS_PER_WORKER", 1)
+
+
+def _sequences(n: int = 3000) -> list[DataSequence]:
+    rng = random.Random(0)
+    return [
+        DataSequence([rng.gauss(0, 1) for _ in range(n)], [rng.gauss(i, 1) for _ in range(n)], i, "s%d" % i)
+        for i in range(3)
+    ]
+
+
+def _render_with_warnings(sequences: list[DataSequence], **kwargs) -> tuple[str, list[str]]:
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        out = plot._render(sequences, terminal_size=TERMINAL_SIZE, **kwargs)
+    return out, [str(w.message) for w in caught]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(),
+        dict(color_mode="256"),
+        dict(autoscale="quantile", clip=(5, 95)),
+        dict(x_lim=(-1, 1), y_lim=(0, 2)),
+        dict(y_scale="log", legend_loc="right"),
+    ]
+)
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_matches_serial(kwargs, workers):
+    sequences = _sequences()
+    assert _render_with_warnings(sequences, workers=workers, **kwargs) == _render_with_warnings(sequences, **kwargs)
+
+
+def test_later_series_wins_contested_cell():
+    # the contested cell is split across shards; the serial renderer draws "o" of the second series last
+    sequences = [DataSequence([0, 1, 0.5, 0.5], [0, 1, 0.5, 0.5], 0, "a"), DataSequence([0.5, 0.5], [0.5, 0.5], 1, "b")]
+    frame = plot._render(sequences, terminal_size=TERMINAL_SIZE, workers=3)
+    assert frame == plot._render(sequences, terminal_size=TERMINAL_SIZE)
+    middle_line = next(line for line in frame.splitlines() if line.startswith("0.500"))
+    assert "o" in middle_line and "*" not in middle_line
+
+
+def test_merge_keeps_first_two_orders():
+    first = parallel.CellGridShard(2)
+    first.counts[0], first.series[0], first.first[0] = 1, 0, 3
+    later = parallel.CellGridShard(2)
+    later.counts[0], later.series[0], later.first[0], later.second[0] = 2, 1, 7, 9
+    later.counts[1], later.series[1], later.first[1] = 1, 1, 8
+    first.merge(later)
+    assert list(first.counts) == [3, 1]
+    assert list(first.series) == [1, 1]
+    assert list(first.first) == [3, 8]
+    assert list(first.second) == [7, -1]
+
+
+@pytest.mark.parametrize(
+    ("requested", "point_num", "expected"),
+    [
+        (None, 10 ** 9, 1),
+        (4, 10 ** 9, 4),
+        (4, 2, 2),
+    ]
+)
+def test_worker_num(requested, point_num, expected):
+    assert parallel.worker_num(requested, point_num) == expected
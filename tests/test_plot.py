@@ -0,0 +1,159 @@
+import os
+
+import pytest
+
+import scatterminal.plot as plot
+from scatterminal.data_layer_model import DataSequence, SimpleDataSequence
+
+TERMINAL_SIZE = os.terminal_size((100, 30))
+PANEL_SIZE = os.terminal_size((50, 15))
+
+
+def _panels() -> list[list[DataSequence]]:
+    return [
+        [DataSequence([0, 1, 2], [1, 2, 3], 0, "a")],
+        [DataSequence([10, 20, 30], [-5, 0, 5], 0, "b")],
+        [DataSequence([0, 5], [100, 200], 0, "c")],
+    ]
+
+
+def test_render_grid_stitches_panels():
+    frame_lines = plot._render_grid(2, 2, _panels(), terminal_size=TERMINAL_SIZE).split("\n")[-TERMINAL_SIZE.lines:]
+    assert all(len(line) == TERMINAL_SIZE.columns for line in frame_lines)
+
+    panel_lines = plot._render(_panels()[1], terminal_size=PANEL_SIZE).split("\n")[-PANEL_SIZE.lines:]
+    assert [line[PANEL_SIZE.columns:] for line in frame_lines[:PANEL_SIZE.lines]] == panel_lines
+    # empty cell of the grid
+    assert all(line[PANEL_SIZE.columns:].strip() == "" for line in frame_lines[PANEL_SIZE.lines:])
+
+
+@pytest.mark.parametrize(
+    ("share_x", "share_y"),
+    [
+        (True, False),
+        (False, True),
+        (True, True),
+    ]
+)
+def test_render_grid_shared_axes(share_x: bool, share_y: bool):
+    frame_lines = plot._render_grid(
+        1, 3, _panels(), share_x, share_y, terminal_size=os.terminal_size((150, 15))
+    ).split("\n")[-15:]
+    panels = [[line[i * 50:(i + 1) * 50] for line in frame_lines] for i in range(3)]
+    x_tick_lines = [tuple(panel[-4].split()) for panel in panels]
+    y_tick_columns = [[line[1:9] for line in panel[:-4]] for panel in panels]
+    assert (len(set(x_tick_lines)) == 1) == share_x
+    assert (len(set(map(tuple, y_tick_columns))) == 1) == share_y
+
+
+def test_render_grid_too_many_panels():
+    with pytest.raises(ValueError, match="Too many panels"):
+        plot._render_grid(1, 2, _panels(), terminal_size=TERMINAL_SIZE)
+
+
+def test_plot_grid_single_write(capsys):
+    plot.plot_grid(1, 2, [[SimpleDataSequence([0, 1], [1, 2], "a")], [SimpleDataSequence([0, 1], [2, 1], "b")]])
+    out = capsys.readouterr().out
+    assert "*: a" in out and "*: b" in out
+
+
+def test_read_sequences_group_by():
+    file_path = os.path.join(os.path.dirname(__file__), "samples", "long_format.csv")
+    data_sequences = plot._read_sequences([file_path, file_path], None, group_by="host")
+    assert [(seq.seq_id, seq.name) for seq in data_sequences] == [(0, "web1"), (1, "web2"), (2, "web1"), (3, "web2")]
+    assert data_sequences[0].x == [0, 1, 2, 3]
+    assert data_sequences[1].y == [20.1, 19.4, 21.0, 18.7]
+
+
+def test_plot_hist_csv(capsys):
+    file_path = os.path.join(os.path.dirname(__file__), "samples", "long_format.csv")
+    plot._plot_hist_csv([file_path], None, "latency", bins=4)
+    out = capsys.readouterr().out
+    assert "*: latency" in out
+
+
+@pytest.mark.parametrize(("column", "name"), [("1", "sin"), ("sin", "sin")])
+def test_plot_hist_csv_column_index(capsys, column: str, name: str):
+    file_path = os.path.join(os.path.dirname(__file__), "samples", "triple_column.csv")
+    plot._plot_hist_csv([file_path], None, column, bins=4, color="never")
+    assert "*: %s " % name in capsys.readouterr().out
+
+
+def test_plot_hist_csv_column_index_without_header(tmp_path, capsys):
+    file_path = tmp_path / "values.csv"
+    file_path.write_text("1,2\n3,4\n5,6\n")
+    plot._plot_hist_csv([str(file_path)], None, "1", bins=2, color="never")
+    assert "*: 1 " in capsys.readouterr().out
+
+
+def test_plot_hist_consumes_generator(capsys):
+    plot.plot_hist((v % 10 for v in range(1000)), bins=10, name="v", x_scale="linear")
+    assert "*: v" in capsys.readouterr().out
+
+
+def _frame(out: str, lines: int) -> list[str]:
+    return out.split("\n")[-lines - 1:-1]
+
+
+@pytest.mark.parametrize(
+    ("x_lim", "y_lim", "x_scale"),
+    [
+        (None, None, "linear"),
+        ((0, 10), (-1.5, 1.5), "linear"),
+        ((0.1, 10), (-1.5, 1.5), "log"),
+    ]
+)
+def test_plot_inline_consumes_generators(monkeypatch, capsys, x_lim, y_lim, x_scale: str):
+    import math
+
+    monkeypatch.setenv("COLUMNS", "60")
+    monkeypatch.setenv("LINES", "20")
+    xs = [0.1 + i / 600 for i in range(5000)]
+    kwargs = dict(x_lim=x_lim, y_lim=y_lim, x_scale=x_scale)
+
+    plot.plot_inline([SimpleDataSequence(xs, [math.sin(x) for x in xs], "sin"), SimpleDataSequence(xs, [x / 10 for x in xs])], **kwargs)
+    expected = _frame(capsys.readouterr().out, 20)
+    plot.plot_inline([
+        SimpleDataSequence((x for x in xs), (math.sin(x) for x in xs), "sin"),
+        ((x, x / 10) for x in xs)
+    ], **kwargs)
+    assert _frame(capsys.readouterr().out, 20) == expected
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("0.5,99.5", (0.5, 99.5)),
+        ("1,99", (1.0, 99.0)),
+    ]
+)
+def test_parse_clip(value: str, expected: tuple[float, float]):
+    assert plot._parse_clip(value) == expected
+
+
+@pytest.mark.parametrize("value", ["1", "a,b", "99,1", "0,101"])
+def test_parse_clip_error(value: str):
+    import argparse
+
+    with pytest.raises(argparse.ArgumentTypeError):
+        plot._parse_clip(value)
+
+
+@pytest.mark.parametrize(
+    ("args", "message"),
+    [
+        (["a.csv", "--hist", "y", "--style", "line"], "--style is not available with --hist"),
+        (["a.csv", "--hist", "y", "--autoscale", "quantile"], "--autoscale is not available with --hist"),
+        (["a.csv", "--animate", "--window", "5", "--xlim", "0", "1"], "--xlim is not available with --animate"),
+        (["a.csv", "--animate", "--window", "0"], "--window must be positive: 0"),
+        (["a.csv", "--clip", "1,99"], "--clip is only used with --autoscale quantile"),
+        (["a.csv", "--animate", "--window", "5", "--step", "0"], "--step must be positive: 0"),
+        (["a.csv", "--animate", "--window", "5", "--fps", "-1"], "--fps must be positive: -1"),
+        (["--sqlite", "a.db", "--query", "SELECT 1", "--hist", "0", "--clip", "1,99"], "--clip is not available with --hist"),
+    ]
+)
+def test_main_rejects_unused_options(monkeypatch, capsys, args: list[str], message: str):
+    monkeypatch.setattr("sys.argv", ["plot"] + args)
+    with pytest.raises(SystemExit):
+        plot.main()
+    assert message in capsys.readouterr().err
@@ -0,0 +1,55 @@
+import os
+
+import scatterminal.profiling as profiling
+from scatterminal.data_layer_model import SimpleDataSequence
+from scatterminal.plot import plot_csv, plot_inline
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "samples")
+
+
+def test_profiler_stage_and_hooks():
+    received = []
+    profiler = profiling.Profiler(hooks=[received.append])
+    with profiler.stage("a") as stage:
+        _ = [0] * 1000
+        stage.points = 10
+    with profiler.stage("b"):
+        pass
+
+    assert [r.stage for r in profiler.records] == ["a", "b"]
+    assert received == profiler.records
+    assert profiler.records[0].points == 10
+    assert profiler.records[0].peak_bytes >= 8000
+
+
+def test_profiler_without_memory_tracing():
+    profiler = profiling.Profiler(trace_memory=False)
+    with profiler.stage("a"):
+        pass
+    assert profiler.records[0].peak_bytes is None
+    assert "total" in profiler.report()
+
+
+def test_plot_inline_profile(capsys):
+    received = []
+    profiling.register_hook(received.append)
+    try:
+        profile = plot_inline([SimpleDataSequence([0, 1, 2], [1, 2, 3], "a")], profile=True)
+    finally:
+        profiling.unregister_hook(received.append)
+
+    assert [s["stage"] for s in profile["stages"]] == ["Data.to_canvas", "Canvas.to_terminal", "Terminal.render"]
+    assert all(s["points"] == 3 for s in profile["stages"])
+    assert [r.stage for r in received] == ["Data.to_canvas", "Canvas.to_terminal", "Terminal.render"]
+    assert "*: a" in capsys.readouterr().out
+
+
+def test_plot_csv_profile():
+    profile = plot_csv([os.path.join(SAMPLE_DIR, "triple_column.csv")], profile=True)
+    assert profile["stages"][0]["stage"] == "parse"
+    assert profile["stages"][0]["points"] == 24
+    assert profile["total_seconds"] == sum(s["seconds"] for s in profile["stages"])
+
+
+def test_plot_without_profile():
+    assert plot_inline([SimpleDataSequence([0, 1], [1, 2])]) is None
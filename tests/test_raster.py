@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+import scatterminal.plot as plot
+from scatterminal.data_layer_model import DataSequence
+from scatterminal.raster import CellReducer
+
+TERMINAL_SIZE = os.terminal_size((70, 20))
+SAMPLES = os.path.join(os.path.dirname(__file__), "samples")
+
+
+def _grid(x_lim: tuple[float, float], y_lim: tuple[float, float], x_scale: str = "linear"):
+    return plot._new_cell_grid(
+        [DataSequence([], [], 0, "a")], None, None, x_scale, "linear", x_lim, y_lim, "lower", TERMINAL_SIZE
+    )
+
+
+def test_reducer_keeps_two_points_per_cell():
+    reducer = CellReducer(_grid((0, 1), (0, 1)), DataSequence([], [], 0, "a"))
+    reducer.update((i / 10 ** 5, 0.5) for i in range(10 ** 5))
+    seq = reducer.to_data_sequence()
+    assert reducer.points == 10 ** 5
+    assert len(seq.x) == 2 * plot._new_cell_grid(
+        [seq], None, None, "linear", "linear", (0, 1), (0, 1), "lower", TERMINAL_SIZE
+    ).columns
+    assert seq.x[:2] == [0.0, 1 / 10 ** 5]
+    assert seq.name == "a"
+
+
+def test_reducer_drops_points_outside_limits():
+    reducer = CellReducer(_grid((0, 1), (0, 1)), DataSequence([], [], 0, "a"))
+    reducer.update([(2, 0.5), (0.5, -1), (float("nan"), 0.5), (0.5, 0.5)])
+    assert reducer.to_data_sequence().x == [0.5]
+
+
+def test_reducer_keeps_one_non_positive_point_on_log_scale():
+    reducer = CellReducer(_grid((0.1, 10), (0, 1), "log"), DataSequence([], [], 0, "a"))
+    reducer.update([(0, 0.5), (-1, 0.5), (1, 0.5)])
+    assert reducer.to_data_sequence().x == [0, 1]
+
+
+@pytest.mark.parametrize(
+    ("file_names", "kwargs"),
+    [
+        (["triple_column.csv"], dict(x_lim=(0, 5), y_lim=(-0.8, 0.8))),
+        (["double_column_power.csv", "double_column_power_seq2.csv"], dict(x_lim=(2, 20), y_lim=(1, 300), y_scale="log")),
+        (["single_column.csv"], dict(x_lim=(-1, 4), y_lim=(0, 10), legend_loc="right")),
+        (["double_column_power_contain_nega.csv"], dict(x_lim=(0, 20), y_lim=(0.5, 500), y_scale="log")),
+    ]
+)
+def test_rasterized_csv_matches_materialised(monkeypatch, capsys, file_names: list[str], kwargs: dict):
+    file_paths = [os.path.join(SAMPLES, name) for name in file_names]
+    expected = plot._render(plot._read_sequences(file_paths, None), terminal_size=TERMINAL_SIZE, **kwargs)
+
+    monkeypatch.setenv("COLUMNS", str(TERMINAL_SIZE.columns))
+    monkeypatch.setenv("LINES", str(TERMINAL_SIZE.lines))
+    monkeypatch.setattr(plot, "_read_sequences", None)  # never materialised
+    plot.plot_csv(file_paths, color="never", **kwargs)
+    assert capsys.readouterr().out == expected + "\n"
+
+
+def test_rasterized_dense_csv_matches_materialised(monkeypatch, capsys, tmp_path):
+    import random
+
+    rand = random.Random(0)
+    file_path = tmp_path / "dense.csv"
+    file_path.write_text("x,a,b\n" + "".join(
+        "%f,%f,%f\n" % (rand.uniform(-1, 11), rand.gauss(0, 1), rand.gauss(1, 2)) for _ in range(20000)
+    ))
+    kwargs = dict(x_lim=(0, 10), y_lim=(-3, 3))
+    expected = plot._render(plot._read_sequences([str(file_path)], None), terminal_size=TERMINAL_SIZE, **kwargs)
+
+    monkeypatch.setenv("COLUMNS", str(TERMINAL_SIZE.columns))
+    monkeypatch.setenv("LINES", str(TERMINAL_SIZE.lines))
+    plot.plot_csv([str(file_path)], color="never", **kwargs)
+    assert capsys.readouterr().out == expected + "\n"
@@ -0,0 +1,76 @@
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import os
+from multiprocessing import shared_memory
+
+import pytest
+
+from scatterminal.data_layer_model import DataSequence
+from scatterminal.shared import AttachedSequences, SharedSequences
+
+
+def _sequences() -> list[DataSequence]:
+    return [
+        DataSequence([1, 2, 3], [0.5, float("nan"), -1.5], 0, "a", "x"),
+        DataSequence([], [], 1, "empty"),
+        DataSequence([10.0, 20.0], [1.0, 2.0], 2, None, None, True),
+    ]
+
+
+def test_attached_sequences_match_published():
+    sequences = _sequences()
+    with SharedSequences(sequences) as published, AttachedSequences() as attached:
+        for seq, handle in zip(sequences, published.handles):
+            shared = attached.sequence(handle)
+            assert isinstance(shared.x, memoryview)
+            assert (shared.seq_id, shared.name, shared.x_name, shared.x_time) == (seq.seq_id, seq.name, seq.x_name, seq.x_time)
+            assert list(shared.x) == seq.x
+            assert str(list(shared.y)) == str(seq.y)
+        assert list(attached.sequence(published.handles[0], 1, 3).x) == [2, 3]
+
+
+def test_views_are_zero_copy():
+    with SharedSequences(_sequences()) as published, AttachedSequences() as attached:
+        first = attached.sequence(published.handles[2])
+        second = attached.sequence(published.handles[2])
+        first.x[0] = 99.0
+        assert second.x[0] == 99.0
+
+
+def test_segment_is_unlinked_on_close():
+    with SharedSequences(_sequences()) as published:
+        name = published.handles[0].segment
+        shared_memory.SharedMemory(name).close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name)
+
+
+def _crash(handle):
+    with AttachedSequences() as attached:
+        attached.sequence(handle)
+        os._exit(1)
+
+
+def test_segment_is_unlinked_when_worker_crashes():
+    with pytest.raises(BrokenProcessPool):
+        with SharedSequences(_sequences()) as published:
+            name = published.handles[0].segment
+            with concurrent.futures.ProcessPoolExecutor(1) as executor:
+                executor.submit(_crash, published.handles[0]).result()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name)
+
+
+def test_publish_error_is_not_hidden(monkeypatch):
+    created = []
+    original = shared_memory.SharedMemory
+
+    def _shared_memory(*args, **kwargs):
+        created.append(original(*args, **kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(shared_memory, "SharedMemory", _shared_memory)
+    with pytest.raises(TypeError):
+        SharedSequences([DataSequence.trusted([1, 2], ["a", "b"], 0)])
+    with pytest.raises(FileNotFoundError):
+        original(created[0].name)
@@ -0,0 +1,137 @@
+import math
+import os
+import random
+import sqlite3
+
+import pytest
+
+import scatterminal.plot as plot
+from scatterminal import sqlite_source
+from scatterminal.data_layer_model import DataScaleType
+from scatterminal.histogram import StreamingHistogram
+from scatterminal.raster import CellReducer
+
+TERMINAL_SIZE = os.terminal_size((60, 20))
+
+
+def _database(tmp_path, rows: list[tuple], columns: str = "t, a, b") -> str:
+    db_path = str(tmp_path / "metrics.sqlite")
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("CREATE TABLE metrics (%s)" % columns)
+        connection.executemany("INSERT INTO metrics VALUES (%s)" % ", ".join("?" * len(rows[0])), rows)
+    connection.close()
+    return db_path
+
+
+def test_read_query(tmp_path):
+    db_path = _database(tmp_path, [(1, 2.5, None), (2, 3, 4), (3, None, 5.5)])
+    with sqlite_source.connect(db_path) as connection:
+        sequences = sqlite_source.read_query(connection, "SELECT t, a, b AS bytes FROM metrics", batch_size=2)
+    assert [(seq.seq_id, seq.name, seq.x_name) for seq in sequences] == [(0, "a", "t"), (1, "bytes", "t")]
+    assert list(sequences[0].x) == [1, 2, 3]
+    assert str(list(sequences[0].y)) == "[2.5, 3.0, nan]"
+    assert str(list(sequences[1].y)) == "[nan, 4.0, 5.5]"
+
+
+def test_read_query_timestamps_and_single_column(tmp_path):
+    db_path = _database(tmp_path, [("2024-01-01T00:00:00", 1), ("2024-01-01T00:00:10", 2)], "t, a")
+    with sqlite_source.connect(db_path) as connection:
+        (seq,) = sqlite_source.read_query(connection, "SELECT * FROM metrics")
+        assert seq.x_time and list(seq.x) == [1704067200.0, 1704067210.0]
+        (seq,) = sqlite_source.read_query(connection, "SELECT a FROM metrics")
+        assert (list(seq.x), list(seq.y), seq.name) == ([0, 1], [1, 2], "a")
+        with pytest.raises(TypeError):
+            sqlite_source.read_query(connection, "SELECT a, t FROM metrics")
+
+
+def test_connection_is_read_only(tmp_path):
+    db_path = _database(tmp_path, [(1, 2, 3)])
+    with sqlite_source.connect(db_path) as connection:
+        with pytest.raises(sqlite3.OperationalError):
+            connection.execute("DELETE FROM metrics")
+
+
+def _random_rows() -> list[tuple]:
+    rng = random.Random(0)
+    return [(rng.uniform(-1, 11), rng.gauss(0, 1), rng.choice([None, rng.gauss(1, 0.5)])) for _ in range(20000)]
+
+
+@pytest.mark.parametrize(("rows", "x_lim", "y_lim", "terminal_size"), [
+    (_random_rows(), (0, 10), (-2, 2), TERMINAL_SIZE),
+    # integer x on exact .5 ties of the cells (rounded to even by the canvas)
+    ([(i, 0.5, i % 3) for i in range(200)], (0, 104), (0, 2), os.terminal_size((60, 20))),
+])
+def test_cell_pushdown_matches_materialised_plot(tmp_path, rows, x_lim, y_lim, terminal_size):
+    db_path = _database(tmp_path, rows)
+    kwargs = dict(x_lim=x_lim, y_lim=y_lim, terminal_size=terminal_size)
+
+    with sqlite_source.connect(db_path) as connection:
+        sequences = sqlite_source.read_query(connection, "SELECT * FROM metrics")
+        grid = plot._new_cell_grid(sequences, None, None, "linear", "linear", x_lim, y_lim, "lower", terminal_size)
+        assert sqlite_source.can_push_down(connection, "SELECT * FROM metrics", grid)
+        reducers = [CellReducer(grid, seq.derive(x=[], y=[])) for seq in sequences]
+        sqlite_source.reduce_to_cells(connection, "SELECT * FROM metrics", grid, reducers)
+    reduced = [reducer.to_data_sequence() for reducer in reducers]
+    assert all(len(seq.x) <= 2 * grid.columns * grid.lines for seq in reduced)
+
+    expected = plot._render(sequences, **kwargs).split("\n")
+    actual = plot._render(reduced, **kwargs).split("\n")
+    # the frame is the same; the overlap warnings may come in another order
+    assert actual[-20:] == expected[-20:]
+    assert sorted(actual[:-20]) == sorted(expected[:-20])
+
+
+def test_cell_pushdown_rejects_text(tmp_path):
+    db_path = _database(tmp_path, [(1, 2, 3), (2, "text", 4)])
+    with sqlite_source.connect(db_path) as connection:
+        grid = plot._new_cell_grid(
+            sqlite_source.read_query(connection, "SELECT t, b FROM metrics"),
+            None, None, "linear", "linear", (0, 3), (0, 5), "lower", TERMINAL_SIZE
+        )
+        with pytest.raises(TypeError):
+            sqlite_source.reduce_to_cells(connection, "SELECT * FROM metrics", grid, [None, None])
+        with pytest.raises(TypeError):
+            sqlite_source.read_query(connection, "SELECT * FROM metrics")
+
+
+@pytest.mark.parametrize("range_", [None, (0, 5)])
+def test_histogram_pushdown_matches_streaming_count(tmp_path, range_):
+    rng = random.Random(1)
+    values = [rng.choice([rng.uniform(-1, 6), 0, 5, 2.5, None, "text"]) for _ in range(5000)]
+    db_path = _database(tmp_path, [(i, v) for i, v in enumerate(values)], "t, v")
+    numbers = [v for v in values if isinstance(v, (int, float))]
+
+    with sqlite_source.connect(db_path) as connection:
+        histogram = sqlite_source.fill_histogram(connection, "SELECT * FROM metrics", "v", 7, range_, DataScaleType.linear)
+    expected = StreamingHistogram(7, range_ or (min(numbers), max(numbers)))
+    expected.update(numbers)
+    assert histogram.counts == expected.counts
+    assert histogram.out_of_range == expected.out_of_range
+    assert histogram.skipped == len(values) - len(numbers)
+
+
+def test_histogram_add_range():
+    histogram = StreamingHistogram(4, (0, 4))
+    assert histogram.add_range(1.0, 1.5, 3)
+    assert histogram.add_range(4, 4, 1)
+    assert histogram.add_range(5, 9, 2)
+    assert not histogram.add_range(0.5, 1.5, 2)
+    assert (histogram.counts, histogram.out_of_range) == ([0, 3, 0, 1], 2)
+
+
+@pytest.mark.parametrize("query", ["SELECT t, a FROM metrics;", "SELECT t, a FROM metrics ; \n"])
+def test_plot_sqlite_query_with_semicolon(tmp_path, capsys, query):
+    db_path = _database(tmp_path, [(i, i % 7, 0) for i in range(50)])
+    plot.plot_sqlite(db_path, query, x_lim=(0, 50), y_lim=(0, 7), color="never")
+    plot._plot_hist_sqlite(db_path, query, "a", 7, color="never")
+    assert "*: a" in capsys.readouterr().out
+    # an index is labelled with the column name
+    plot._plot_hist_sqlite(db_path, query, "1", 7, color="never")
+    assert "*: a" in capsys.readouterr().out
+
+
+def test_plot_sqlite(tmp_path, capsys):
+    db_path = _database(tmp_path, [(i, math.sin(i / 10), i / 100) for i in range(200)])
+    plot.plot_sqlite(db_path, "SELECT t, a FROM metrics WHERE t < 100", color="never")
+    out = capsys.readouterr().out
+    assert "*: a" in out and "o: b" not in out
@@ -0,0 +1,95 @@
+import math
+import random
+import statistics
+
+import pytest
+
+import scatterminal.stats as stats
+
+
+def _values(n: int, seed: int = 0) -> list[float]:
+    rng = random.Random(seed)
+    return [rng.gauss(100, 15) for _ in range(n)]
+
+
+def test_running_stats():
+    values = _values(1000)
+    running = stats.RunningStats()
+    for v in values + [float("nan")]:
+        running.add(v)
+    assert running.count == 1000
+    assert running.nan_count == 1
+    assert running.mean == pytest.approx(statistics.fmean(values))
+    assert running.std == pytest.approx(statistics.stdev(values))
+    assert (running.min_, running.max_) == (min(values), max(values))
+
+
+def test_running_stats_merge_equals_single_pass():
+    values = _values(1000)
+    chunks = [values[:1], values[1:400], values[400:]]
+    merged = stats.RunningStats()
+    for chunk in chunks:
+        partial = stats.RunningStats()
+        for v in chunk:
+            partial.add(v)
+        merged.merge(partial)
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(statistics.fmean(values))
+    assert merged.std == pytest.approx(statistics.stdev(values))
+    assert (merged.min_, merged.max_) == (min(values), max(values))
+
+
+def test_quantile_sketch_exact_for_small_input():
+    sketch = stats.QuantileSketch(k=200)
+    for v in range(1, 101):
+        sketch.add(v)
+    assert sketch.quantile(0.5) == 50
+    assert sketch.quantile(0.95) == 95
+    assert sketch.quantile(1.0) == 100
+
+
+@pytest.mark.parametrize("chunk_num", [1, 7])
+def test_quantile_sketch_rank_error(chunk_num: int):
+    values = _values(100_000, seed=1)
+    chunk_size = math.ceil(len(values) / chunk_num)
+    merged = stats.QuantileSketch(k=200)
+    for i in range(chunk_num):
+        sketch = stats.QuantileSketch(k=200)
+        for v in values[i * chunk_size:(i + 1) * chunk_size]:
+            sketch.add(v)
+        merged.merge(sketch)
+
+    assert merged.count == len(values)
+    sorted_values = sorted(values)
+    for q in (0.05, 0.25, 0.5, 0.75, 0.95):
+        rank = sorted_values.index(merged.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.02
+    # memory does not grow with the input
+    assert sum(len(level) for level in merged._levels) < 200 * 12
+
+
+def test_collect_column_stats_skips_labels():
+    rows = iter([["t", "host", "v"], ["0", "a", "1"], ["1", "b", "3"], ["2", "a", ""]])
+    actual = stats.collect_column_stats(rows)
+    assert [c.name for c in actual] == ["t", "v"]
+    assert (actual[1].running.count, actual[1].running.nan_count, actual[1].running.mean) == (2, 1, 2.0)
+
+
+def test_merge_column_stats_by_name():
+    first = stats.collect_column_stats(iter([["x", "y"], ["0", "1"]]))
+    second = stats.collect_column_stats(iter([["x", "z"], ["2", "5"]]))
+    merged = stats.merge_column_stats([first, second])
+    assert [(c.name, c.running.count) for c in merged] == [("x", 2), ("y", 1), ("z", 1)]
+    assert merged[0].running.mean == 1.0
+    assert "p50" in stats.format_stats(merged).splitlines()[0]
+
+
+def test_quantile_sketch_update_matches_add():
+    values = [(i * 7919) % 10007 for i in range(20000)]
+    added = stats.QuantileSketch(k=100)
+    for v in values:
+        added.add(v)
+    updated = stats.QuantileSketch(k=100)
+    updated.update(values)
+    assert updated.count == added.count
+    assert [updated.quantile(q) for q in stats.QUANTILES] == [added.quantile(q) for q in stats.QUANTILES]
@@ -0,0 +1,69 @@
+import datetime
+
+import pytest
+
+import scatterminal.timestamp as timestamp
+
+
+def _epoch(*args, tzinfo=datetime.timezone.utc) -> float:
+    return datetime.datetime(*args, tzinfo=tzinfo).timestamp()
+
+
+@pytest.mark.parametrize(
+    ("sample", "expected_parser"),
+    [
+        ("2024-03-01T12:34:56", timestamp.parse_fixed_iso),
+        ("2024-03-01 12:34:56", timestamp.parse_fixed_iso),
+        ("2024-03-01", timestamp.parse_date),
+        ("2024-03-01T12:34:56.250Z", timestamp.parse_iso),
+        ("2024-03-01T12:34+09:00", timestamp.parse_iso),
+        ("web1", None),
+        ("12.5", None),
+        ("2024-13-01T00:00:00+00:00", None),
+        ("2024-01-01T25:61:99", None),
+        ("2024-02-30", None),
+    ]
+)
+def test_detect_parser(sample: str, expected_parser):
+    assert timestamp.detect_parser(sample) is expected_parser
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("2024-03-01T12:34:56", _epoch(2024, 3, 1, 12, 34, 56)),
+        ("1969-12-31 23:59:59", -1.0),
+        ("2024-03-01", _epoch(2024, 3, 1)),
+        ("2024-03-01T12:34:56.250Z", _epoch(2024, 3, 1, 12, 34, 56, 250000)),
+        ("2024-03-01T12:34+09:00", _epoch(2024, 3, 1, 3, 34)),
+    ]
+)
+def test_parse(value: str, expected: float):
+    assert timestamp.detect_parser(value)(value) == expected
+
+
+def test_fixed_iso_falls_back_to_general_parser():
+    # a later row of the column may have another width
+    assert timestamp.parse_fixed_iso("2024-03-01T12:34:56.5") == _epoch(2024, 3, 1, 12, 34, 56, 500000)
+
+
+@pytest.mark.parametrize(
+    ("parser", "value"),
+    [
+        (timestamp.parse_fixed_iso, "2024-01-01T25:00:00"),
+        (timestamp.parse_fixed_iso, "2024-01-01T23:60:00"),
+        (timestamp.parse_fixed_iso, "2024-01-01T23:59:61"),
+        (timestamp.parse_fixed_iso, "2024-01-01T23:5x:00"),
+        (timestamp.parse_fixed_iso, "2024-01-01T23:59:+1"),
+        (timestamp.parse_fixed_iso, "2024-02-30T00:00:00"),
+        (timestamp.parse_date, "2024-02-30"),
+        (timestamp.parse_iso, "web1"),
+    ]
+)
+def test_parse_error(parser, value: str):
+    with pytest.raises(TypeError, match="Invalid timestamp"):
+        parser(value)
+
+
+def test_fixed_iso_leap_second():
+    assert timestamp.parse_fixed_iso("2016-12-31T23:59:60") == _epoch(2017, 1, 1)